@@ -21,6 +21,7 @@ import copy
 import datetime
 import functools
 import math
+import os
 import sys
 from enum import Enum
 from subprocess import call
@@ -32,6 +33,8 @@ import euclidean_coordinates
 import gui
 import native_coordinates
 import printing
+import rasterizing
+import tiling
 
 # Modes
 Mode = Enum("Mode", "select translate mark circle polygon")
@@ -178,7 +181,7 @@ def undo(event):
         set_status_label_text("Undid last action.")
 
         # Mark new items for redraw.
-        drawer.mark_all_items_for_redraw()
+        drawer.mark_all_items_for_reprojection()
         redraw()
 
     elif len(drawing_history) == 2:
@@ -187,7 +190,7 @@ def undo(event):
         # Mark current items for "redraw" (will be removed).
         drawer.mark_all_items_for_redraw()
 
-        drawer.items = []
+        drawer.items = drawing.item_list()
         drawer.edges = []
         selected_nodes = []
         mouse_location = None
@@ -222,8 +225,7 @@ def toggle_snap():
 
 
 def resize(event):
-    drawer.mark_all_items_for_redraw()
-    drawer.clear()
+    drawer.move_to_canvas_center()
     redraw()
 
 
@@ -233,6 +235,10 @@ def redraw():
     global snapped_item_radial
     global snapped_item_angular
 
+    # Every interaction ends with a redraw, so this is where events are
+    # counted.
+    drawer.statistics.count_event()
+
     # Make sure to always update the selected nodes.
     redraw_selected_nodes()
     drawer.draw(drawer.items, drawer.edges, selected_nodes, mouse_location,
@@ -249,6 +255,7 @@ def add_circle_at(position_E):
                             radius=current_circle_size,
                             color=0)
     drawer.items.append(circle)
+    drawer.mark_item_for_redraw(circle)
     index = len(drawer.items) - 1
 
     # The selected nodes are about to change, we need to redraw them.
@@ -271,6 +278,7 @@ def add_point_at(position_E):
 
     point = drawing.point(coordinate_H=coordinate_H, color=0)
     drawer.items.append(point)
+    drawer.mark_item_for_redraw(point)
     index = len(drawer.items) - 1
 
     # The selected nodes are about to change, we need to redraw them.
@@ -293,13 +301,14 @@ def add_edge_between(node1, node2):
         if (edge.index1 == node1
                 and edge.index2 == node2) or (edge.index2 == node1
                                               and edge.index1 == node2):
-            drawer.mark_edge_for_redraw(edge)
+            drawer.mark_edge_for_removal(edge)
             drawer.edges.remove(edge)
             edge_already_present = True
             break
 
     if not edge_already_present:
         drawer.edges.append(new_edge)
+        drawer.mark_edge_for_redraw(new_edge)
 
     # After adding an edge, we save the current state to the history.
     save_current_state()
@@ -313,6 +322,7 @@ def remove_current_polygon():
     sorted_polygon_points = sorted(current_polygon)
 
     for polygon_node in reversed(sorted_polygon_points):
+        drawer.mark_item_for_removal(drawer.items[polygon_node])
         del drawer.items[polygon_node]
 
     current_polygon = []
@@ -344,7 +354,7 @@ def print_ipe():
     # We just drew to something else than the canvas. Meaning all items were
     # redrawn (to the file) and afterwards not redrawn on the canvas. We do
     # that now.
-    drawer.mark_all_items_for_redraw()
+    drawer.mark_all_items_for_reprojection()
     redraw()
 
 
@@ -373,7 +383,7 @@ def print_svg():
     # We just drew to something else than the canvas. Meaning all items were
     # redrawn (to the file) and afterwards not redrawn on the canvas. We do
     # that now.
-    drawer.mark_all_items_for_redraw()
+    drawer.mark_all_items_for_reprojection()
     redraw()
 
 
@@ -427,6 +437,9 @@ def update_help_label():
         "g: Add/remove grid\n" +\
         "G: Add/remove drawing of embedded input graph\n" +\
         "R: Add/remove regular grid\n" +\
+        "v: Change projection\n" +\
+        "w: Save tiles of embedded graph\n" +\
+        "f: Show/hide performance statistics\n" +\
         "c: Change color of selected objects\n" +\
         "d: Clear all\n" +\
         "z: Undo\n" +\
@@ -444,6 +457,8 @@ def update_status_label():
 
     status_label_text = "Current scale: " + "{:1.4f}".format(
         drawer.scale) + "\n"
+    status_label_text += "Projection: " + drawing.drawer.projection_names[
+        drawer.projection] + "\n"
     status_label_text += "Current circle radius: " + "{:1.4f}".format(
         current_circle_size) + "\n"
 
@@ -471,7 +486,7 @@ def redraw_selected_nodes():
 
     for index in selected_nodes:
         item = drawer.items[index]
-        drawer.mark_item_for_redraw(item)
+        drawer.mark_item_for_update(item)
 
 
 # Mouse Interaction
@@ -708,7 +723,10 @@ def set_position_of_item_with_index(location_E, item_index):
         coordinate_H = drawer.hyperbolic_coordinate_from_canvas_point(
             coordinate_E)
         item.coordinate_H = coordinate_H
-        drawer.mark_item_for_redraw(item)
+
+        # The canvas items of the item and its edges are kept and only moved,
+        # since this happens on every motion event while dragging.
+        drawer.mark_item_for_update(item)
 
         drawer.items[item_index] = item
 
@@ -716,7 +734,7 @@ def set_position_of_item_with_index(location_E, item_index):
         for edge in drawer.edges:
             if edge.index1 == selected_nodes[
                     -1] or edge.index2 == selected_nodes[-1]:
-                drawer.mark_edge_for_redraw(edge)
+                drawer.mark_edge_for_update(edge)
 
         redraw()
 
@@ -854,11 +872,11 @@ def shift_mouse_scrolled_with_delta(delta):
 def control_mouse_scrolled_with_delta(delta):
     global drawer
 
-    drawer.scale = drawer.scale + 10 * delta
-    drawer.scale = max(drawer.scale, 1.0)
+    # The drawn items are scaled on the canvas right away and refined in the
+    # background.
+    drawer.zoom_to_scale(max(drawer.scale + 10 * delta, 1.0), redraw)
 
     update_status_label()
-    drawer.mark_all_items_for_redraw()
     redraw()
 
 
@@ -919,13 +937,12 @@ def delete_items(items_to_delete):
                 edges_to_remove.append(index)
 
         for edge_index in reversed(sorted(edges_to_remove)):
-            # Mark edge for redraw. (Will not actually be redrawn due to
-            # deletion.)
-            drawer.mark_edge_for_redraw(drawer.edges[edge_index])
+            # Remove the drawn edge.
+            drawer.mark_edge_for_removal(drawer.edges[edge_index])
             del drawer.edges[edge_index]
 
-        # Mark item for redraw. (Will not actually be redrawn due to deletion.)
-        drawer.mark_item_for_redraw(drawer.items[node_to_remove])
+        # Remove the drawn item.
+        drawer.mark_item_for_removal(drawer.items[node_to_remove])
         del drawer.items[node_to_remove]
 
     for index, edge in enumerate(drawer.edges):
@@ -1039,7 +1056,7 @@ def d_pressed(event):
     # Everything needs to be "redrawn"
     drawer.mark_all_items_for_redraw()
 
-    drawer.items = []
+    drawer.items = drawing.item_list()
     drawer.edges = []
     selected_nodes = []
     current_circle_size = 10.0
@@ -1080,9 +1097,31 @@ def g_pressed(event):
 
 def capital_g_pressed(event):
     # If we already drew the graph, we remove the drawing now.
-    if drawer.embedded_graph:
-        drawer.mark_embedded_graph_for_redraw()
-        drawer.embedded_graph = None
+    if drawer.embedded_graph or "embedded_graph" in drawer.tile_pyramids:
+        drawer.set_embedded_graph(None)
+        redraw()
+        return
+
+    # A single parameter is a directory with saved tiles of a graph.
+    if len(sys.argv) == 2:
+        if not os.path.isdir(sys.argv[1]):
+            set_status_label_text(sys.argv[1] +
+                                  " is not a directory of tiles.")
+            return
+        if not rasterizing.is_available():
+            set_status_label_text(
+                "Showing saved tiles requires Pillow. Install it with: pip3 install Pillow"
+            )
+            return
+
+        try:
+            pyramid = tiling.tile_pyramid.load(sys.argv[1])
+        except (OSError, ValueError, KeyError) as error:
+            set_status_label_text("Could not load the tiles in " +
+                                  sys.argv[1] + ": " + str(error))
+            return
+
+        drawer.tile_pyramids["embedded_graph"] = pyramid
         redraw()
         return
 
@@ -1130,7 +1169,7 @@ def capital_g_pressed(event):
 
             graph.graph.add_edge(node1, node2)
 
-    drawer.embedded_graph = graph
+    drawer.set_embedded_graph(graph)
     redraw()
 
 
@@ -1235,90 +1274,137 @@ def t_pressed(event):
     set_mode_translate()
 
 
-# Creating the GUI
-root = Tk()
-root.title("Hipe")
-gui = gui.gui(root)
-help_label = gui.help_label
-status_label = gui.status_label
-
-gui.select_button.configure(command=set_mode_select)
-gui.translate_button.configure(command=set_mode_translate)
-gui.mark_button.configure(command=set_mode_mark)
-gui.circle_button.configure(command=set_mode_circle)
-gui.polygon_button.configure(command=set_mode_polygon)
-
-gui.snap_button.configure(command=toggle_snap)
-
-gui.ipe_save_button.configure(command=save_as_ipe)
-gui.svg_save_button.configure(command=save_as_svg)
-
-# So we see the initial circle size
-update_mode_indicator()
-update_help_label()
-
-canvas = gui.canvas
-
-canvas.bind("<Configure>", resize)
-canvas.bind("<Button-1>", mouse_down)
-canvas.bind("<ButtonRelease-1>", mouse_up)
-canvas.bind("<Shift-Button-1>", shift_mouse_down)
-canvas.bind("<B1-Motion>", mouse_dragged)
-canvas.bind("<Button-2>", right_mouse_down)
-canvas.bind("<Shift-Button-2>", shift_right_mouse_down)
-canvas.bind("<Button-3>", right_mouse_down)
-canvas.bind("<Shift-Button-3>", shift_right_mouse_down)
-canvas.bind("<Button-4>", mouse_scroll_up)
-canvas.bind("<Button-5>", mouse_scroll_down)
-canvas.bind("<Shift-Button-4>", shift_mouse_scroll_up)
-canvas.bind("<Shift-Button-5>", shift_mouse_scroll_down)
-canvas.bind("<Motion>", mouse_moved)
-root.bind("<BackSpace>", delete_pressed)
-root.bind("<space>", space_pressed)
-root.bind("<Escape>", escape_pressed)
-root.bind("<MouseWheel>", mouse_scrolled)
-root.bind("<Shift-MouseWheel>", shift_mouse_scrolled)
-root.bind("<Control-MouseWheel>", control_mouse_scrolled)
-root.bind("c", c_pressed)
-root.bind("d", d_pressed)
-root.bind("e", e_pressed)
-root.bind("g", g_pressed)
-root.bind("G", capital_g_pressed)
-root.bind("h", h_pressed)
-root.bind("m", m_pressed)
-root.bind("o", o_pressed)
-root.bind("p", p_pressed)
-root.bind("r", r_pressed)
-root.bind("R", capital_r_pressed)
-root.bind("s", s_pressed)
-root.bind("t", t_pressed)
-root.bind("+", mouse_scroll_up)
-root.bind("-", mouse_scroll_down)
-root.bind("*", shift_mouse_scroll_up)
-root.bind("_", shift_mouse_scroll_down)
-root.bind("<Up>", control_mouse_scroll_up)
-root.bind("<Down>", control_mouse_scroll_down)
-root.bind("Command-z", undo)
-root.bind("Control-z", undo)
-root.bind("z", undo)
-root.bind("F1", toggle_snap)
-root.bind("F2", toggle_snap)
-root.bind("F3", toggle_snap)
-root.bind("F4", toggle_snap)
-
-# The actual drawer.
-scale = 35.0
-drawer = drawing.drawer(canvas, scale)
-
-# The status_label needs to know about the drawer. Therefore, it is initialized
-# after the drawer was set.
-update_status_label()
-
-# Graph Input:
-
-while True:
-    try:
-        root.mainloop()
-        break
-    except UnicodeDecodeError:
-        pass
+# Saves the tiles of the embedded graph, which can be loaded again by passing
+# the directory as the only parameter.
+def w_pressed(event):
+    pyramid = drawer.tile_pyramids.get("embedded_graph")
+    if pyramid is None:
+        set_status_label_text("The embedded graph is not drawn as tiles.")
+        return
+
+    call(["mkdir", "-p", "output"])
+    time_string = str(datetime.datetime.now())
+    time_string = time_string.replace(" ", "_")
+    time_string = time_string.replace(":", "-")
+    time_string = time_string.replace(".", "-")
+    directory = './output/' + time_string + '_tiles'
+    number_of_lost_tiles = pyramid.save(directory)
+    if number_of_lost_tiles > 0:
+        set_status_label_text(
+            "Tiles saved in " + directory + ", except for " +
+            str(number_of_lost_tiles) +
+            " tiles that were dropped from memory. Show them again before saving to include them."
+        )
+        return
+    set_status_label_text("Tiles saved in " + directory)
+
+
+# Shows or hides the performance HUD.
+def f_pressed(event):
+    drawer.is_hud_shown = not drawer.is_hud_shown
+    redraw()
+
+
+# Cycles through the projections that can be used to draw the hyperbolic
+# plane.
+def v_pressed(event):
+    projection_index = drawing.drawer.projections.index(drawer.projection)
+    drawer.set_projection(
+        drawing.drawer.projections[(projection_index + 1) %
+                                   len(drawing.drawer.projections)])
+    update_status_label()
+    redraw()
+
+
+# Creating the GUI.  Only when Hipe is run, not when this module is imported,
+# e.g., by the worker processes that tessellate large graphs, see tessellating.
+if __name__ == "__main__":
+    root = Tk()
+    root.title("Hipe")
+    gui = gui.gui(root)
+    help_label = gui.help_label
+    status_label = gui.status_label
+
+    gui.select_button.configure(command=set_mode_select)
+    gui.translate_button.configure(command=set_mode_translate)
+    gui.mark_button.configure(command=set_mode_mark)
+    gui.circle_button.configure(command=set_mode_circle)
+    gui.polygon_button.configure(command=set_mode_polygon)
+
+    gui.snap_button.configure(command=toggle_snap)
+
+    gui.ipe_save_button.configure(command=save_as_ipe)
+    gui.svg_save_button.configure(command=save_as_svg)
+
+    # So we see the initial circle size
+    update_mode_indicator()
+    update_help_label()
+
+    canvas = gui.canvas
+
+    canvas.bind("<Configure>", resize)
+    canvas.bind("<Button-1>", mouse_down)
+    canvas.bind("<ButtonRelease-1>", mouse_up)
+    canvas.bind("<Shift-Button-1>", shift_mouse_down)
+    canvas.bind("<B1-Motion>", mouse_dragged)
+    canvas.bind("<Button-2>", right_mouse_down)
+    canvas.bind("<Shift-Button-2>", shift_right_mouse_down)
+    canvas.bind("<Button-3>", right_mouse_down)
+    canvas.bind("<Shift-Button-3>", shift_right_mouse_down)
+    canvas.bind("<Button-4>", mouse_scroll_up)
+    canvas.bind("<Button-5>", mouse_scroll_down)
+    canvas.bind("<Shift-Button-4>", shift_mouse_scroll_up)
+    canvas.bind("<Shift-Button-5>", shift_mouse_scroll_down)
+    canvas.bind("<Motion>", mouse_moved)
+    root.bind("<BackSpace>", delete_pressed)
+    root.bind("<space>", space_pressed)
+    root.bind("<Escape>", escape_pressed)
+    root.bind("<MouseWheel>", mouse_scrolled)
+    root.bind("<Shift-MouseWheel>", shift_mouse_scrolled)
+    root.bind("<Control-MouseWheel>", control_mouse_scrolled)
+    root.bind("c", c_pressed)
+    root.bind("d", d_pressed)
+    root.bind("e", e_pressed)
+    root.bind("f", f_pressed)
+    root.bind("g", g_pressed)
+    root.bind("G", capital_g_pressed)
+    root.bind("h", h_pressed)
+    root.bind("m", m_pressed)
+    root.bind("o", o_pressed)
+    root.bind("p", p_pressed)
+    root.bind("r", r_pressed)
+    root.bind("R", capital_r_pressed)
+    root.bind("s", s_pressed)
+    root.bind("t", t_pressed)
+    root.bind("v", v_pressed)
+    root.bind("w", w_pressed)
+    root.bind("+", mouse_scroll_up)
+    root.bind("-", mouse_scroll_down)
+    root.bind("*", shift_mouse_scroll_up)
+    root.bind("_", shift_mouse_scroll_down)
+    root.bind("<Up>", control_mouse_scroll_up)
+    root.bind("<Down>", control_mouse_scroll_down)
+    root.bind("Command-z", undo)
+    root.bind("Control-z", undo)
+    root.bind("z", undo)
+    root.bind("F1", toggle_snap)
+    root.bind("F2", toggle_snap)
+    root.bind("F3", toggle_snap)
+    root.bind("F4", toggle_snap)
+
+    # The actual drawer.
+    scale = 35.0
+    drawer = drawing.drawer(canvas, scale)
+
+    # The status_label needs to know about the drawer. Therefore, it is
+    # initialized after the drawer was set.
+    update_status_label()
+
+    # Graph Input:
+
+    while True:
+        try:
+            root.mainloop()
+            break
+        except UnicodeDecodeError:
+            pass
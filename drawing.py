@@ -17,12 +17,20 @@
 # You can contact the author via email: max.katzmann@gmail.com
 
 from tkinter import *
+from collections import deque
+from contextlib import contextmanager
 import math
 
+import numpy as np
+
 import drawing
 import euclidean_coordinates
 import embedded_graph
 import native_coordinates
+import profiling
+import rasterizing
+import tessellating
+import tiling
 
 
 class point:
@@ -30,25 +38,51 @@ class point:
         self.coordinate_H = coordinate_H
         self.color = color
         self.drawn_items = None
+        self.needs_update = False
 
 
+# The render points of circles and edges are kept in two forms.  The points
+# with suffix _N are the Euclidean coordinates in the plane of the projection
+# with scale 1, e.g., (r cos(phi), r sin(phi)) in the native representation,
+# which only change when the circle or edge changes.  They can be
+# used up to the scale stored with them, see
+# native_coordinates.adaptive_render_points_for_lines_from_to.  The points with
+# suffix _E are their positions on the canvas, which change whenever the
+# canvas is zoomed or resized.
 class circle:
     def __init__(self, coordinate_H, radius, color):
         self.coordinate_H = coordinate_H
         self.radius = radius
         self.color = color
+        self.circle_points_N = None
+        self.circle_max_scale = 0.0
+
+        # The radial and angular coordinates of the center and the radius
+        # that the render points were computed for.
+        self.circle_points_N_source = None
+
         self.circle_points_E = []
+        self.circle_disk_E = None
         self.drawn_items = None
+        self.needs_update = False
 
 
 class edge:
     def __init__(self, index1, index2):
         self.index1 = index1
         self.index2 = index2
+        self.edge_points_N = None
+        self.edge_max_scale = 0.0
         self.edge_points_E = []
+        self.edge_arc_E = None
+        self.edge_min_radius = None
         self.drawn_items = None
+        self.needs_update = False
 
         self.hypercycle_radius = 0
+        self.hypercycle_upper_points_N = None
+        self.hypercycle_lower_points_N = None
+        self.hypercycle_max_scale = 0.0
         self.hypercycle_upper_points_E = None
         self.hypercycle_lower_points_E = None
         self.drawn_hypercycle_items = None
@@ -61,6 +95,481 @@ def is_circle_item(item):
     return isinstance(item, circle)
 
 
+# The list of drawn items, i.e., points and circles.  Behaves like a list, but
+# the coordinates of the items are stored in a polar_array, such that they can
+# be processed in batches.  The coordinate_H of an item in the list is a view
+# of its coordinate in the array, i.e., changing the coordinate changes the
+# array.  Assigning a new coordinate_H to an item is only picked up after the
+# item is put into the list again.
+class item_list:
+    def __init__(self, items=()):
+        self.items = []
+        self.coordinates = native_coordinates.polar_array()
+
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __setitem__(self, index, item):
+        index = range(len(self.items))[index]
+        self.coordinates[index] = item.coordinate_H
+        item.coordinate_H = self.coordinates[index]
+        self.items[index] = item
+
+    def __delitem__(self, index):
+        index = range(len(self.items))[index]
+
+        # The removed item gets its own coordinate again, since its view would
+        # refer to the next item from now on.
+        item = self.items[index]
+        item.coordinate_H = native_coordinates.polar_coordinate(
+            item.coordinate_H.r, item.coordinate_H.phi)
+
+        del self.coordinates[index]
+        del self.items[index]
+
+        for later_index in range(index, len(self.items)):
+            self.items[later_index].coordinate_H = self.coordinates[
+                later_index]
+
+    def append(self, item):
+        index = self.coordinates.append(item.coordinate_H)
+        item.coordinate_H = self.coordinates[index]
+        self.items.append(item)
+
+
+# The points and edges that represent a graph when it is drawn.  The model is
+# built once for a graph and kept, such that the render points of the edges
+# are reused whenever the graph is drawn again, and only projected to the
+# canvas.  The coordinates of the points are kept in the array of an
+# item_list, and edge_indices contains the indices of the end points of each
+# edge, such that they can be processed in batches.
+class graph_render_model:
+    def __init__(self, graph):
+        self.graph = graph
+
+        self.items = item_list()
+        for node in graph.embedding:
+            self.items.append(point(graph.embedding[node], 0))
+
+        self.edges = [edge(u, v) for u, v in graph.graph.edges]
+        self.edge_indices = np.array([[edge.index1, edge.index2]
+                                      for edge in self.edges],
+                                     dtype=np.intp).reshape(-1, 2)
+
+        # The visible radius when the graph was drawn onto the canvas, or None
+        # if it is not drawn.  The points and edges within it are drawn
+        # already, see drawer.draw_graph_layer.
+        self.drawn_radius = None
+
+        # The smallest scale at which points or edges were left out for the
+        # level of detail, or None if all were drawn.  After zooming in, they
+        # may need to be drawn, see drawer.refine_after_zoom.
+        self.reduced_scale = None
+
+    # Forgets the drawn items and canvas points, e.g., after the layer of the
+    # graph has been deleted.
+    def forget_drawn_items(self):
+        forget_drawn_items(self.items, self.edges)
+        self.drawn_radius = None
+        self.reduced_scale = None
+
+    # Forgets the render points, e.g., when the projection changes.  The
+    # smallest radial coordinates of the edges do not depend on the
+    # projection and are kept.
+    def forget_render_points(self):
+        self.forget_drawn_items()
+        for edge in self.edges:
+            edge.edge_points_N = None
+            edge.edge_max_scale = 0.0
+
+
+# Forgets the drawn items and canvas points of the passed items and edges,
+# e.g., after the drawn items have been deleted from the canvas together.
+def forget_drawn_items(items, edges):
+    for item in items:
+        item.drawn_items = None
+        item.needs_update = False
+        if is_circle_item(item):
+            item.circle_points_E = []
+            item.circle_disk_E = None
+
+    for edge in edges:
+        edge.drawn_items = None
+        edge.needs_update = False
+        edge.edge_points_E = []
+        edge.edge_arc_E = None
+        edge.drawn_hypercycle_items = None
+        edge.hypercycle_upper_points_E = None
+        edge.hypercycle_lower_points_E = None
+
+
+# Moves canvas points by the passed offset, in place, see
+# drawer.move_to_canvas_center.
+def translate_canvas_points(points_E, offset_x, offset_y):
+    if points_E is not None and len(points_E) > 0:
+        points_E += (offset_x, offset_y)
+
+
+def translate_canvas_point(point_E, offset_x, offset_y):
+    point_E.x += offset_x
+    point_E.y += offset_y
+
+
+# Rotates points in the plane of a projection around the origin.  All
+# projections are symmetric under rotations around the origin, so these are
+# the render points of the rotated curve.
+def rotated_model_points(points_N, angle):
+    cos_angle, sin_angle = math.cos(angle), math.sin(angle)
+    rotated_points_N = np.empty(points_N.shape, dtype=np.float64)
+    rotated_points_N[..., 0] = (cos_angle * points_N[..., 0] -
+                                sin_angle * points_N[..., 1])
+    rotated_points_N[..., 1] = (sin_angle * points_N[..., 0] +
+                                cos_angle * points_N[..., 1])
+    return rotated_points_N
+
+
+# Returns the radial and angular coordinates of the items with the passed
+# indices as arrays.  These are taken from the array of an item_list directly.
+def coordinate_arrays_of_items_with_indices(items, indices):
+    if isinstance(items, item_list):
+        indices = np.asarray(indices, dtype=np.intp)
+        return items.coordinates.r[indices], items.coordinates.phi[indices]
+
+    coordinates_H = [items[index].coordinate_H for index in indices]
+    return ([coordinate_H.r for coordinate_H in coordinates_H],
+            [coordinate_H.phi for coordinate_H in coordinates_H])
+
+
+# The canvas arcs that make up a circle with the passed radius around the
+# passed center, as pairs of the bounding box of the circle and the options of
+# the arc.  The angles are measured counterclockwise on the canvas.
+def arcs_of_circle(center_E, radius, start_angle, end_angle, fill_color,
+                   border_color, width):
+    bounding_box = (center_E.x - radius, center_E.y - radius,
+                    center_E.x + radius, center_E.y + radius)
+
+    style = ARC
+    fill_options = {}
+    if len(fill_color) > 0:
+        style = PIESLICE
+        fill_options = {"fill": fill_color}
+
+    # Arcs that pass through the angle 0 are drawn as a single arc that
+    # starts at start_angle and extends past 2 pi.
+    if start_angle > end_angle and len(fill_color) == 0:
+        extents = [(start_angle, (end_angle - start_angle) % (2.0 * math.pi))]
+    else:
+        extents = [(start_angle, end_angle - start_angle)]
+
+    return [(bounding_box,
+             dict(style=style,
+                  start=math.degrees(start),
+                  extent=math.degrees(extent),
+                  outline=border_color,
+                  width=width,
+                  **fill_options)) for start, extent in extents]
+
+
+# Whether the angles passed to the circle functions describe a full circle,
+# which is drawn as a single oval instead of arcs.
+def is_full_circle(start_angle, end_angle):
+    return start_angle == 0.0 and end_angle == 2.0 * math.pi
+
+
+# The bounding box and the options of the oval of a full circle.
+def oval_of_circle(center_E, radius, fill_color, border_color, width):
+    return ((center_E.x - radius, center_E.y - radius, center_E.x + radius,
+             center_E.y + radius),
+            dict(fill=fill_color, outline=border_color, width=width))
+
+
+# The flat list of canvas coordinates of a path through the passed points, or
+# None if the path has less than two points.
+def coordinates_of_path(points_E, is_closed):
+    points_E = np.asarray(points_E, dtype=np.float64)
+    if len(points_E) < 2:
+        return None
+
+    if is_closed:
+        points_E = np.concatenate((points_E, points_E[:1]))
+
+    return points_E.ravel().tolist()
+
+
+# Drawing functions that update already drawn canvas items in place with
+# canvas.coords, instead of creating new ones.  The items are reused in the
+# order in which they were drawn, as long as their type matches.  New items
+# are only created if there are no matching items left, and the items that
+# are not needed anymore are deleted by delete_unused_items.  New items get
+# the passed tags, such that they belong to the same layer as the reused ones.
+# The time spent is added to the passed statistics, see profiling.
+class canvas_item_pool:
+    def __init__(self, canvas, items, tags, statistics):
+        self.canvas = canvas
+        self.items = list(items)
+        self.tags = tags
+        self.statistics = statistics
+
+    def reusable_item_of_type(self, item_type):
+        if self.items and self.canvas.type(self.items[0]) == item_type:
+            return self.items.pop(0)
+        return None
+
+    def draw_path(self, points_E, is_closed, color, width):
+        coordinates = coordinates_of_path(points_E, is_closed)
+        if coordinates is None:
+            return []
+
+        with self.statistics.stage("item creation"):
+            item = self.reusable_item_of_type("line")
+            if item is None:
+                return self.statistics.count_created_items([
+                    self.canvas.create_line(coordinates,
+                                            fill=color,
+                                            width=width,
+                                            tags=self.tags)
+                ])
+
+            self.canvas.coords(item, coordinates)
+            self.canvas.itemconfigure(item, fill=color, width=width)
+            return [item]
+
+    def draw_circle(self, center_E, radius, start_angle, end_angle,
+                    is_clockwise, fill_color, border_color, width):
+        with self.statistics.stage("item creation"):
+            if is_full_circle(start_angle, end_angle):
+                bounding_box, options = oval_of_circle(center_E, radius,
+                                                       fill_color,
+                                                       border_color, width)
+                item = self.reusable_item_of_type("oval")
+                if item is None:
+                    return self.statistics.count_created_items([
+                        self.canvas.create_oval(*bounding_box,
+                                                tags=self.tags,
+                                                **options)
+                    ])
+
+                self.canvas.coords(item, *bounding_box)
+                self.canvas.itemconfigure(item, **options)
+                return [item]
+
+            drawn_items = []
+            for bounding_box, options in arcs_of_circle(
+                    center_E, radius, start_angle, end_angle, fill_color,
+                    border_color, width):
+                item = self.reusable_item_of_type("arc")
+                if item is None:
+                    item = self.canvas.create_arc(*bounding_box,
+                                                  tags=self.tags,
+                                                  **options)
+                    self.statistics.count_created_items([item])
+                else:
+                    self.canvas.coords(item, *bounding_box)
+                    self.canvas.itemconfigure(item,
+                                              **dict({"fill": ""}, **options))
+                drawn_items.append(item)
+
+            return drawn_items
+
+    def delete_unused_items(self):
+        with self.statistics.stage("deletion"):
+            for item in self.items:
+                self.canvas.delete(item)
+        self.statistics.count_deleted_items(self.items)
+        self.items = []
+
+
+# Draws the edges of a layer in batches.  The render points of the batches are
+# computed by the worker processes, see tessellating, and finished batches are
+# drawn by polling with canvas.after, such that the window stays responsive
+# and the layer fills in progressively.  A progressive drawing is cancelled
+# when its layer is deleted, e.g., after zooming.
+#
+# Instead of onto the canvas, the edges can be drawn into an image, see
+# drawer.draw_tiles.  Then the passed points are drawn into it first, and
+# finish_func is called once all batches are drawn.
+class progressive_drawing:
+    def __init__(self,
+                 drawer,
+                 layer,
+                 edges,
+                 items,
+                 center_E,
+                 image=None,
+                 points=(),
+                 finish_func=None):
+        self.drawer = drawer
+        self.layer = layer
+        self.items = items
+        self.center_E = center_E
+        self.image = image
+        self.points = points
+        self.finish_func = finish_func
+
+        # The scale of the image is used for the render points.
+        with drawer.drawing_into(image):
+            self.batches = self.batches_of_edges(edges)
+
+        self.pending_poll = drawer.canvas.after(drawer.progressive_poll_delay,
+                                                self.poll)
+
+    # Splits the passed edges into batches.  Returns the batches together
+    # with the edges that have no render points and the future computing
+    # them, in the order they are drawn.  The future is None, if the render
+    # points are computed in this process.
+    def batches_of_edges(self, edges):
+        # The edges that have no render points are tessellated together,
+        # split into the batches.
+        batches = []
+        edges_to_render = []
+        ranges = []
+        for start in range(0, len(edges), self.drawer.progressive_batch_size):
+            batch = edges[start:start + self.drawer.progressive_batch_size]
+            batch_edges_to_render = [
+                edge for edge in batch
+                if not self.drawer.are_render_points_valid(
+                    edge.edge_points_N, edge.edge_max_scale)
+            ]
+            batches.append((batch, batch_edges_to_render))
+            if batch_edges_to_render:
+                ranges.append(
+                    (len(edges_to_render),
+                     len(edges_to_render) + len(batch_edges_to_render)))
+                edges_to_render += batch_edges_to_render
+
+        # Few edges are tessellated in this process, one batch per poll.
+        futures = iter([])
+        if tessellating.is_parallel(len(edges_to_render)):
+            r1, phi1 = coordinate_arrays_of_items_with_indices(
+                self.items, [edge.index1 for edge in edges_to_render])
+            r2, phi2 = coordinate_arrays_of_items_with_indices(
+                self.items, [edge.index2 for edge in edges_to_render])
+            try:
+                futures = iter(
+                    tessellating.submit_render_points_of_lines(
+                        r1, phi1, r2, phi2, ranges, self.drawer.projection,
+                        self.drawer.model_scale(),
+                        self.drawer.max_pixel_error))
+            except Exception as error:
+                tessellating.forget_broken_worker_pool(error)
+
+        batches_to_draw = deque()
+        for batch, batch_edges_to_render in batches:
+            if batch_edges_to_render:
+                batches_to_draw.append(
+                    (batch, (batch_edges_to_render, next(futures, None))))
+            else:
+                batches_to_draw.append((batch, None))
+
+        return batches_to_draw
+
+    # Draws the batches that are finished, in order.  Polls that draw batches
+    # are frames of the statistics of the drawer.
+    def poll(self):
+        self.pending_poll = None
+        self.drawer.statistics.start_frame()
+        with self.drawer.drawing_into(self.image):
+            number_of_batches = self.draw_finished_batches()
+
+        if len(self.batches) < number_of_batches:
+            self.drawer.statistics.end_frame()
+            self.drawer.draw_hud()
+
+        if self.batches:
+            self.pending_poll = self.drawer.canvas.after(
+                self.drawer.progressive_poll_delay, self.poll)
+            return
+
+        self.drawer.progressive_drawings.pop(self.layer, None)
+        if self.finish_func is not None:
+            self.finish_func()
+
+    # Draws the batches that are finished, see poll.  Returns the number of
+    # batches there were before.
+    def draw_finished_batches(self):
+        if self.image is None:
+            path_func, circle_func = self.drawer.draw_path, self.drawer.draw_circle
+        else:
+            path_func, circle_func = self.image.draw_path, self.image.draw_circle
+
+        if self.points:
+            self.drawer.draw_points(self.points, [], self.center_E,
+                                    circle_func)
+            self.points = []
+
+        number_of_batches = len(self.batches)
+        is_rendered_here = False
+        while self.batches:
+            batch, rendering = self.batches[0]
+            if rendering is not None:
+                edges_to_render, future = rendering
+                if future is not None and not future.done():
+                    break
+
+                # A batch is rendered in this process, if it was not passed
+                # to the workers or if they failed, e.g., since one of them
+                # died.  Then the remaining batches are drawn in later polls,
+                # such that the canvas stays responsive.
+                line_points_N = None
+                if future is not None:
+                    try:
+                        points_N, numbers_of_points, max_scales = future.result(
+                        )
+                        line_points_N = tessellating.render_points_from_flat_points(
+                            points_N, numbers_of_points)
+                    except Exception as error:
+                        tessellating.forget_broken_worker_pool(error)
+
+                if line_points_N is None:
+                    if is_rendered_here:
+                        break
+                    is_rendered_here = True
+                    line_points_N, max_scales = self.render_points_of_edges(
+                        edges_to_render)
+
+                for edge, edge_points_N, max_scale in zip(
+                        edges_to_render, line_points_N, max_scales):
+                    edge.edge_points_N = edge_points_N
+                    edge.edge_max_scale = max_scale
+
+            self.batches.popleft()
+            self.drawer.current_layer = self.layer
+            self.drawer.draw_edges(batch, self.items, self.center_E, path_func,
+                                   circle_func)
+
+        return number_of_batches
+
+    # The render points of the passed edges, computed in this process.
+    def render_points_of_edges(self, edges):
+        r1, phi1 = coordinate_arrays_of_items_with_indices(
+            self.items, [edge.index1 for edge in edges])
+        r2, phi2 = coordinate_arrays_of_items_with_indices(
+            self.items, [edge.index2 for edge in edges])
+        with self.drawer.statistics.stage("tessellation"):
+            return tessellating.render_points_of_lines(
+                r1, phi1, r2, phi2, self.drawer.projection,
+                self.drawer.model_scale(), self.drawer.max_pixel_error)
+
+    def cancel(self):
+        for _, rendering in self.batches:
+            if rendering is not None and rendering[1] is not None:
+                rendering[1].cancel()
+        self.batches.clear()
+
+        if self.pending_poll is not None:
+            self.drawer.canvas.after_cancel(self.pending_poll)
+            self.pending_poll = None
+
+
 class drawer:
 
     colors = [
@@ -73,31 +582,89 @@ class drawer:
     secondary_selection_color = "magenta"
     point_size = 3
 
+    # The maximum distance (in pixels) between a drawn curve and the actual
+    # curve.  Determines how many render points are used for each curve.
+    max_pixel_error = 0.5
+
+    # The projections that can be used to draw the hyperbolic plane: The
+    # native representation, the Poincaré disk and the Beltrami-Klein disk.
+    projections = ["native", "poincare", "klein"]
+    projection_names = {
+        "native": "Native Representation",
+        "poincare": "Poincaré Disk",
+        "klein": "Beltrami-Klein Disk"
+    }
+
+    # The radius of the unit disk of the Poincaré and Klein disks in multiples
+    # of the scale.
+    disk_radius_per_scale = 10.0
+
+    # The size (in pixels) of the cells in which the points of the embedded
+    # graph and the regular grid are aggregated, see
+    # items_and_edges_with_level_of_detail.
+    level_of_detail_cell_size = 1.0
+
+    # Geometry that is at most this many pixels outside of the canvas is still
+    # drawn, such that points and wide lines at the border are complete.
+    culling_margin = 10.0
+
+    # The time (in milliseconds) after the last change of the scale, after
+    # which the drawing is refined, see zoom_to_scale.
+    refinement_delay = 150
+
+    # Layers of graphs with at least this many edges are drawn into an image
+    # instead of onto the canvas, see draw_graph_layer.
+    rasterization_threshold = 50000
+
+    # Layers that are drawn onto the canvas and have more edges than this, are
+    # drawn progressively in batches of this size, see progressive_drawing.
+    progressive_batch_size = 2000
+
+    # The time (in milliseconds) between checking for finished batches.
+    progressive_poll_delay = 10
+
+    # The tag of the canvas items of point markers, see resize_markers.
+    marker_tag = "marker"
+
+    # The layers of the drawing.  Every canvas item is tagged with the layer
+    # it belongs to, such that a whole layer can be deleted, hidden or shown
+    # at once.
+    layers = [
+        "origin", "grid", "regular_grid", "embedded_graph", "items",
+        "snap_guides", "selection", "hud"
+    ]
+
+    # The distance (in pixels) of the performance HUD from the top left corner
+    # of the canvas and its font, see draw_hud.
+    hud_margin = 8
+    hud_font = ("Courier", 10)
+
     def __init__(self, canvas, scale):
 
         # The items and edges that are drawn.
-        self.items = []
+        self.items = item_list()
         self.edges = []
 
         self.canvas = canvas
         self.scale = scale
+        self.projection = "native"
 
         # The embedded graph
         self.embedded_graph = None
 
-        # The drawn items associated with the embedded graph.
-        self.embedded_graph_items = None
+        # The points and edges that represent the embedded graph, see
+        # set_embedded_graph.
+        self.embedded_graph_model = None
 
         # The grid
         self.grid_radius = 0
-        self.grid_items = None
 
         # The regular grid
         self.regular_grid = None
         self.regular_grid_depth = 0
 
-        # The drawn items associated with regular grid.
-        self.regular_grid_items = None
+        # The points and edges that represent the regular grid.
+        self.regular_grid_model = None
 
         # The drawn items associated with the snapping feature.
         self.snap_items = None
@@ -106,8 +673,367 @@ class drawer:
         # mouse would select.
         self.mouse_location_cirlce_items = None
 
-        # The items representing the origin.
-        self.drawn_origin_items = None
+        # The layers that need to be drawn.  If the items layer is among them,
+        # all items and edges are drawn, otherwise only the dirty ones.
+        self.dirty_layers = {
+            "origin", "grid", "regular_grid", "embedded_graph", "items"
+        }
+
+        # The items and edges that were marked since they were drawn the last
+        # time.  Dictionaries are used as sets, such that they are drawn in
+        # the order in which they were marked.
+        self.dirty_items = {}
+        self.dirty_edges = {}
+
+        # The items and edges that were not drawn, since they were outside of
+        # the canvas.  They are drawn again once the visible part of the plane
+        # grows, see mark_culled_items_for_redraw.
+        self.culled_items = {}
+        self.culled_edges = {}
+
+        # The images of the layers that are drawn into images, see
+        # draw_graph_layer.
+        self.raster_images = {}
+
+        # The tiles of the layers that are drawn into images, see draw_tiles.
+        self.tile_pyramids = {}
+
+        # The layers that are being drawn progressively, see
+        # progressive_drawing.
+        self.progressive_drawings = {}
+
+        # The layer that newly drawn canvas items are tagged with.
+        self.current_layer = "items"
+
+        # The scale at which the point markers were drawn.  Zooming the canvas
+        # changes their size, so they are resized once they differ too much
+        # from their actual size, see resize_markers.
+        self.marker_scale = scale
+
+        # The refinement that is scheduled after zooming, if any.
+        self.pending_refinement = None
+
+        # The size of the canvas when it was drawn the last time, see
+        # move_to_canvas_center.
+        self.drawn_canvas_size = None
+
+        # The time spent drawing, see profiling, and whether it is shown on
+        # the canvas, see draw_hud.
+        self.statistics = profiling.drawing_statistics()
+        self.is_hud_shown = False
+        self.hud_item = None
+
+    # Changes the projection that is used to draw the hyperbolic plane.  All
+    # render points need to be computed again.
+    def set_projection(self, projection):
+        self.mark_all_items_for_redraw()
+        for model in [self.embedded_graph_model, self.regular_grid_model]:
+            if model is not None:
+                model.forget_render_points()
+        self.projection = projection
+
+    # Sets the embedded graph that is drawn, or None to remove it.  The
+    # points and edges that represent it are built now, once.
+    def set_embedded_graph(self, graph):
+        self.mark_embedded_graph_for_redraw()
+        self.embedded_graph = graph
+        self.embedded_graph_model = None
+        self.tile_pyramids.pop("embedded_graph", None)
+        if graph:
+            self.embedded_graph_model = graph_render_model(graph)
+
+    # Changes the scale by scaling the drawn items on the canvas, which is
+    # instant.  Since the canvas points are linear in the scale, the scaled
+    # curves are exactly the projections of their render points.  Only the
+    # curves whose render points are not accurate enough for the new scale
+    # are drawn again, and the point markers, whose size must not change, are
+    # resized.  This happens in the background, once the scale did not change
+    # for refinement_delay milliseconds.  Afterwards, redraw_func is called
+    # to draw them.
+    def zoom_to_scale(self, scale, redraw_func):
+        factor = scale / self.scale
+        self.canvas.scale("all",
+                          self.canvas.winfo_width() / 2.0,
+                          self.canvas.winfo_height() / 2.0, factor, factor)
+        self.scale = scale
+
+        for image in self.raster_images.values():
+            image.zoom_to_scale(scale)
+
+        # Layers that are still being drawn are drawn again for the new scale.
+        # Images keep being shown scaled until they are refined, see
+        # refine_after_zoom.
+        for layer in list(self.progressive_drawings):
+            if layer in self.raster_images:
+                self.progressive_drawings.pop(layer).cancel()
+            else:
+                self.mark_graph_layer_for_redraw(layer)
+
+        if self.pending_refinement is not None:
+            self.canvas.after_cancel(self.pending_refinement)
+        self.pending_refinement = self.canvas.after(
+            self.refinement_delay, lambda: self.refine_after_zoom(redraw_func))
+
+        # The HUD is scaled with everything else.
+        self.draw_hud()
+
+    # Moves the drawing to the center of the canvas after the canvas was
+    # resized.  Only the center of the canvas moves, so the drawn items and
+    # the canvas points of the items and edges are translated, instead of
+    # drawing them again.  If the canvas grew, everything that may have
+    # become visible is marked for redraw: the items and edges that were
+    # culled, the grid, and the layers that were drawn into images or drawn
+    # only in part.  The other layers of graphs only add the points and edges
+    # that became visible.
+    def move_to_canvas_center(self):
+        if self.drawn_canvas_size is None:
+            return
+
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        drawn_width, drawn_height = self.drawn_canvas_size
+        if (width, height) == (drawn_width, drawn_height):
+            return
+
+        offset_x = (width - drawn_width) / 2.0
+        offset_y = (height - drawn_height) / 2.0
+        self.canvas.move("all", offset_x, offset_y)
+        self.drawn_canvas_size = (width, height)
+        self.draw_hud()
+
+        # The layers of graphs forget their canvas points whenever they are
+        # drawn again, so only the items and edges need to be translated.
+        for item in self.items:
+            if is_circle_item(item):
+                translate_canvas_points(item.circle_points_E, offset_x,
+                                        offset_y)
+                if item.circle_disk_E is not None:
+                    translate_canvas_point(item.circle_disk_E[0], offset_x,
+                                           offset_y)
+
+        for edge in self.edges:
+            translate_canvas_points(edge.edge_points_E, offset_x, offset_y)
+            translate_canvas_points(edge.hypercycle_upper_points_E, offset_x,
+                                    offset_y)
+            translate_canvas_points(edge.hypercycle_lower_points_E, offset_x,
+                                    offset_y)
+            if edge.edge_arc_E is not None:
+                translate_canvas_point(edge.edge_arc_E[0], offset_x, offset_y)
+
+        # Layers that are still being drawn refer to the old center, and
+        # images have the size of the canvas they were drawn for.  Images are
+        # put together from their tiles again, see draw_tiles.
+        for layer in ["regular_grid", "embedded_graph"]:
+            if layer in self.progressive_drawings or (layer
+                                                      in self.raster_images):
+                self.mark_graph_layer_for_redraw(layer)
+
+        if width <= drawn_width and height <= drawn_height:
+            return
+
+        self.mark_grid_for_redraw()
+        self.mark_culled_items_for_redraw()
+
+        # Graphs are only drawn where they are visible.
+        self.dirty_layers.update(["regular_grid", "embedded_graph"])
+
+    # Marks everything for redraw that is not accurate enough anymore after
+    # zoom_to_scale, and calls redraw_func to draw it again.
+    def refine_after_zoom(self, redraw_func):
+        self.pending_refinement = None
+
+        # The grid is cheap, but layers, items and edges that were culled
+        # before may be visible now.
+        self.mark_grid_for_redraw()
+        self.mark_culled_items_for_redraw()
+
+        marker_error = abs(self.scale / self.marker_scale -
+                           1.0) * self.point_size
+        if marker_error > self.max_pixel_error:
+            self.resize_markers()
+
+        for item in self.items:
+            if is_circle_item(item) and item.drawn_items and (
+                    not self.are_render_points_valid(item.circle_points_N,
+                                                     item.circle_max_scale)):
+                self.mark_item_for_reprojection(item)
+
+        # Scaled images are blurry, so they are always drawn again.
+        if "embedded_graph" in self.raster_images:
+            self.mark_embedded_graph_for_redraw()
+
+        if "regular_grid" in self.raster_images:
+            self.mark_regular_grid_for_redraw()
+
+        if self.embedded_graph_model and not all(
+                self.is_edge_accurate(edge)
+                for edge in self.embedded_graph_model.edges):
+            self.mark_embedded_graph_for_redraw()
+
+        if self.regular_grid_model and not all(
+                self.is_edge_accurate(edge)
+                for edge in self.regular_grid_model.edges):
+            self.mark_regular_grid_for_redraw()
+
+        # Graphs are drawn up to the visible radius and with the level of
+        # detail of the scale they were drawn at.  After zooming in too far,
+        # the points and edges that were left out are drawn, and after
+        # zooming out, the ones that became visible are added.
+        for layer, model in [("regular_grid", self.regular_grid_model),
+                             ("embedded_graph", self.embedded_graph_model)]:
+            if model is None or model.drawn_radius is None:
+                continue
+
+            if model.reduced_scale is not None and (
+                    self.scale / model.reduced_scale - 1.0
+            ) * self.level_of_detail_cell_size > (self.max_pixel_error):
+                self.mark_graph_layer_for_redraw(layer)
+            else:
+                self.dirty_layers.add(layer)
+
+        for edge in self.edges:
+            if not self.is_edge_accurate(edge):
+                self.mark_edge_for_reprojection(edge)
+
+        redraw_func()
+
+    # Tags the passed canvas items as point markers, such that resize_markers
+    # keeps their size when zooming.  Items that are drawn for an export are
+    # not tagged.
+    def tag_as_markers(self, drawn_items, circle_func):
+        if circle_func != self.draw_circle:
+            return
+
+        for drawn_item in drawn_items:
+            self.canvas.addtag_withtag(self.marker_tag, drawn_item)
+
+    # Gives the point markers their actual size again, after zooming has
+    # scaled them, by moving the corners of their ovals back around their
+    # centers.
+    def resize_markers(self):
+        coords = self.canvas.coords
+        radius = self.point_size
+        for marker in self.canvas.find_withtag(self.marker_tag):
+            x1, y1, x2, y2 = coords(marker)
+            center_x, center_y = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+            coords(marker, center_x - radius, center_y - radius,
+                   center_x + radius, center_y + radius)
+
+        self.marker_scale = self.scale
+
+    # Whether the render points of a drawn edge and its hypercycle are accurate
+    # enough for the current scale.
+    def is_edge_accurate(self, edge):
+        if not edge.drawn_items:
+            return True
+
+        if not self.are_render_points_valid(edge.edge_points_N,
+                                            edge.edge_max_scale):
+            return False
+
+        return edge.hypercycle_radius <= 0 or self.are_render_points_valid(
+            edge.hypercycle_upper_points_N, edge.hypercycle_max_scale)
+
+    # The number of pixels per unit in the plane of the projection.
+    def model_scale(self):
+        if self.projection == "native":
+            return self.scale
+        return self.scale * self.disk_radius_per_scale
+
+    # The distances from the origin in the plane of the projection, of points
+    # with the passed radial coordinates.
+    def model_radii_from_hyperbolic_radii(self, r):
+        if self.projection == "poincare":
+            return native_coordinates.poincare_radii_from_hyperbolic_radii(r)
+        if self.projection == "klein":
+            return native_coordinates.klein_radii_from_hyperbolic_radii(r)
+        return np.asarray(r, dtype=np.float64)
+
+    def hyperbolic_radii_from_model_radii(self, radii):
+        if self.projection == "poincare":
+            return native_coordinates.hyperbolic_radii_from_poincare_radii(
+                radii)
+        if self.projection == "klein":
+            return native_coordinates.hyperbolic_radii_from_klein_radii(radii)
+        return np.asarray(radii, dtype=np.float64)
+
+    # Converts points given by their radial and angular coordinates, i.e.,
+    # arrays of shape (..., 2), to the plane of the projection.
+    def model_points_from_polar_points(self, points):
+        return tessellating.model_points_from_polar_points(
+            points, self.projection)
+
+    # The distance between the center of the canvas and the points with the
+    # passed radial coordinate on the canvas.
+    def canvas_radius_from_hyperbolic_radius(self, r):
+        return float(
+            self.model_radii_from_hyperbolic_radii(r)) * (self.model_scale())
+
+    # The largest radial coordinate of points that are visible on the canvas.
+    # The canvas is centered at the origin, so everything whose smallest
+    # radial coordinate is larger lies outside of the canvas and is culled.
+    def visible_radius(self):
+        canvas_radius = math.hypot(self.canvas.winfo_width() / 2.0,
+                                   self.canvas.winfo_height() / 2.0)
+        model_radius = (canvas_radius +
+                        self.culling_margin) / self.model_scale()
+
+        if self.projection != "native" and model_radius >= 1.0:
+            return math.inf
+        return float(self.hyperbolic_radii_from_model_radii(model_radius))
+
+    # Whether an item or edge is not drawn yet or needs to be updated.
+    def needs_drawing(self, item):
+        return not item.drawn_items or item.needs_update
+
+    # The drawing functions for an item or edge with the passed drawn items.
+    # If it is drawn already, the functions reuse its canvas items, which are
+    # collected in the returned pool.  Otherwise, the pool is None.
+    def functions_for_drawn_items(self, drawn_items, path_func, circle_func):
+        if not drawn_items:
+            return None, path_func, circle_func
+
+        pool = canvas_item_pool(self.canvas, drawn_items, self.current_layer,
+                                self.statistics)
+        return pool, pool.draw_path, pool.draw_circle
+
+    # Whether a point or a circle can be visible on the canvas.  For circles,
+    # either the center or the circle itself may be visible.
+    def is_item_visible(self, item, visible_radius):
+        if item.coordinate_H.r <= visible_radius:
+            return True
+
+        return is_circle_item(item) and abs(item.coordinate_H.r -
+                                            item.radius) <= visible_radius
+
+    # The edges that can be visible on the canvas, including their
+    # hypercycles.  The smallest radial coordinate of an edge is only computed
+    # again, when the edge was marked for redraw or update.  Edges that were
+    # marked for update, but are not visible anymore, are removed from the
+    # canvas.
+    def visible_edges(self, edges, items, visible_radius):
+        edges_without_radius = [
+            edge for edge in edges if edge.edge_min_radius is None
+        ]
+        if edges_without_radius:
+            r1, phi1 = coordinate_arrays_of_items_with_indices(
+                items, [edge.index1 for edge in edges_without_radius])
+            r2, phi2 = coordinate_arrays_of_items_with_indices(
+                items, [edge.index2 for edge in edges_without_radius])
+            min_radii = native_coordinates.minimum_radii_on_lines_from_to(
+                r1, phi1, r2, phi2)
+
+            for edge, min_radius in zip(edges_without_radius, min_radii):
+                edge.edge_min_radius = float(min_radius)
+
+        visible_edges = []
+        for edge in edges:
+            if edge.edge_min_radius - max(edge.hypercycle_radius,
+                                          0) <= visible_radius:
+                visible_edges.append(edge)
+            elif edge.needs_update:
+                self.mark_edge_for_reprojection(edge)
+
+        return visible_edges
 
     def canvas_point_from_hyperbolic_coordinate(self, coordinate_H):
 
@@ -115,44 +1041,129 @@ class drawer:
             self.canvas.winfo_width() / 2.0,
             self.canvas.winfo_height() / 2.0)
 
-        coordinate_E = coordinate_H.to_euclidean_coordinate_with_scale(
-            self.scale)
+        coordinate_E = native_coordinates.polar_coordinate(
+            self.canvas_radius_from_hyperbolic_radius(coordinate_H.r),
+            coordinate_H.phi).to_euclidean_coordinate_with_scale(1.0)
 
         coordinate_E.x = center_E.x - coordinate_E.x
         coordinate_E.y = center_E.y - coordinate_E.y
 
         return coordinate_E
 
+    # Converts arrays of radial and angular coordinates to canvas points.  The
+    # last axis of the result contains the x- and y-coordinates.
+    def canvas_points_from_hyperbolic_arrays(self, r, phi):
+        r, phi = np.broadcast_arrays(np.asarray(r, dtype=np.float64),
+                                     np.asarray(phi, dtype=np.float64))
+
+        return self.canvas_points_from_model_points(
+            self.model_points_from_polar_points(np.stack((r, phi), axis=-1)))
+
+    # Converts points in the Euclidean coordinates of the plane of the
+    # projection with scale 1 to canvas points.
+    def canvas_points_from_model_points(self, points_N):
+        points_N = np.asarray(points_N, dtype=np.float64)
+        scale = self.model_scale()
+
+        points_E = np.empty(points_N.shape, dtype=np.float64)
+        points_E[..., 0] = (self.canvas.winfo_width() / 2.0 -
+                            points_N[..., 0] * scale)
+        points_E[..., 1] = (self.canvas.winfo_height() / 2.0 -
+                            points_N[..., 1] * scale)
+        return points_E
+
+    # Converts a list of arrays of points in the plane of the projection to
+    # canvas points, all at once.
+    def canvas_points_from_model_point_lists(self, point_lists_N):
+        if not point_lists_N:
+            return []
+
+        points_E = self.canvas_points_from_model_points(
+            np.concatenate(point_lists_N))
+        return np.split(
+            points_E,
+            np.cumsum([len(points_N) for points_N in point_lists_N])[:-1])
+
+    # Whether render points in the plane of the projection exist and are
+    # accurate enough for the current scale.
+    def are_render_points_valid(self, points_N, max_scale):
+        return points_N is not None and self.model_scale() <= max_scale
+
     def hyperbolic_coordinate_from_canvas_point(self, coordinate_E):
         center_E = euclidean_coordinates.euclidean_coordinate(
             self.canvas.winfo_width() / 2.0,
             self.canvas.winfo_height() / 2.0)
         relative_E = euclidean_coordinates.coordinate_relative_to_coordinate(
             coordinate_E, center_E)
-        coordinate_H = relative_E.to_native_coordinate_with_scale(self.scale)
+        coordinate_H = relative_E.to_native_coordinate_with_scale(
+            self.model_scale())
+        coordinate_H.r = float(
+            self.hyperbolic_radii_from_model_radii(coordinate_H.r))
         return coordinate_H
 
     def draw(self, items, edges, selected_nodes, mouse_location_E,
              snapped_item_radial, snapped_item_angular):
+        self.statistics.start_frame()
+        self.drawn_canvas_size = (self.canvas.winfo_width(),
+                                  self.canvas.winfo_height())
         self.draw_with_functions(items, edges, selected_nodes,
                                  mouse_location_E, self.draw_path,
                                  self.draw_circle)
 
-        # Clear mouse location circle.
-        if self.mouse_location_cirlce_items:
-            for item in self.mouse_location_cirlce_items:
-                self.canvas.delete(item)
-            self.mouse_location_cirlce_items = None
+        # The mouse location circle and the snap guides are drawn again every
+        # time.  Their canvas items are reused, the ones that are not needed
+        # anymore are deleted in the end.
+        selection_pool = canvas_item_pool(
+            self.canvas, self.mouse_location_cirlce_items or [], "selection",
+            self.statistics)
+        snap_pool = canvas_item_pool(self.canvas, self.snap_items or [],
+                                     "snap_guides", self.statistics)
+        self.mouse_location_cirlce_items = None
+        self.snap_items = None
 
-        # Clear snap guides.
-        if self.snap_items:
-            for item in self.snap_items:
-                self.canvas.delete(item)
-            self.snap_items = None
+        self.draw_overlays(items, selected_nodes, mouse_location_E,
+                           snapped_item_radial, snapped_item_angular,
+                           selection_pool, snap_pool)
+
+        selection_pool.delete_unused_items()
+        snap_pool.delete_unused_items()
+
+        self.statistics.end_frame()
+        self.draw_hud()
+
+    # Shows the statistics of the last frame in the top left corner of the
+    # canvas, if is_hud_shown is set, see profiling.  The statistics can be
+    # read from the drawer without showing them, too.
+    def draw_hud(self):
+        if not self.is_hud_shown:
+            if self.hud_item is not None:
+                self.canvas.delete(self.hud_item)
+                self.statistics.count_deleted_items([self.hud_item])
+                self.hud_item = None
+            return
 
+        text = "\n".join(self.statistics.summary())
+        if self.hud_item is None:
+            self.hud_item = self.canvas.create_text(self.hud_margin,
+                                                    self.hud_margin,
+                                                    text=text,
+                                                    anchor=NW,
+                                                    font=self.hud_font,
+                                                    tags="hud")
+            self.statistics.count_created_items([self.hud_item])
+        else:
+            self.canvas.coords(self.hud_item, self.hud_margin, self.hud_margin)
+            self.canvas.itemconfigure(self.hud_item, text=text)
+        self.canvas.tag_raise(self.hud_item)
+
+    # Draws the mouse location circle and the snap guides with the drawing
+    # functions of the passed pools.
+    def draw_overlays(self, items, selected_nodes, mouse_location_E,
+                      snapped_item_radial, snapped_item_angular,
+                      selection_pool, snap_pool):
         # Drawing the selection circle, if there is one.
         if mouse_location_E is not None:
-            self.mouse_location_cirlce_items = self.draw_circle(
+            self.mouse_location_cirlce_items = selection_pool.draw_circle(
                 mouse_location_E, self.selection_radius, 0.0, 2.0 * math.pi,
                 False, "", self.secondary_selection_color, 1.0)
 
@@ -165,7 +1176,8 @@ class drawer:
             selected_coordinate_H = items[selected_index].coordinate_H
             selected_coordinate_E = self.canvas_point_from_hyperbolic_coordinate(
                 selected_coordinate_H)
-            radius = selected_coordinate_H.r * self.scale
+            radius = self.canvas_radius_from_hyperbolic_radius(
+                selected_coordinate_H.r)
 
             self.snap_items = []
 
@@ -197,7 +1209,7 @@ class drawer:
                 drawing_end_angle = ((math.pi - end_angle) +
                                      (2.0 * math.pi)) % (2.0 * math.pi)
 
-                radial_snap_items = self.draw_circle(
+                radial_snap_items = snap_pool.draw_circle(
                     center_E, radius, drawing_start_angle, drawing_end_angle,
                     circle_from_select_to_snapped, "",
                     self.secondary_selection_color, 1.0)
@@ -209,65 +1221,279 @@ class drawer:
                 snapped_coordinate_H = items[snapped_item_angular].coordinate_H
                 snapped_coordinate_E = self.canvas_point_from_hyperbolic_coordinate(
                     snapped_coordinate_H)
-                angular_snap_items = self.draw_line_from_coordinate_to_coordinate(
-                    selected_coordinate_E, snapped_coordinate_E,
+                angular_snap_items = snap_pool.draw_path(
+                    [[selected_coordinate_E.x, selected_coordinate_E.y],
+                     [snapped_coordinate_E.x, snapped_coordinate_E.y]], False,
                     self.secondary_selection_color, 1.0)
-                self.snap_items.append(angular_snap_items)
+                self.snap_items += angular_snap_items
 
     def draw_embedded_graph(self, center_E, path_func, circle_func):
-        if not self.embedded_graph:
+        if not self.embedded_graph and "embedded_graph" not in self.tile_pyramids:
             return
 
-        if self.embedded_graph_items:
+        if "embedded_graph" not in self.dirty_layers:
             return
 
-        self.embedded_graph_items = []
+        self.dirty_layers.discard("embedded_graph")
+
+        # Only the tiles of the graph are known, e.g., since they were loaded.
+        if not self.embedded_graph:
+            if path_func == self.draw_path:
+                self.draw_tiles(None)
+            return
 
-        items = []
-        for node in self.embedded_graph.embedding:
-            coordinate_H = self.embedded_graph.embedding[node]
-            items.append(point(coordinate_H, 0))
+        # The graph was assigned without set_embedded_graph.
+        if self.embedded_graph_model is None or (
+                self.embedded_graph_model.graph is not self.embedded_graph):
+            self.embedded_graph_model = graph_render_model(self.embedded_graph)
+            self.tile_pyramids.pop("embedded_graph", None)
+
+        self.draw_graph_layer(self.embedded_graph_model, center_E, path_func,
+                              circle_func)
+
+    # Draws the points and edges of a graph in the current layer.  Graphs with
+    # many edges are drawn into images, when they are drawn onto the canvas
+    # and Pillow is available.  The images are kept as tiles, such that they
+    # are only drawn once for each zoom level.
+    def draw_graph_layer(self, model, center_E, path_func, circle_func):
+        items, edges = model.items, model.edges
+        if (path_func == self.draw_path
+                and len(edges) >= self.rasterization_threshold
+                and rasterizing.is_available()):
+            self.draw_tiles(model)
+            return
 
-        self.embedded_graph_items += self.draw_points(items, [], center_E,
-                                                      circle_func)
+        # Exports contain all points and edges.
+        items_to_draw, edges_to_draw = items, edges
+        if path_func == self.draw_path:
+            items_to_draw, edges_to_draw = self.items_and_edges_with_level_of_detail(
+                items, edges, model.edge_indices)
+            if len(items_to_draw) < len(items) or len(edges_to_draw) < len(
+                    edges):
+                model.reduced_scale = min(model.reduced_scale or self.scale,
+                                          self.scale)
+
+            visible_radius = self.visible_radius()
+            edges_to_draw = self.visible_edges(edges_to_draw, items,
+                                               visible_radius)
+
+            # If the layer is drawn already, e.g., after the canvas grew,
+            # only the points and edges that became visible are added.
+            if model.drawn_radius is not None:
+                items_to_draw = [
+                    item for item in items_to_draw
+                    if item.coordinate_H.r > model.drawn_radius
+                ]
+                edges_to_draw = [
+                    edge for edge in edges_to_draw if edge.edge_min_radius -
+                    max(edge.hypercycle_radius, 0) > model.drawn_radius
+                ]
+            model.drawn_radius = visible_radius
+
+        self.draw_points(items_to_draw, [], center_E, circle_func)
+
+        # Large layers are drawn in the background, when they are drawn onto
+        # the canvas.
+        if path_func == self.draw_path:
+            if len(edges_to_draw) > self.progressive_batch_size:
+                self.progressive_drawings[
+                    self.current_layer] = progressive_drawing(
+                        self, self.current_layer, edges_to_draw, items,
+                        center_E)
+                return
+
+        self.draw_edges(edges_to_draw, items, center_E, path_func, circle_func)
+
+    # Draws the current layer from its tiles.  Missing tiles are drawn from
+    # the passed graph in the background and shown once they are done, see
+    # draw_missing_tiles.  Until then, they are stood in for by the tiles of
+    # other levels.  If model is None, e.g., since only the saved tiles of the
+    # layer are known, missing tiles stay empty.
+    def draw_tiles(self, model):
+        pyramid = self.tile_pyramids.get(self.current_layer)
+        if pyramid is None or pyramid.projection != self.projection:
+            if model is None:
+                return
+            pyramid = tiling.tile_pyramid(self.projection)
+            self.tile_pyramids[self.current_layer] = pyramid
+
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        image = rasterizing.raster_image(
+            self.canvas, self.scale,
+            pyramid.image_at_scale(width, height, self.scale))
+        self.statistics.count_created_items(
+            [image.place_on_canvas(self.current_layer)])
+        self.raster_images[self.current_layer] = image
+
+        if model is None:
+            return
 
-        # Create the edges.
-        edges = []
-        for u, v in self.embedded_graph.graph.edges:
-            edges.append(edge(u, v))
+        keys = pyramid.missing_keys(width, height, self.scale)
+        if keys:
+            self.progressive_drawings[
+                self.current_layer] = self.draw_missing_tiles(
+                    model, pyramid, keys)
+
+    # Draws the tiles with the passed keys, which belong to the same level,
+    # into one image in the background, see progressive_drawing.  Once they
+    # are done, they are added to the pyramid and the image of the layer is
+    # put together again.
+    def draw_missing_tiles(self, model, pyramid, keys):
+        layer = self.current_layer
+        half_width, half_height = pyramid.half_size_of_keys(keys)
+        image = rasterizing.raster_image(
+            tiling.off_screen_canvas(self.canvas, 2 * half_width,
+                                     2 * half_height),
+            pyramid.scale_of_level(keys[0][0]))
+
+        def finish():
+            forget_drawn_items(model.items, model.edges)
+            pyramid.add_tiles_from_image(keys, image.image)
+            if layer in self.raster_images:
+                self.raster_images[layer].show_image(
+                    pyramid.image_at_scale(self.canvas.winfo_width(),
+                                           self.canvas.winfo_height(),
+                                           self.scale))
+
+        with self.drawing_into(image):
+            # The canvas points of the graph belong to a different scale.
+            forget_drawn_items(model.items, model.edges)
+
+            items_to_draw, edges_to_draw = self.items_and_edges_with_level_of_detail(
+                model.items, model.edges, model.edge_indices)
+            edges_to_draw = self.visible_edges(edges_to_draw, model.items,
+                                               self.visible_radius())
+
+        return progressive_drawing(
+            self, layer, edges_to_draw, model.items,
+            euclidean_coordinates.euclidean_coordinate(half_width,
+                                                       half_height), image,
+            items_to_draw, finish)
+
+    # Within the with block, everything is drawn into the passed raster
+    # image, as if it was the canvas and its scale was the current one.
+    # Nothing changes, if the image is None.
+    @contextmanager
+    def drawing_into(self, image):
+        if image is None:
+            yield
+            return
 
-        self.embedded_graph_items += self.draw_edges(edges, items, center_E,
-                                                     path_func)
+        canvas, scale = self.canvas, self.scale
+        self.canvas, self.scale = image.canvas, image.scale
+        try:
+            yield
+        finally:
+            self.canvas, self.scale = canvas, scale
+
+    # Reduces the points and edges of a graph to those that make a difference
+    # at the current scale.  Points on the canvas that fall into the same cell
+    # of a grid with level_of_detail_cell_size pixels are aggregated to a
+    # single point.  Edges are only reduced, if all of their points lie within
+    # a cell, see screen_extents_of_lines.  Of those, the ones between points
+    # of the same cell are dropped and of all between the same two cells only
+    # one is kept.  Longer edges are always kept, since, e.g., lines in the
+    # native representation bend towards the origin and pass through cells
+    # far away from their end points.  When zooming in, the cells contain
+    # fewer points and more details are drawn.  The array edge_indices
+    # contains the indices of the end points of each edge.
+    def items_and_edges_with_level_of_detail(self, items, edges, edge_indices):
+        if len(items) == 0:
+            return items, edges
+
+        # Each cell on the canvas gets an id.  Points outside of the canvas
+        # are not aggregated, they get an id of their own.
+        r, phi = coordinate_arrays_of_items_with_indices(
+            items, range(len(items)))
+        cells = np.floor(
+            self.canvas_points_from_hyperbolic_arrays(r, phi) /
+            self.level_of_detail_cell_size)
+        number_of_columns = math.ceil(self.canvas.winfo_width() /
+                                      self.level_of_detail_cell_size)
+        number_of_rows = math.ceil(self.canvas.winfo_height() /
+                                   self.level_of_detail_cell_size)
+        is_on_canvas = ((cells[:, 0] >= 0) & (cells[:, 0] < number_of_columns)
+                        & (cells[:, 1] >= 0) & (cells[:, 1] < number_of_rows))
+
+        number_of_cells = number_of_columns * number_of_rows
+        cells_of_items = number_of_cells + np.arange(len(items),
+                                                     dtype=np.int64)
+        cells_of_items[is_on_canvas] = (
+            cells[is_on_canvas, 1] * number_of_columns +
+            cells[is_on_canvas, 0]).astype(np.int64)
+
+        _, representatives = np.unique(cells_of_items, return_index=True)
+        items_to_draw = [items[index] for index in np.sort(representatives)]
+
+        if len(edges) == 0:
+            return items_to_draw, edges
+
+        edge_indices = np.asarray(edge_indices)
+        is_short = (self.screen_extents_of_lines(r[edge_indices[:, 0]],
+                                                 phi[edge_indices[:, 0]],
+                                                 r[edge_indices[:, 1]],
+                                                 phi[edge_indices[:, 1]])
+                    < self.level_of_detail_cell_size)
+
+        indices_of_short_edges = np.flatnonzero(is_short)
+        cells_of_edges = np.sort(
+            cells_of_items[edge_indices[indices_of_short_edges]], axis=1)
+        indices_of_short_edges = indices_of_short_edges[cells_of_edges[:, 0] !=
+                                                        cells_of_edges[:, 1]]
+        cells_of_edges = cells_of_edges[cells_of_edges[:,
+                                                       0] != cells_of_edges[:,
+                                                                            1]]
+        _, edge_representatives = np.unique(cells_of_edges[:, 0] *
+                                            (number_of_cells + len(items)) +
+                                            cells_of_edges[:, 1],
+                                            return_index=True)
+
+        indices_of_edges_to_draw = np.sort(
+            np.concatenate((np.flatnonzero(~is_short),
+                            indices_of_short_edges[edge_representatives])))
+        edges_to_draw = [edges[index] for index in indices_of_edges_to_draw]
+
+        return items_to_draw, edges_to_draw
+
+    # Upper bounds of the sizes (in pixels) of the lines between the passed
+    # points on the canvas.  A line does not get closer to the origin than
+    # its smallest radial coordinate, see
+    # native_coordinates.minimum_radii_on_lines_from_to, not farther than its
+    # end points, and its angular coordinate changes monotonically between the
+    # ones of its end points.  So it lies in the part of an annulus, whose
+    # diameter is bounded by its width plus the length of its outer arc.
+    def screen_extents_of_lines(self, r1, phi1, r2, phi2):
+        inner_radii = self.model_radii_from_hyperbolic_radii(
+            native_coordinates.minimum_radii_on_lines_from_to(
+                r1, phi1, r2, phi2))
+        outer_radii = self.model_radii_from_hyperbolic_radii(np.maximum(
+            r1, r2))
+        angles = np.abs(phi1 - phi2) % (2.0 * math.pi)
+        angles = np.minimum(angles, 2.0 * math.pi - angles)
+
+        return (outer_radii - inner_radii +
+                outer_radii * angles) * self.model_scale()
 
     def draw_regular_grid(self, center_E, path_func, circle_func):
         if self.regular_grid_depth <= 0:
             return
 
-        if self.regular_grid_items:
+        if "regular_grid" not in self.dirty_layers:
             return
 
-        self.regular_grid_items = []
+        self.dirty_layers.discard("regular_grid")
 
         if not self.regular_grid:
             self.regular_grid = embedded_graph.embedded_graph.create_grid(
                 self.regular_grid_depth)
 
-        # Create the points describing the coordinates.
-        items = []
-        for node in self.regular_grid.embedding:
-            coordinate_H = self.regular_grid.embedding[node]
-            items.append(point(coordinate_H, 0))
-
-        self.regular_grid_items += self.draw_points(items, [], center_E,
-                                                    circle_func)
+        if self.regular_grid_model is None or (self.regular_grid_model.graph
+                                               is not self.regular_grid):
+            self.regular_grid_model = graph_render_model(self.regular_grid)
+            self.tile_pyramids.pop("regular_grid", None)
 
-        # Create the edges.
-        edges = []
-        for u, v in self.regular_grid.graph.edges:
-            edges.append(edge(u, v))
-
-        self.regular_grid_items += self.draw_edges(edges, items, center_E,
-                                                   path_func)
+        self.draw_graph_layer(self.regular_grid_model, center_E, path_func,
+                              circle_func)
 
     def draw_grid(self, center_E, path_func, circle_func):
         # Drawing the grid
@@ -275,22 +1501,34 @@ class drawer:
             return
 
         # Don't redraw if we already drew it.
-        if self.grid_items is not None:
+        if "grid" not in self.dirty_layers:
             return
 
+        self.dirty_layers.discard("grid")
+
         grid_color = "gray"
         alpha = 0.75
         layer_width = math.log(2) / alpha
         number_of_layers = math.floor(self.grid_radius / layer_width)
 
-        grid_items = []
+        # Layers that are completely outside of the canvas are skipped.  The
+        # circle around a layer is only visible if its radius is at most the
+        # visible radius.
+        visible_radius = self.visible_radius()
 
         # Drawing the layers
         for layer in range(number_of_layers):
             outer_radius = self.grid_radius - layer * layer_width
             inner_radius = self.grid_radius - (layer + 1) * layer_width
-            grid_items += circle_func(center_E, self.scale * outer_radius, 0.0,
-                                      2.0 * math.pi, True, "", grid_color, 1.0)
+
+            if inner_radius > visible_radius:
+                continue
+
+            if outer_radius <= visible_radius:
+                circle_func(
+                    center_E,
+                    self.canvas_radius_from_hyperbolic_radius(outer_radius),
+                    0.0, 2.0 * math.pi, True, "", grid_color, 1.0)
 
             # Drawing the cell borders
             number_of_cells_in_layer = math.ceil(
@@ -302,42 +1540,107 @@ class drawer:
                 outer_cell_point_H = native_coordinates.polar_coordinate(
                     outer_radius, cell * angular_cell_width)
 
-                inner_cell_point_E = self.canvas_point_from_hyperbolic_coordinate(
-                    inner_cell_point_H)
-                outer_cell_point_E = self.canvas_point_from_hyperbolic_coordinate(
-                    outer_cell_point_H)
+                cell_border_points_E = self.canvas_points_from_hyperbolic_arrays(
+                    [inner_cell_point_H.r, outer_cell_point_H.r],
+                    [inner_cell_point_H.phi, outer_cell_point_H.phi])
 
-                grid_items += path_func(
-                    [inner_cell_point_E, outer_cell_point_E], False,
-                    grid_color, 1.0)
+                path_func(cell_border_points_E, False, grid_color, 1.0)
 
         # Drawing the inner radius of the inner most layer
-        grid_items += circle_func(
+        circle_func(
             center_E,
-            self.scale * (self.grid_radius - number_of_layers * layer_width),
-            0.0, 2.0 * math.pi, True, "", grid_color, 1.0)
-
-        self.grid_items = grid_items
+            self.canvas_radius_from_hyperbolic_radius(self.grid_radius -
+                                                      number_of_layers *
+                                                      layer_width), 0.0,
+            2.0 * math.pi, True, "", grid_color, 1.0)
 
-    def draw_circles(self, items, selected_nodes, center_E, mouse_location_E,
+    def draw_circles(self, items, selected_items, center_E, mouse_location_E,
                      path_func, circle_func):
-        for index, item in enumerate(items):
+        # Circles that are outside of the canvas are neither rendered nor
+        # drawn.
+        visible_radius = self.visible_radius()
+
+        # In the Poincaré disk, circles are Euclidean circles, which are
+        # drawn directly.
+        with self.statistics.stage("projection"):
+            if self.projection == "poincare":
+                self.project_circles_to_poincare_disk(items, visible_radius)
+
+        # Determine the canvas points of all circles that are not drawn yet and
+        # have no canvas points, in one go.  Only circles whose render points
+        # are missing or not accurate enough anymore are tessellated again,
+        # the others are only projected to the canvas.
+        circles_to_project = [
+            item for item in items
+            if is_circle_item(item) and self.needs_drawing(item)
+            and len(item.circle_points_E) == 0 and item.circle_disk_E is None
+            and self.is_item_visible(item, visible_radius)
+        ]
+        circles_to_render = [
+            item
+            for item in circles_to_project if not self.are_render_points_valid(
+                item.circle_points_N, item.circle_max_scale)
+        ]
+        self.statistics.count_render_points(
+            len(circles_to_project) - len(circles_to_render),
+            len(circles_to_render))
+
+        with self.statistics.stage("tessellation"):
+            if circles_to_render:
+                circle_points_H, max_scales = native_coordinates.adaptive_render_points_for_circles_with_centers_and_radii(
+                    [item.coordinate_H.r for item in circles_to_render],
+                    [item.coordinate_H.phi for item in circles_to_render],
+                    [item.radius for item in circles_to_render],
+                    self.model_scale(),
+                    self.max_pixel_error,
+                    model_points_from_polar_points=self.
+                    model_points_from_polar_points)
+
+                for item, item_circle_points_H, max_scale in zip(
+                        circles_to_render, circle_points_H, max_scales):
+                    item.circle_points_N = self.model_points_from_polar_points(
+                        item_circle_points_H)
+                    item.circle_max_scale = max_scale
+                    item.circle_points_N_source = (item.coordinate_H.r,
+                                                   item.coordinate_H.phi,
+                                                   item.radius)
+
+        with self.statistics.stage("projection"):
+            for item, item_circle_points_E in zip(
+                    circles_to_project,
+                    self.canvas_points_from_model_point_lists([
+                        item.circle_points_N for item in circles_to_project
+                    ])):
+                item.circle_points_E = item_circle_points_E
+
+        for item in items:
             if not is_circle_item(item):
                 continue
 
             # Don't draw an item if its already drawn.
-            if item.drawn_items:
+            if not self.needs_drawing(item):
+                continue
+
+            # Items that are not visible are not drawn, or removed if they
+            # were moved out of the canvas.
+            if not self.is_item_visible(item, visible_radius):
+                if item.drawn_items:
+                    self.mark_circle_for_redraw(item)
                 continue
 
+            self.statistics.count("drawn circles")
+            pool, item_path_func, item_circle_func = self.functions_for_drawn_items(
+                item.drawn_items, path_func, circle_func)
+
             # Check whether we should highlight the whole circle instead of only the point.
             should_highlight_primary_selection = False
 
             coordinate_E = self.canvas_point_from_hyperbolic_coordinate(
                 item.coordinate_H)
 
-            if index in selected_nodes:
-                if selected_nodes[-1] == index:
-                    item.drawn_items = circle_func(
+            if item in selected_items:
+                if selected_items[-1] is item:
+                    item.drawn_items = item_circle_func(
                         coordinate_E, self.point_size, 0.0, 2.0 * math.pi,
                         True, self.primary_selection_color,
                         self.primary_selection_color,
@@ -345,161 +1648,363 @@ class drawer:
                     if mouse_location_E is not None:
                         should_highlight_primary_selection = True
                 else:
-                    item.drawn_items = circle_func(
+                    item.drawn_items = item_circle_func(
                         coordinate_E, self.point_size, 0.0, 2.0 * math.pi,
                         True, self.secondary_selection_color,
                         self.secondary_selection_color,
                         self.selection_border_size)
             else:
-                item.drawn_items = circle_func(coordinate_E, self.point_size,
-                                               0.0, 2.0 * math.pi, True,
-                                               self.colors[item.color],
-                                               self.colors[item.color],
-                                               self.selection_border_size)
-
-            converted_points_E = []
+                item.drawn_items = item_circle_func(coordinate_E,
+                                                    self.point_size, 0.0,
+                                                    2.0 * math.pi, True,
+                                                    self.colors[item.color],
+                                                    self.colors[item.color],
+                                                    self.selection_border_size)
+            self.tag_as_markers(item.drawn_items, circle_func)
 
-            if len(item.circle_points_E) > 0:
-                converted_points_E = item.circle_points_E
-            else:
-                circle_size = item.radius
-                circle_points_H = native_coordinates.render_points_for_circle_with_center_and_radius(
-                    item.coordinate_H, circle_size)
-                for i in range(len(circle_points_H)):
-                    circle_point_H = circle_points_H[i]
-                    circle_point_E = self.canvas_point_from_hyperbolic_coordinate(
-                        circle_point_H)
-                    converted_points_E.append(circle_point_E)
-                item.circle_points_E = converted_points_E
+            converted_points_E = item.circle_points_E
 
             circle_color = self.colors[item.color]
 
             if should_highlight_primary_selection:
                 circle_color = self.secondary_selection_color
 
-            item.drawn_items += path_func(converted_points_E, True,
-                                          circle_color, 2.0)
+            if item.circle_disk_E is not None:
+                disk_center_E, disk_radius = item.circle_disk_E
+                item.drawn_items += item_circle_func(disk_center_E,
+                                                     disk_radius, 0.0,
+                                                     2.0 * math.pi, True, "",
+                                                     circle_color, 2.0)
+            else:
+                item.drawn_items += item_path_func(converted_points_E, True,
+                                                   circle_color, 2.0)
+
+            if pool is not None:
+                pool.delete_unused_items()
+            item.needs_update = False
+
+    # Determines the Euclidean circles on the canvas that represent the
+    # visible circles that are not drawn yet in the Poincaré disk.
+    def project_circles_to_poincare_disk(self, items, visible_radius):
+        circles_to_project = [
+            item for item in items if is_circle_item(item)
+            and self.needs_drawing(item) and item.circle_disk_E is None
+            and self.is_item_visible(item, visible_radius)
+        ]
+        if not circles_to_project:
+            return
 
-    def draw_points(self, items, selected_nodes, center_E, circle_func):
-        drawn_point_items = []
-        for index, item in enumerate(items):
+        disk_centers_N, disk_radii_N = native_coordinates.poincare_circles_with_centers_and_radii(
+            [item.coordinate_H.r for item in circles_to_project],
+            [item.coordinate_H.phi for item in circles_to_project],
+            [item.radius for item in circles_to_project])
+        disk_centers_E = self.canvas_points_from_model_points(disk_centers_N)
+        disk_radii_E = disk_radii_N * self.model_scale()
+
+        for item, disk_center_E, disk_radius_E in zip(circles_to_project,
+                                                      disk_centers_E,
+                                                      disk_radii_E):
+            item.circle_disk_E = (euclidean_coordinates.euclidean_coordinate(
+                disk_center_E[0], disk_center_E[1]), float(disk_radius_E))
+
+    def draw_points(self, items, selected_items, center_E, circle_func):
+        visible_radius = self.visible_radius()
+        points_to_draw = []
+        for item in items:
             if is_circle_item(item):
                 continue
 
             # Don't draw an item if already has drawn items.
-            if item.drawn_items:
+            if not self.needs_drawing(item):
                 continue
 
-            coordinate_E = self.canvas_point_from_hyperbolic_coordinate(
-                item.coordinate_H)
+            # Items that are not visible are not drawn, or removed if they
+            # were moved out of the canvas.
+            if item.coordinate_H.r > visible_radius:
+                if item.drawn_items:
+                    self.mark_point_for_redraw(item)
+                continue
 
-            if index in selected_nodes:
-                if selected_nodes[len(selected_nodes) - 1] == index:
-                    item.drawn_items = circle_func(
-                        coordinate_E, self.point_size, 0.0, 2.0 * math.pi,
-                        True, self.primary_selection_color,
-                        self.primary_selection_color,
-                        self.selection_border_size)
-                else:
-                    item.drawn_items = circle_func(
-                        coordinate_E, self.point_size, 0.0, 2.0 * math.pi,
-                        True, self.secondary_selection_color,
-                        self.secondary_selection_color,
-                        self.selection_border_size)
-            else:
-                item.drawn_items = circle_func(coordinate_E, self.point_size,
-                                               0.0, 2.0 * math.pi, True,
-                                               self.colors[item.color],
-                                               self.colors[item.color],
-                                               self.selection_border_size)
+            points_to_draw.append(item)
 
-            drawn_point_items += item.drawn_items
+        if not points_to_draw:
+            return
 
-        return drawn_point_items
+        self.statistics.count("drawn points", len(points_to_draw))
+        with self.statistics.stage("projection"):
+            points_E = self.canvas_points_from_hyperbolic_arrays(
+                [item.coordinate_H.r for item in points_to_draw],
+                [item.coordinate_H.phi for item in points_to_draw])
+        colors = [
+            self.color_of_point(item, selected_items)
+            for item in points_to_draw
+        ]
+
+        # Points that are drawn for the first time are drawn onto the canvas
+        # all at once.
+        if circle_func == self.draw_circle:
+            new_indices = [
+                index for index, item in enumerate(points_to_draw)
+                if not item.drawn_items
+            ]
+            for index, marker in zip(
+                    new_indices,
+                    self.draw_markers(points_E[new_indices],
+                                      [colors[index] for index in new_indices],
+                                      self.point_size,
+                                      self.selection_border_size)):
+                points_to_draw[index].drawn_items = [marker]
+                points_to_draw[index].needs_update = False
+
+        for item, point_E, color in zip(points_to_draw, points_E, colors):
+            if not self.needs_drawing(item):
+                continue
 
-    def draw_edges(self, edges, items, center_E, path_func):
-        drawn_edge_items = []
+            pool, _, item_circle_func = self.functions_for_drawn_items(
+                item.drawn_items, None, circle_func)
+
+            item.drawn_items = item_circle_func(
+                euclidean_coordinates.euclidean_coordinate(
+                    point_E[0], point_E[1]), self.point_size, 0.0,
+                2.0 * math.pi, True, color, color, self.selection_border_size)
+            self.tag_as_markers(item.drawn_items, circle_func)
+
+            if pool is not None:
+                pool.delete_unused_items()
+            item.needs_update = False
+
+    # The color of the marker of a point, which depends on whether it is
+    # selected.
+    def color_of_point(self, item, selected_items):
+        if item in selected_items:
+            if selected_items[-1] is item:
+                return self.primary_selection_color
+            return self.secondary_selection_color
+        return self.colors[item.color]
+
+    # Draws point markers onto the canvas, i.e., filled circles with the
+    # passed radius around the passed canvas points, in the passed colors.
+    # Each marker is a single oval, and the markers are created in one go.
+    # Returns the canvas item of each marker.
+    def draw_markers(self, points_E, colors, radius, width):
+        points_E = np.asarray(points_E, dtype=np.float64).reshape(-1, 2)
+        bounding_boxes = np.concatenate((points_E - radius, points_E + radius),
+                                        axis=1).tolist()
+
+        create_oval = self.canvas.create_oval
+        tags = (self.current_layer, self.marker_tag)
+        with self.statistics.stage("item creation"):
+            markers = [
+                create_oval(bounding_box,
+                            fill=color,
+                            outline=color,
+                            width=width,
+                            tags=tags)
+                for bounding_box, color in zip(bounding_boxes, colors)
+            ]
+
+        return self.statistics.count_created_items(markers)
+
+    def draw_edges(self, edges, items, center_E, path_func, circle_func):
+
+        # Edges that are outside of the canvas are neither rendered nor drawn.
+        edges = self.visible_edges(edges, items, self.visible_radius())
+
+        # Determine the canvas points of all edges that are not drawn yet and
+        # have no canvas points, in one go.  As for circles, only the edges
+        # without accurate render points are tessellated again.
+        edges_to_project = [
+            edge for edge in edges
+            if self.needs_drawing(edge) and len(edge.edge_points_E) == 0
+        ]
+        edges_to_render = [
+            edge
+            for edge in edges_to_project if not self.are_render_points_valid(
+                edge.edge_points_N, edge.edge_max_scale)
+        ]
+        self.statistics.count_render_points(
+            len(edges_to_project) - len(edges_to_render), len(edges_to_render))
+
+        with self.statistics.stage("tessellation"):
+            if edges_to_render:
+                r1, phi1 = coordinate_arrays_of_items_with_indices(
+                    items, [edge.index1 for edge in edges_to_render])
+                r2, phi2 = coordinate_arrays_of_items_with_indices(
+                    items, [edge.index2 for edge in edges_to_render])
+                line_points_N, max_scales = tessellating.parallel_render_points_of_lines(
+                    r1, phi1, r2, phi2, self.projection, self.model_scale(),
+                    self.max_pixel_error)
+
+                for edge, edge_points_N, max_scale in zip(
+                        edges_to_render, line_points_N, max_scales):
+                    edge.edge_points_N = edge_points_N
+                    edge.edge_max_scale = max_scale
+
+        with self.statistics.stage("projection"):
+            for edge, edge_points_E in zip(
+                    edges_to_project,
+                    self.canvas_points_from_model_point_lists(
+                        [edge.edge_points_N for edge in edges_to_project])):
+                edge.edge_points_E = edge_points_E
+
+            if self.projection == "poincare":
+                self.project_edges_to_poincare_arcs(edges_to_project)
+
+        # The same holds for the hypercycles.
+        hypercycles_to_project = [
+            edge for edge in edges if edge.hypercycle_radius > 0 and (
+                not edge.drawn_hypercycle_items or edge.needs_update) and (
+                    edge.hypercycle_upper_points_E is None
+                    or edge.hypercycle_lower_points_E is None)
+        ]
+        hypercycles_to_render = [
+            edge for edge in hypercycles_to_project
+            if not self.are_render_points_valid(edge.hypercycle_upper_points_N,
+                                                edge.hypercycle_max_scale)
+        ]
+        with self.statistics.stage("tessellation"):
+            if hypercycles_to_render:
+                r1, phi1 = coordinate_arrays_of_items_with_indices(
+                    items, [edge.index1 for edge in hypercycles_to_render])
+                r2, phi2 = coordinate_arrays_of_items_with_indices(
+                    items, [edge.index2 for edge in hypercycles_to_render])
+                upper_points_H, lower_points_H, max_scales = native_coordinates.adaptive_render_points_for_hypercycles_around_points(
+                    r1,
+                    phi1,
+                    r2,
+                    phi2,
+                    [edge.hypercycle_radius for edge in hypercycles_to_render],
+                    self.model_scale(),
+                    self.max_pixel_error,
+                    model_points_from_polar_points=self.
+                    model_points_from_polar_points)
+
+                for edge, edge_upper_points_H, edge_lower_points_H, max_scale in zip(
+                        hypercycles_to_render, upper_points_H, lower_points_H,
+                        max_scales):
+                    edge.hypercycle_upper_points_N = self.model_points_from_polar_points(
+                        edge_upper_points_H)
+                    edge.hypercycle_lower_points_N = self.model_points_from_polar_points(
+                        edge_lower_points_H)
+                    edge.hypercycle_max_scale = max_scale
+
+        # The hypercycle points are in the plane of the projection, now we
+        # have to convert them to the canvas.
+        with self.statistics.stage("projection"):
+            hypercycle_points_E = self.canvas_points_from_model_point_lists([
+                edge.hypercycle_upper_points_N
+                for edge in hypercycles_to_project
+            ] + [
+                edge.hypercycle_lower_points_N
+                for edge in hypercycles_to_project
+            ])
+            for index, edge in enumerate(hypercycles_to_project):
+                edge.hypercycle_upper_points_E = hypercycle_points_E[index]
+                edge.hypercycle_lower_points_E = hypercycle_points_E[
+                    len(hypercycles_to_project) + index]
 
         # Drawing the edges
         for edge in edges:
 
-            # Only draw edges that have not been drawn yet.
-            if edge.drawn_items:
+            # Only draw edges that have not been drawn yet or need to be
+            # updated.
+            if not self.needs_drawing(edge):
                 continue
 
+            self.statistics.count("drawn edges")
+            pool, edge_path_func, edge_circle_func = self.functions_for_drawn_items(
+                (edge.drawn_items or []) + (edge.drawn_hypercycle_items or []),
+                path_func, circle_func)
+
             color = "black"
             item1 = items[edge.index1]
             item2 = items[edge.index2]
             if item1.color == item2.color:
                 color = self.colors[item1.color]
 
-            point1_H = item1.coordinate_H
-            point2_H = item2.coordinate_H
+            converted_points_E = edge.edge_points_E
 
-            converted_points_E = []
-            if len(edge.edge_points_E) > 0:
-                converted_points_E = edge.edge_points_E
+            if edge.edge_arc_E is not None:
+                arc_center_E, arc_radius, start_angle, end_angle = edge.edge_arc_E
+                edge.drawn_items = edge_circle_func(arc_center_E, arc_radius,
+                                                    start_angle, end_angle,
+                                                    False, "", color, 2.0)
             else:
-                line_points = native_coordinates.render_points_for_line_from_to(
-                    point1_H, point2_H)
-
-                for i in range(len(line_points)):
-                    line_point_H = line_points[i]
-                    line_point_E = self.canvas_point_from_hyperbolic_coordinate(
-                        line_point_H)
-                    converted_points_E.append(line_point_E)
-
-                edge.edge_points_E = converted_points_E
-
-            edge.drawn_items = path_func(converted_points_E, False, color, 2.0)
-
-            drawn_edge_items += edge.drawn_items
+                edge.drawn_items = edge_path_func(converted_points_E, False,
+                                                  color, 2.0)
 
-            # If the edge does not have a hypercycle, we continue with the next
-            # edge. Otherwise, we draw the hypercycle.
-            if edge.hypercycle_radius <= 0:
-                continue
-
-            # If the hypercycle of the edge is already drawn, we don't need to draw it again.
-            if edge.drawn_hypercycle_items:
-                continue
-
-            hypercycle_upper_points_E = []
-            hypercycle_lower_points_E = []
-
-            if edge.hypercycle_upper_points_E is not None and edge.hypercycle_lower_points_E is not None:
+            # If the edge has a hypercycle, we draw it as well.  The edge and
+            # its hypercycle are always drawn together.
+            edge.drawn_hypercycle_items = None
+            if edge.hypercycle_radius > 0:
                 hypercycle_upper_points_E = edge.hypercycle_upper_points_E
                 hypercycle_lower_points_E = edge.hypercycle_lower_points_E
-            else:
-                hypercycle_upper_points_H, hypercycle_lower_points_H = native_coordinates.render_points_for_hypercycle_around_points(
-                    point1_H, point2_H, edge.hypercycle_radius)
 
-                # The hypercycle_points are in native coordinates, now we
-                # have to convert them to the canvas.
-                for i in range(len(hypercycle_upper_points_H)):
-                    upper_sample_H = hypercycle_upper_points_H[i]
-                    lower_sample_H = hypercycle_lower_points_H[i]
-
-                    upper_sample_E = self.canvas_point_from_hyperbolic_coordinate(
-                        upper_sample_H)
-                    lower_sample_E = self.canvas_point_from_hyperbolic_coordinate(
-                        lower_sample_H)
+                drawn_upper_items = edge_path_func(hypercycle_upper_points_E,
+                                                   False, color, 2.0)
+                drawn_lower_items = edge_path_func(hypercycle_lower_points_E,
+                                                   False, color, 2.0)
+                edge.drawn_hypercycle_items = drawn_upper_items + drawn_lower_items
+
+            if pool is not None:
+                pool.delete_unused_items()
+            edge.needs_update = False
+
+    # Determines the arcs on the canvas that represent the passed edges in the
+    # Poincaré disk.  The arc of an edge is stored as its center, radius and
+    # start and end angle, where the angles are measured counterclockwise on
+    # the canvas.  Edges whose arcs are indistinguishable from straight lines
+    # keep their straight canvas points.
+    def project_edges_to_poincare_arcs(self, edges):
+        if not edges:
+            return
 
-                    hypercycle_upper_points_E.append(upper_sample_E)
-                    hypercycle_lower_points_E.append(lower_sample_E)
+        points1_N = np.array([edge.edge_points_N[0] for edge in edges])
+        points2_N = np.array([edge.edge_points_N[-1] for edge in edges])
+        arc_centers_N, arc_radii_N = native_coordinates.poincare_arcs_through_points(
+            points1_N, points2_N)
+
+        scale = self.model_scale()
+        arc_centers_E = self.canvas_points_from_model_points(
+            np.where(np.isfinite(arc_centers_N), arc_centers_N, 0.0))
+        arc_radii_E = arc_radii_N * scale
+
+        # The distance between the arc and the straight line between its end
+        # points, to decide whether drawing the arc is worth it.
+        chord_lengths_E = np.hypot(*(points2_N - points1_N).T) * scale
+        with np.errstate(invalid="ignore"):
+            sagittas_E = arc_radii_E - np.sqrt(
+                np.maximum(arc_radii_E**2 - (chord_lengths_E / 2.0)**2, 0.0))
+
+        for index, edge in enumerate(edges):
+            if not np.isfinite(arc_radii_E[index]):
+                continue
 
-                edge.hypercycle_upper_points_E = hypercycle_upper_points_E
-                edge.hypercycle_lower_points_E = hypercycle_lower_points_E
+            # A straight line is accurate enough up to the scale at which the
+            # sagitta of the arc reaches the maximum pixel error, since the
+            # sagitta grows linearly with the scale.
+            if sagittas_E[index] < self.max_pixel_error:
+                with np.errstate(divide="ignore"):
+                    edge.edge_max_scale = (scale * self.max_pixel_error /
+                                           sagittas_E[index])
+                continue
 
-            drawn_upper_items = path_func(hypercycle_upper_points_E, False,
-                                          color, 2.0)
-            drawn_lower_items = path_func(hypercycle_lower_points_E, False,
-                                          color, 2.0)
-            edge.drawn_hypercycle_items = drawn_upper_items + drawn_lower_items
+            # The angles of the end points as seen from the center of the arc,
+            # counterclockwise on the canvas, whose y-axis points down.
+            angles = np.mod(
+                np.arctan2(arc_centers_E[index, 1] - edge.edge_points_E[:, 1],
+                           edge.edge_points_E[:, 0] - arc_centers_E[index, 0]),
+                2.0 * math.pi)
+            start_angle, end_angle = float(angles[0]), float(angles[-1])
 
-            drawn_edge_items += edge.drawn_hypercycle_items
+            # The arc is the shorter one of the two between the end points.
+            if np.mod(end_angle - start_angle, 2.0 * math.pi) > math.pi:
+                start_angle, end_angle = end_angle, start_angle
 
-        return drawn_edge_items
+            edge.edge_arc_E = (euclidean_coordinates.euclidean_coordinate(
+                arc_centers_E[index, 0],
+                arc_centers_E[index, 1]), float(arc_radii_E[index]),
+                               start_angle, end_angle)
 
     def draw_with_functions(self, items, edges, selected_nodes,
                             mouse_location_E, path_func, circle_func):
@@ -507,157 +2012,115 @@ class drawer:
             self.canvas.winfo_width() / 2.0,
             self.canvas.winfo_height() / 2.0)
 
+        # Only the items and edges that were marked since the last drawing
+        # need to be drawn.
+        items_to_draw, edges_to_draw = self.dirty_items_and_edges(items, edges)
+
         # Drawing the origin
-        if self.drawn_origin_items is None:
-            self.drawn_origin_items = circle_func(center_E, self.point_size,
-                                                  0.0, 2.0 * math.pi, True,
-                                                  "blue", "blue", 1.0)
+        self.current_layer = "origin"
+        if "origin" in self.dirty_layers:
+            origin_items = circle_func(center_E, self.point_size, 0.0,
+                                       2.0 * math.pi, True, "blue", "blue",
+                                       1.0)
+            self.tag_as_markers(origin_items, circle_func)
+            self.dirty_layers.discard("origin")
 
         # Draw the regular grid
+        self.current_layer = "regular_grid"
         self.draw_regular_grid(center_E, path_func, circle_func)
 
         # Draw the embedded graph
+        self.current_layer = "embedded_graph"
         self.draw_embedded_graph(center_E, path_func, circle_func)
 
         # Draw the grid
+        self.current_layer = "grid"
         self.draw_grid(center_E, path_func, circle_func)
 
+        self.current_layer = "items"
+        selected_items = [items[index] for index in selected_nodes]
+
         # Drawing the circles
-        self.draw_circles(items, selected_nodes, center_E, mouse_location_E,
-                          path_func, circle_func)
+        self.draw_circles(items_to_draw, selected_items, center_E,
+                          mouse_location_E, path_func, circle_func)
 
         # Drawing the points.
-        self.draw_points(items, selected_nodes, center_E, circle_func)
+        self.draw_points(items_to_draw, selected_items, center_E, circle_func)
 
         # Drawing the edges.
-        self.draw_edges(edges, items, center_E, path_func)
+        self.draw_edges(edges_to_draw, items, center_E, path_func, circle_func)
+
+        # Items and edges that were not drawn are outside of the canvas.
+        for item in items_to_draw:
+            if item.drawn_items:
+                self.culled_items.pop(item, None)
+            else:
+                self.culled_items[item] = None
+
+        for edge in edges_to_draw:
+            if edge.drawn_items:
+                self.culled_edges.pop(edge, None)
+            else:
+                self.culled_edges[edge] = None
+
+        # Marks that happened while drawing, e.g., of edges that moved out of
+        # the canvas, are handled already.
+        self.dirty_items = {}
+        self.dirty_edges = {}
+
+    # The items and edges that need to be drawn, i.e., all of them if the items
+    # layer is dirty and the dirty ones otherwise.
+    def dirty_items_and_edges(self, items, edges):
+        if "items" not in self.dirty_layers:
+            return list(self.dirty_items), list(self.dirty_edges)
+
+        self.dirty_layers.discard("items")
+        self.culled_items = {}
+        self.culled_edges = {}
+        return list(items), list(edges)
 
     # Takes a center coordinate (Euclidean) and a radius and draws a circle
-    # with the passed radius around the passed center.
+    # with the passed radius around the passed center.  The drawn items are
+    # tagged with the current layer.
     def draw_circle(self, center_E, radius, start_angle, end_angle,
                     is_clockwise, fill_color, border_color, width):
-
-        upper_left = euclidean_coordinates.euclidean_coordinate(
-            center_E.x - radius, center_E.y - radius)
-        lower_right = euclidean_coordinates.euclidean_coordinate(
-            center_E.x + radius, center_E.y + radius)
-
-        arcs = []
-
-        if len(fill_color) > 0:
-            if start_angle == 0.0 and end_angle == 2.0 * math.pi:
-                arc1 = self.canvas.create_arc(upper_left.x,
-                                              upper_left.y,
-                                              lower_right.x,
-                                              lower_right.y,
-                                              style=PIESLICE,
-                                              start=math.degrees(0.0),
-                                              extent=math.degrees(math.pi),
-                                              fill=fill_color,
-                                              outline=border_color,
-                                              width=width)
-                arc2 = self.canvas.create_arc(upper_left.x,
-                                              upper_left.y,
-                                              lower_right.x,
-                                              lower_right.y,
-                                              style=PIESLICE,
-                                              start=math.degrees(math.pi),
-                                              extent=math.degrees(1.99 *
-                                                                  math.pi),
-                                              fill=fill_color,
-                                              outline=border_color,
-                                              width=width)
-                arcs.append(arc1)
-                arcs.append(arc2)
-            else:
-                arc = self.canvas.create_arc(upper_left.x,
-                                             upper_left.y,
-                                             lower_right.x,
-                                             lower_right.y,
-                                             style=PIESLICE,
-                                             start=math.degrees(start_angle),
-                                             extent=math.degrees(end_angle -
-                                                                 start_angle),
-                                             fill=fill_color,
-                                             outline=border_color,
-                                             width=width)
-                arcs.append(arc)
-        else:
-            if start_angle == 0.0 and end_angle == 2.0 * math.pi:
-                arc1 = self.canvas.create_arc(upper_left.x,
-                                              upper_left.y,
-                                              lower_right.x,
-                                              lower_right.y,
-                                              style=ARC,
-                                              start=math.degrees(0.0),
-                                              extent=math.degrees(math.pi),
-                                              outline=border_color,
-                                              width=width)
-                arc2 = self.canvas.create_arc(upper_left.x,
-                                              upper_left.y,
-                                              lower_right.x,
-                                              lower_right.y,
-                                              style=ARC,
-                                              start=math.degrees(math.pi),
-                                              extent=math.degrees(1.99 *
-                                                                  math.pi),
-                                              outline=border_color,
-                                              width=width)
-                arcs.append(arc1)
-                arcs.append(arc2)
+        with self.statistics.stage("item creation"):
+            if is_full_circle(start_angle, end_angle):
+                bounding_box, options = oval_of_circle(center_E, radius,
+                                                       fill_color,
+                                                       border_color, width)
+                drawn_items = [
+                    self.canvas.create_oval(*bounding_box,
+                                            tags=self.current_layer,
+                                            **options)
+                ]
             else:
-                if start_angle > end_angle:
-                    arc1 = self.canvas.create_arc(
-                        upper_left.x,
-                        upper_left.y,
-                        lower_right.x,
-                        lower_right.y,
-                        style=ARC,
-                        start=math.degrees(start_angle),
-                        extent=math.degrees(2.0 * math.pi - start_angle),
-                        outline=border_color,
-                        width=width)
-                    arc2 = self.canvas.create_arc(
-                        upper_left.x,
-                        upper_left.y,
-                        lower_right.x,
-                        lower_right.y,
-                        style=ARC,
-                        start=0.0,
-                        extent=math.degrees(end_angle),
-                        outline=border_color,
-                        width=width)
-                    arcs.append(arc1)
-                    arcs.append(arc2)
-                else:
-                    arc = self.canvas.create_arc(
-                        upper_left.x,
-                        upper_left.y,
-                        lower_right.x,
-                        lower_right.y,
-                        style=ARC,
-                        start=math.degrees(start_angle),
-                        extent=math.degrees(end_angle - start_angle),
-                        outline=border_color,
-                        width=width)
-                    arcs.append(arc)
-
-        return arcs
-
-    # Takes a set of points (Euclidean) and draws lines from point i to i+1.
+                drawn_items = [
+                    self.canvas.create_arc(*bounding_box,
+                                           tags=self.current_layer,
+                                           **options)
+                    for bounding_box, options in arcs_of_circle(
+                        center_E, radius, start_angle, end_angle, fill_color,
+                        border_color, width)
+                ]
+
+        return self.statistics.count_created_items(drawn_items)
+
+    # Takes an array of points (Euclidean), where each row contains the x- and
+    # y-coordinate of a point, and draws lines from point i to i+1.  The whole
+    # path is a single canvas item, tagged with the current layer.
     def draw_path(self, points_E, is_closed, color, width):
-        path_points_E = []
-        for i in range(1, len(points_E)):
-            path_point_E = self.draw_line_from_coordinate_to_coordinate(
-                points_E[i - 1], points_E[i], color, width)
-            path_points_E.append(path_point_E)
+        coordinates = coordinates_of_path(points_E, is_closed)
+        if coordinates is None:
+            return []
 
-        if is_closed:
-            path_point_E = self.draw_line_from_coordinate_to_coordinate(
-                points_E[-1], points_E[0], color, width)
-            path_points_E.append(path_point_E)
+        with self.statistics.stage("item creation"):
+            drawn_item = self.canvas.create_line(coordinates,
+                                                 fill=color,
+                                                 width=width,
+                                                 tags=self.current_layer)
 
-        return path_points_E
+        return self.statistics.count_created_items([drawn_item])
 
     # Draws a line from coord1 to coord2 (Both Euclidean).
     def draw_line_from_coordinate_to_coordinate(self,
@@ -673,9 +2136,55 @@ class drawer:
                                        width=width)
 
     def clear(self):
-        self.canvas.delete("all")
+        with self.statistics.stage("deletion"):
+            self.canvas.delete("all")
+        self.statistics.count_deleted_canvas()
+        self.hud_item = None
+        self.raster_images = {}
+        for progressive in self.progressive_drawings.values():
+            progressive.cancel()
+        self.progressive_drawings = {}
+        self.mouse_location_cirlce_items = None
+        self.snap_items = None
+
+    # Deletes all canvas items of the passed layer with a single call to the
+    # canvas.
+    def delete_layer(self, layer):
+        with self.statistics.stage("deletion"):
+            self.statistics.count_deleted_items(
+                self.canvas.find_withtag(layer))
+            self.canvas.delete(layer)
+        self.raster_images.pop(layer, None)
+        if layer in self.progressive_drawings:
+            self.progressive_drawings.pop(layer).cancel()
+
+    def delete_canvas_items(self, drawn_items):
+        with self.statistics.stage("deletion"):
+            for drawn_item in drawn_items:
+                self.canvas.delete(drawn_item)
+        self.statistics.count_deleted_items(drawn_items)
+
+    # Hides all canvas items of the passed layer, without deleting them.
+    def hide_layer(self, layer):
+        self.canvas.itemconfigure(layer, state=HIDDEN)
 
+    # Shows the canvas items of the passed layer again, after they were
+    # hidden.
+    def show_layer(self, layer):
+        self.canvas.itemconfigure(layer, state=NORMAL)
+
+    # Marks an item whose coordinate or radius may have changed.
     def mark_item_for_redraw(self, item):
+        if drawing.is_circle_item(item):
+            item.circle_points_N = None
+
+        self.mark_item_for_reprojection(item)
+
+    # Marks an item that needs to be drawn again, even though it did not
+    # change, e.g., after zooming.
+    def mark_item_for_reprojection(self, item):
+        self.dirty_items[item] = None
+
         if not item.drawn_items:
             return
 
@@ -685,38 +2194,150 @@ class drawer:
         else:
             self.mark_point_for_redraw(item)
 
+    # Marks an item whose coordinate or style may have changed, e.g., while
+    # it is dragged or when it is selected.  Other than with
+    # mark_item_for_redraw, its canvas items are kept and updated in place
+    # when it is drawn the next time.  Only the points of circles that are
+    # stale are computed again, see update_circle_render_points.
+    def mark_item_for_update(self, item):
+        if drawing.is_circle_item(item):
+            self.update_circle_render_points(item)
+
+        self.dirty_items[item] = None
+
+        if item.drawn_items:
+            item.needs_update = True
+
+    # Keeps the render and canvas points of a circle whose center and radius
+    # did not change.  If the circle was rotated around the origin, its render
+    # points are rotated along and only projected to the canvas again.
+    # Otherwise, they are computed again when it is drawn.
+    def update_circle_render_points(self, circle):
+        if circle.circle_points_N is None or (circle.circle_points_N_source
+                                              is None):
+            circle.circle_points_E = []
+            circle.circle_disk_E = None
+            return
+
+        r, phi, radius = circle.circle_points_N_source
+        if (circle.coordinate_H.r, circle.coordinate_H.phi,
+                circle.radius) == (r, phi, radius):
+            return
+
+        circle.circle_points_E = []
+        circle.circle_disk_E = None
+        if (circle.coordinate_H.r, circle.radius) != (r, radius):
+            circle.circle_points_N = None
+            return
+
+        circle.circle_points_N = drawing.rotated_model_points(
+            circle.circle_points_N, circle.coordinate_H.phi - phi)
+        circle.circle_points_N_source = (r, circle.coordinate_H.phi, radius)
+
+    # Marks an edge whose end points may have changed, such that its canvas
+    # items are updated in place, see mark_item_for_update.
+    def mark_edge_for_update(self, edge):
+        edge.edge_points_N = None
+        edge.edge_min_radius = None
+        edge.hypercycle_upper_points_N = None
+        edge.hypercycle_lower_points_N = None
+
+        edge.edge_points_E = []
+        edge.edge_arc_E = None
+        edge.hypercycle_upper_points_E = None
+        edge.hypercycle_lower_points_E = None
+
+        self.dirty_edges[edge] = None
+
+        if edge.drawn_items:
+            edge.needs_update = True
+
+    # Marks an edge whose end points or hypercycle radius may have changed.
     def mark_edge_for_redraw(self, edge):
+        edge.edge_points_N = None
+        edge.edge_min_radius = None
+        edge.hypercycle_upper_points_N = None
+        edge.hypercycle_lower_points_N = None
+
+        self.mark_edge_for_reprojection(edge)
+
+    # Marks an edge that needs to be drawn again, even though it did not
+    # change.
+    def mark_edge_for_reprojection(self, edge):
+        self.dirty_edges[edge] = None
+
         edge.edge_points_E = []
+        edge.edge_arc_E = None
 
         if edge.drawn_items:
-            for drawn_item in edge.drawn_items:
-                self.canvas.delete(drawn_item)
+            self.delete_canvas_items(edge.drawn_items)
             edge.drawn_items = None
 
         if edge.drawn_hypercycle_items:
-            for drawn_item in edge.drawn_hypercycle_items:
-                self.canvas.delete(drawn_item)
-                edge.drawn_hypercycle_items = None
+            self.delete_canvas_items(edge.drawn_hypercycle_items)
+            edge.drawn_hypercycle_items = None
         edge.hypercycle_upper_points_E = None
         edge.hypercycle_lower_points_E = None
+        edge.needs_update = False
 
     def mark_point_for_redraw(self, point):
-        for drawn_item in point.drawn_items:
-            self.canvas.delete(drawn_item)
+        self.delete_canvas_items(point.drawn_items)
         point.drawn_items = None
+        point.needs_update = False
 
     def mark_circle_for_redraw(self, circle):
-        for drawn_item in circle.drawn_items:
-            self.canvas.delete(drawn_item)
+        self.delete_canvas_items(circle.drawn_items)
         circle.drawn_items = None
         circle.circle_points_E = []
+        circle.circle_disk_E = None
+        circle.needs_update = False
+
+    # Removes the canvas items of an item that is about to be removed from
+    # the drawing, such that it is not drawn again.
+    def mark_item_for_removal(self, item):
+        self.mark_item_for_reprojection(item)
+        self.dirty_items.pop(item, None)
+        self.culled_items.pop(item, None)
+
+    # Removes the canvas items of an edge that is about to be removed from
+    # the drawing.
+    def mark_edge_for_removal(self, edge):
+        self.mark_edge_for_reprojection(edge)
+        self.dirty_edges.pop(edge, None)
+        self.culled_edges.pop(edge, None)
+
+    # Marks the items and edges that were outside of the canvas when they
+    # were drawn the last time, e.g., after zooming out.
+    def mark_culled_items_for_redraw(self):
+        self.dirty_items.update(self.culled_items)
+        self.dirty_edges.update(self.culled_edges)
+        self.culled_items = {}
+        self.culled_edges = {}
 
     def mark_all_items_for_redraw(self):
         for item in self.items:
-            self.mark_item_for_redraw(item)
+            if is_circle_item(item):
+                item.circle_points_N = None
 
         for edge in self.edges:
-            self.mark_edge_for_redraw(edge)
+            edge.edge_points_N = None
+            edge.edge_min_radius = None
+            edge.hypercycle_upper_points_N = None
+            edge.hypercycle_lower_points_N = None
+
+        self.mark_all_items_for_reprojection()
+
+    # Marks everything to be drawn again, when only the projection to the
+    # canvas changed, e.g., after zooming or resizing.  The render points of
+    # circles and edges are kept and only projected again.
+    def mark_all_items_for_reprojection(self):
+        self.delete_layer("items")
+        forget_drawn_items(self.items, self.edges)
+        self.dirty_layers.add("items")
+        self.dirty_items = {}
+        self.dirty_edges = {}
+
+        self.marker_scale = self.scale
 
         self.mark_origin_for_redraw()
 
@@ -725,37 +2346,36 @@ class drawer:
         self.mark_embedded_graph_for_redraw()
 
     def mark_origin_for_redraw(self):
-        if not self.drawn_origin_items:
-            return
-
-        for drawn_item in self.drawn_origin_items:
-            self.canvas.delete(drawn_item)
-
-        self.drawn_origin_items = None
+        self.delete_layer("origin")
+        self.dirty_layers.add("origin")
 
     def mark_regular_grid_for_redraw(self):
-        if not self.regular_grid_items:
+        if "regular_grid" in self.dirty_layers:
             return
 
-        for drawn_item in self.regular_grid_items:
-            self.canvas.delete(drawn_item)
+        self.delete_layer("regular_grid")
+        self.dirty_layers.add("regular_grid")
 
-        self.regular_grid_items = None
+        # The grid itself did not change, so its render points are kept.
+        if self.regular_grid_model:
+            self.regular_grid_model.forget_drawn_items()
 
     def mark_grid_for_redraw(self):
-        if not self.grid_items:
-            return
-
-        for drawn_item in self.grid_items:
-            self.canvas.delete(drawn_item)
+        self.delete_layer("grid")
+        self.dirty_layers.add("grid")
 
-        self.grid_items = None
+    def mark_graph_layer_for_redraw(self, layer):
+        if layer == "regular_grid":
+            self.mark_regular_grid_for_redraw()
+        elif layer == "embedded_graph":
+            self.mark_embedded_graph_for_redraw()
 
     def mark_embedded_graph_for_redraw(self):
-        if not self.embedded_graph_items:
+        if "embedded_graph" in self.dirty_layers:
             return
 
-        for drawn_item in self.embedded_graph_items:
-            self.canvas.delete(drawn_item)
+        self.delete_layer("embedded_graph")
+        self.dirty_layers.add("embedded_graph")
 
-        self.embedded_graph_items = None
+        if self.embedded_graph_model:
+            self.embedded_graph_model.forget_drawn_items()
@@ -1,13 +1,100 @@
 from collections import deque
 import networkx as nx
+import numpy as np
+import lorentz_transforms
 import native_coordinates
 import math
 
 
+# Maps the nodes of a graph to their coordinates.  Behaves like a dictionary,
+# but the coordinates are stored in a polar_array, which is much smaller than
+# one polar_coordinate per node and can be passed to the batch functions
+# directly.  As long as the nodes are the integers 0, 1, 2, ... in this
+# order, the node is the index of its coordinate and no map from nodes to
+# indices is needed.
+class node_embedding:
+    def __init__(self):
+        self.coordinates = native_coordinates.polar_array()
+        self.indices_of_nodes = None
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __iter__(self):
+        if self.indices_of_nodes is None:
+            return iter(range(len(self.coordinates)))
+        return iter(self.indices_of_nodes)
+
+    def __contains__(self, node):
+        return self.index_of_node(node) is not None
+
+    def __getitem__(self, node):
+        index = self.index_of_node(node)
+        if index is None:
+            raise KeyError(node)
+        return self.coordinates[index]
+
+    def __setitem__(self, node, coordinate):
+        self.set_coordinates_of_nodes([node], coordinate.r, coordinate.phi)
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return iter(self.coordinates)
+
+    def items(self):
+        return zip(self, self.coordinates)
+
+    # Returns the index of the coordinate of the node in the coordinates, or
+    # None if the node is not embedded.
+    def index_of_node(self, node):
+        if self.indices_of_nodes is not None:
+            return self.indices_of_nodes.get(node)
+
+        if _is_index(node) and 0 <= node < len(self.coordinates):
+            return int(node)
+        return None
+
+    # Sets the coordinates of the nodes to (r[i], phi[i]).  Nodes that are
+    # not embedded yet are added.
+    def set_coordinates_of_nodes(self, nodes, r, phi):
+        r = np.broadcast_to(np.asarray(r, dtype=np.float64), (len(nodes), ))
+        phi = np.broadcast_to(np.asarray(phi, dtype=np.float64),
+                              (len(nodes), ))
+
+        indices = np.empty(len(nodes), dtype=np.intp)
+        for position, node in enumerate(nodes):
+            index = self.index_of_node(node)
+            indices[position] = index if index is not None else self._add_node(
+                node)
+
+        self.coordinates.r[indices] = r
+        self.coordinates.phi[indices] = phi
+
+    def _add_node(self, node):
+        index = len(self.coordinates)
+
+        if self.indices_of_nodes is None and not (_is_index(node)
+                                                  and node == index):
+            self.indices_of_nodes = {
+                existing_node: existing_node
+                for existing_node in range(index)
+            }
+        if self.indices_of_nodes is not None:
+            self.indices_of_nodes[node] = index
+
+        return self.coordinates.extend_with_arrays(0.0, 0.0)
+
+
+def _is_index(node):
+    return isinstance(node, (int, np.integer)) and not isinstance(node, bool)
+
+
 class embedded_graph:
     def __init__(self):
         self.graph = nx.Graph()
-        self.embedding = {}
+        self.embedding = node_embedding()
 
     @staticmethod
     def add_grid_root_with_neighbors(grid, p, q, layers):
@@ -87,8 +174,9 @@ class embedded_graph:
             if neighbor == 0:
                 continue
 
-            if grid.embedding[neighbor].r == 0.0 or grid.embedding[
-                    neighbor].phi == 0.0:
+            # Nodes that have not been embedded yet lie at the origin.  Embedded
+            # nodes may lie on the x-axis, so their angular coordinate can be 0.
+            if grid.embedding[neighbor].r == 0.0:
                 nodes_to_embed.append(neighbor)
             else:
                 last_embedded_node = neighbor
@@ -102,33 +190,32 @@ class embedded_graph:
             return
 
         # Translate the current node v to the origin and perform the same
-        # translation to the last embedded node.
+        # translation to the last embedded node.  To this end, we rotate v onto
+        # the reference ray (x-axis) and translate it to the origin.
         v_coordinate = grid.embedding[v]
         last_embedded_coordinate = grid.embedding[last_embedded_node]
 
-        # Rotate both vertices such that v is on the reference ray (x-axis).
-        rotation_angle = v_coordinate.phi
-        last_embedded_coordinate_rotated = native_coordinates.coordinate_rotated_around_origin_by_angle(
-            last_embedded_coordinate, -rotation_angle)
-
-        # Now we translate both vertices such that v is on the origin.
-        distance = v_coordinate.r
-        last_embedded_coordinate_rotated_translated = native_coordinates.coordinate_translated_along_x_axis_by_hyperbolic_distance(
-            last_embedded_coordinate_rotated, -distance)
-
-        # Position the vertices around the translated vertex.
-        for index, node in enumerate(nodes_to_embed):
-            new_coordinate = native_coordinates.coordinate_rotated_around_origin_by_angle(
-                last_embedded_coordinate_rotated_translated,
-                float(index + 1) * angle)
+        to_origin = lorentz_transforms.composed(
+            lorentz_transforms.rotation_around_origin_by_angle(
+                -v_coordinate.phi),
+            lorentz_transforms.translation_along_x_axis_by_hyperbolic_distance(
+                -v_coordinate.r))
+        from_origin = lorentz_transforms.inverse(to_origin)
 
-            new_coordinate_translated = native_coordinates.coordinate_translated_along_x_axis_by_hyperbolic_distance(
-                new_coordinate, distance)
+        last_embedded_r, last_embedded_phi = lorentz_transforms.transformed_polar_arrays(
+            to_origin, last_embedded_coordinate.r,
+            last_embedded_coordinate.phi)
 
-            new_coordinate_translated_rotated = native_coordinates.coordinate_rotated_around_origin_by_angle(
-                new_coordinate_translated, rotation_angle)
+        # Position the vertices around the translated vertex, and undo the
+        # translation and rotation for all of them at once.
+        child_angles = angle * np.arange(1, len(nodes_to_embed) + 1)
+        new_r, new_phi = lorentz_transforms.transformed_polar_arrays(
+            lorentz_transforms.composed(
+                lorentz_transforms.rotations_around_origin_by_angles(
+                    child_angles), from_origin), last_embedded_r,
+            last_embedded_phi)
 
-            grid.embedding[node] = new_coordinate_translated_rotated
+        grid.embedding.set_coordinates_of_nodes(nodes_to_embed, new_r, new_phi)
 
         return nodes_to_embed
 
@@ -174,8 +261,8 @@ class embedded_graph:
             (math.sin(angle) * math.sin(angle)))
 
         # Initialize the embedding by setting all coordinates to be the origin.
-        for v in grid.graph.nodes:
-            grid.embedding[v] = native_coordinates.polar_coordinate(0, 0)
+        grid.embedding.set_coordinates_of_nodes(list(grid.graph.nodes), 0.0,
+                                                0.0)
 
         # We start by embedding the root of the grid.
         embedded_graph.embed_grid_root(grid, p, q, angle, edge_length)
@@ -0,0 +1,347 @@
+# This program visualizes hyperbolic circles using the native representation.
+# Copyright (C) 2018    Maximilian Katzmann
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# You can contact the author via email: max.katzmann@gmail.com
+
+# Isometries of the hyperbolic plane as Lorentz transformations.
+#
+# A point with polar coordinates (r, phi) corresponds to the point
+# (cosh(r), sinh(r) * cos(phi), sinh(r) * sin(phi)) on the hyperboloid
+# t^2 - x^2 - y^2 = 1.  Rotations around the origin, translations along the
+# x-axis and mirroring on the x-axis are then linear maps, given by 3x3
+# matrices.  A sequence of these operations is composed into a single matrix,
+# which is applied to whole arrays of points with one matrix multiplication.
+#
+# The coordinates of the points grow like exp(r), so they lose precision and
+# overflow for large radii.  To avoid this, we use the light cone coordinates
+# u = t + x, w = t - x and y, in which a translation along the x-axis by d
+# only multiplies u by exp(d) and w by exp(-d).  Points are converted to the
+# logarithms of u and w, which are computed from sums of non-negative terms,
+# such that translations are exact for all distances.  Rotations before and
+# after the translation are added to the angular coordinates, which is exact
+# as well.  Only transforms that translate in different directions need a
+# general matrix, which is stored with the factor exp(d) taken out.  No
+# cosh(r) or sinh(r) is ever evaluated.
+#
+# Transforms can also be batched, i.e., a transform whose angles, distances
+# or matrices have shape (n, ...) contains n transforms, where the i-th
+# transform is applied to the i-th set of points.
+
+import functools
+import math
+
+import numpy as np
+
+import native_coordinates
+
+
+# A Lorentz transform, given as the rotation by angle_before, followed by the
+# translation along the x-axis by distance and the rotation by angle_after.
+# Transforms that are not of this form have a matrix instead of a distance,
+# whose entries are at most 1 in absolute value and which is multiplied by
+# exp(log_scale).
+class lorentz_transform:
+    def __init__(self,
+                 distance=0.0,
+                 angle_before=0.0,
+                 angle_after=0.0,
+                 matrix=None,
+                 log_scale=0.0):
+        self.distance = np.asarray(distance, dtype=np.float64)
+        self.angle_before = np.asarray(angle_before, dtype=np.float64)
+        self.angle_after = np.asarray(angle_after, dtype=np.float64)
+        self.matrix = matrix
+        self.log_scale = np.asarray(log_scale, dtype=np.float64)
+
+    def is_rotation(self):
+        return self.matrix is None and not self.distance.any()
+
+    # The 3x3 matrix of the transform in light cone coordinates, together with
+    # the logarithm of the factor that it is multiplied with.
+    def scaled_matrix(self):
+        return (np.matmul(
+            rotation_matrices_by_angles(self.angle_after),
+            np.matmul(self._scaled_middle_matrix(),
+                      rotation_matrices_by_angles(self.angle_before))),
+                self._middle_log_scale())
+
+    def _scaled_middle_matrix(self):
+        if self.matrix is not None:
+            return self.matrix
+
+        absolute_distances = np.abs(self.distance)
+        matrices = np.zeros(self.distance.shape + (3, 3), dtype=np.float64)
+        matrices[..., 0, 0] = np.exp(self.distance - absolute_distances)
+        matrices[..., 1, 1] = np.exp(-self.distance - absolute_distances)
+        matrices[..., 2, 2] = np.exp(-absolute_distances)
+        return matrices
+
+    def _middle_log_scale(self):
+        if self.matrix is not None:
+            return self.log_scale
+        return np.abs(self.distance)
+
+
+# Converting Coordinates
+
+
+# Converts arrays of radial and angular coordinates to points on the
+# hyperboloid in light cone coordinates.  Returns the logarithms of u, w and
+# |y|, and the sign of y.  With u = t + x = exp(-r) + 2 sinh(r) cos^2(phi / 2)
+# and w = t - x = exp(-r) + 2 sinh(r) sin^2(phi / 2), all terms are
+# non-negative.
+def log_light_cone_coordinates_from_polar_arrays(r, phi):
+    r = np.asarray(r, dtype=np.float64)
+    phi = np.asarray(phi, dtype=np.float64)
+
+    cos_half_phi = np.cos(0.5 * phi)
+    sin_half_phi = np.sin(0.5 * phi)
+
+    # y = sinh(r) sin(phi) = 2 sinh(r) sin(phi / 2) cos(phi / 2).
+    with np.errstate(divide='ignore'):
+        log_two_sinh_r = r + np.log(-np.expm1(-2.0 * r))
+        log_abs_cos_half_phi = np.log(np.abs(cos_half_phi))
+        log_abs_sin_half_phi = np.log(np.abs(sin_half_phi))
+        log_u = np.logaddexp(-r, log_two_sinh_r + 2.0 * log_abs_cos_half_phi)
+        log_w = np.logaddexp(-r, log_two_sinh_r + 2.0 * log_abs_sin_half_phi)
+        log_abs_y = log_two_sinh_r + log_abs_sin_half_phi + log_abs_cos_half_phi
+    return log_u, log_w, log_abs_y, np.sign(sin_half_phi * cos_half_phi)
+
+
+# Converts points in light cone coordinates, given as in
+# log_light_cone_coordinates_from_polar_arrays, back to radial and angular
+# coordinates.  The angular coordinates are in [0, 2 pi).
+def polar_arrays_from_log_light_cone_coordinates(log_u, log_w, log_abs_y,
+                                                 sign_y):
+    return polar_arrays_from_scaled_light_cone_coordinates(
+        *_scaled_light_cone_coordinates(log_u, log_w, log_abs_y, sign_y))
+
+
+# Converts the logarithms of the light cone coordinates to the coordinates
+# divided by the largest of u and w, together with the logarithm of it.
+def _scaled_light_cone_coordinates(log_u, log_w, log_abs_y, sign_y):
+    log_scales = np.maximum(log_u, log_w)
+    return (np.exp(log_u - log_scales), np.exp(log_w - log_scales),
+            sign_y * np.exp(log_abs_y - log_scales), log_scales)
+
+
+# Converts points in light cone coordinates, multiplied by exp(-log_scales),
+# to radial and angular coordinates.
+def polar_arrays_from_scaled_light_cone_coordinates(u, w, y, log_scales):
+    t = 0.5 * (u + w)
+    x = 0.5 * (u - w)
+    sinh_r = np.hypot(x, y)
+
+    # Close to the origin, the radial coordinate is derived from sinh(r),
+    # since the logarithm of t + sinh(r) = exp(r) is inaccurate there.
+    with np.errstate(divide='ignore'):
+        log_sinh_r = log_scales + np.log(sinh_r)
+        r = np.where(log_sinh_r < 1.0,
+                     np.arcsinh(np.exp(np.minimum(log_sinh_r, 1.0))),
+                     log_scales + np.log(t + sinh_r))
+
+    phi = np.mod(np.arctan2(y, x), 2.0 * math.pi)
+    return r, phi
+
+
+# Creating Transforms
+
+
+# The transform that rotates every point around the origin by the passed
+# angle.
+@functools.lru_cache(maxsize=4096)
+def rotation_around_origin_by_angle(angle):
+    return _read_only(rotations_around_origin_by_angles(angle))
+
+
+# The transform that moves the origin to the point (distance, 0), i.e., that
+# translates every point along the x-axis by the passed distance.
+@functools.lru_cache(maxsize=4096)
+def translation_along_x_axis_by_hyperbolic_distance(distance):
+    return _read_only(
+        translations_along_x_axis_by_hyperbolic_distances(distance))
+
+
+# The transform that mirrors every point on the x-axis.
+@functools.lru_cache(maxsize=1)
+def mirror_on_x_axis():
+    return _read_only(lorentz_transform(matrix=np.diag([1.0, 1.0, -1.0])))
+
+
+# Creates one rotation for each of the passed angles.
+def rotations_around_origin_by_angles(angles):
+    return lorentz_transform(angle_after=angles)
+
+
+# Creates one translation along the x-axis for each of the passed distances.
+def translations_along_x_axis_by_hyperbolic_distances(distances):
+    return lorentz_transform(distance=distances)
+
+
+# The matrices of the rotations by the passed angles in light cone
+# coordinates.  A rotation maps x to x cos(angle) - y sin(angle) and y to
+# x sin(angle) + y cos(angle), which in light cone coordinates only needs the
+# squares of the cosine and sine of the half angle.
+def rotation_matrices_by_angles(angles):
+    angles = np.asarray(angles, dtype=np.float64)
+    cos_half_angles_squared = np.cos(0.5 * angles)**2
+    sin_half_angles_squared = np.sin(0.5 * angles)**2
+    sin_angles = np.sin(angles)
+
+    matrices = np.empty(angles.shape + (3, 3), dtype=np.float64)
+    matrices[..., 0, 0] = cos_half_angles_squared
+    matrices[..., 0, 1] = sin_half_angles_squared
+    matrices[..., 0, 2] = -sin_angles
+    matrices[..., 1, 0] = sin_half_angles_squared
+    matrices[..., 1, 1] = cos_half_angles_squared
+    matrices[..., 1, 2] = sin_angles
+    matrices[..., 2, 0] = 0.5 * sin_angles
+    matrices[..., 2, 1] = -0.5 * sin_angles
+    matrices[..., 2, 2] = np.cos(angles)
+    return matrices
+
+
+# Composes the passed transforms into a single one.  The transforms are
+# applied in the order in which they are passed, i.e., the first transform is
+# applied first.
+def composed(*transforms):
+    result = lorentz_transform()
+    for transform in transforms:
+        result = _composed_pair(result, transform)
+    return result
+
+
+# The transform that applies first and then second.  Rotations at the start
+# and the end are kept as angles and translations in the same direction are
+# added up.  Otherwise, the matrices of the two translations and the rotation
+# between them are multiplied.
+def _composed_pair(first, second):
+    if first.is_rotation():
+        return lorentz_transform(
+            second.distance,
+            second.angle_before + first.angle_before + first.angle_after,
+            second.angle_after, second.matrix, second.log_scale)
+
+    if second.is_rotation():
+        return lorentz_transform(
+            first.distance, first.angle_before,
+            first.angle_after + second.angle_before + second.angle_after,
+            first.matrix, first.log_scale)
+
+    angles_between = first.angle_after + second.angle_before
+    if first.matrix is None and second.matrix is None and not np.any(
+            np.mod(angles_between, 2.0 * math.pi)):
+        return lorentz_transform(first.distance + second.distance,
+                                 first.angle_before, second.angle_after)
+
+    matrix = np.matmul(
+        second._scaled_middle_matrix(),
+        np.matmul(rotation_matrices_by_angles(angles_between),
+                  first._scaled_middle_matrix()))
+
+    # Keep the entries of the matrix at most 1 in absolute value.
+    largest_entries = np.max(np.abs(matrix), axis=(-2, -1))
+    return lorentz_transform(
+        angle_before=first.angle_before,
+        angle_after=second.angle_after,
+        matrix=matrix / largest_entries[..., np.newaxis, np.newaxis],
+        log_scale=first._middle_log_scale() + second._middle_log_scale() +
+        np.log(largest_entries))
+
+
+# The transform that undoes the passed one.  For a Lorentz matrix M this is
+# G^-1 M^T G, where G is the matrix of the form t^2 - x^2 - y^2 = u w - y^2 in
+# light cone coordinates.  The scale stays the same.
+def inverse(transform):
+    if transform.matrix is None:
+        return lorentz_transform(-transform.distance, -transform.angle_after,
+                                 -transform.angle_before)
+
+    matrix = np.matmul(
+        np.matmul(_inverse_light_cone_form,
+                  np.swapaxes(transform.matrix, -1, -2)), _light_cone_form)
+    return lorentz_transform(angle_before=-transform.angle_after,
+                             angle_after=-transform.angle_before,
+                             matrix=matrix,
+                             log_scale=transform.log_scale)
+
+
+_light_cone_form = np.array([[0.0, 0.5, 0.0], [0.5, 0.0, 0.0],
+                             [0.0, 0.0, -1.0]])
+_inverse_light_cone_form = np.array([[0.0, 2.0, 0.0], [2.0, 0.0, 0.0],
+                                     [0.0, 0.0, -1.0]])
+
+# Applying Transforms
+
+
+# Applies the transform to arrays of radial and angular coordinates and
+# returns the radial and angular coordinates of the transformed points.  A
+# batch of transforms with shape (n, ...) is applied to coordinates with
+# shape (n, ...).
+def transformed_polar_arrays(transform, r, phi):
+    r = np.asarray(r, dtype=np.float64)
+    phi = np.asarray(phi, dtype=np.float64)
+
+    # Insert axes such that the i-th transform meets all points of the i-th
+    # set, regardless of how many axes the sets have.
+    batch_axes = max(
+        transform.distance.ndim, transform.angle_before.ndim,
+        transform.angle_after.ndim, transform.log_scale.ndim,
+        0 if transform.matrix is None else transform.matrix.ndim - 2)
+    point_axes = max(np.broadcast(r, phi).ndim - batch_axes, 0)
+
+    def per_point(array):
+        if array.ndim == 0:
+            return array
+        return array.reshape(array.shape + (1, ) * point_axes)
+
+    log_u, log_w, log_abs_y, sign_y = log_light_cone_coordinates_from_polar_arrays(
+        r, phi + per_point(transform.angle_before))
+
+    if transform.matrix is None:
+        distances = per_point(transform.distance)
+        r, phi = polar_arrays_from_log_light_cone_coordinates(
+            log_u + distances, log_w - distances, log_abs_y, sign_y)
+    else:
+        u, w, y, log_scales = _scaled_light_cone_coordinates(
+            log_u, log_w, log_abs_y, sign_y)
+        u, w, y = np.broadcast_arrays(u, w, y)
+        points = np.stack((u, w, y), axis=-1)
+        matrix = transform.matrix
+        matrix_T = np.swapaxes(matrix, -1,
+                               -2).reshape(matrix.shape[:-2] +
+                                           (1, ) * point_axes + (3, 3))
+        points = np.matmul(points[..., np.newaxis, :], matrix_T)[..., 0, :]
+        r, phi = polar_arrays_from_scaled_light_cone_coordinates(
+            points[..., 0], points[..., 1], points[..., 2],
+            log_scales + per_point(transform.log_scale))
+
+    return r, np.mod(phi + per_point(transform.angle_after), 2.0 * math.pi)
+
+
+# Applies the transform to a single polar_coordinate.
+def transformed_coordinate(transform, coordinate):
+    r, phi = transformed_polar_arrays(transform, coordinate.r, coordinate.phi)
+    return native_coordinates.polar_coordinate(float(r), float(phi))
+
+
+def _read_only(transform):
+    for array in (transform.distance, transform.angle_before,
+                  transform.angle_after, transform.matrix,
+                  transform.log_scale):
+        if array is not None:
+            array.flags.writeable = False
+    return transform
@@ -20,6 +20,8 @@ import math
 import euclidean_coordinates
 import collections
 
+import numpy as np
+
 # Polar Coordinates
 
 
@@ -43,6 +45,133 @@ class polar_coordinate:
         return math.pi - abs(math.pi - abs(self.phi - other.phi))
 
 
+# Polar Arrays
+#
+# A polar_array stores many coordinates in two contiguous arrays, one for the
+# radial and one for the angular coordinates, instead of one polar_coordinate
+# object per coordinate.  The arrays r and phi can be passed to the batch
+# functions below directly.  Indexing a polar_array returns a view that
+# behaves like a polar_coordinate, but reads and writes the arrays.  Note that
+# a view refers to a position in the array, i.e., after deleting an earlier
+# coordinate it refers to the next coordinate.
+
+
+class polar_array:
+    def __init__(self, r=(), phi=()):
+        r, phi = np.broadcast_arrays(np.array(r, dtype=np.float64, ndmin=1),
+                                     np.array(phi, dtype=np.float64, ndmin=1))
+
+        self._r = np.array(r)
+        self._phi = np.array(phi)
+        self._length = len(self._r)
+
+    # The radial coordinates of the stored coordinates.
+    @property
+    def r(self):
+        return self._r[:self._length]
+
+    # The angular coordinates of the stored coordinates.
+    @property
+    def phi(self):
+        return self._phi[:self._length]
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        return "[" + ", ".join(str(coordinate) for coordinate in self) + "]"
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield polar_array_coordinate(self, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return polar_array(self.r[index], self.phi[index])
+
+        return polar_array_coordinate(self, self._checked_index(index))
+
+    def __setitem__(self, index, coordinate):
+        index = self._checked_index(index)
+        self._r[index] = coordinate.r
+        self._phi[index] = coordinate.phi
+
+    def __delitem__(self, index):
+        index = self._checked_index(index)
+        self._r[index:self._length - 1] = self._r[index + 1:self._length]
+        self._phi[index:self._length - 1] = self._phi[index + 1:self._length]
+        self._length -= 1
+
+    # Appends a copy of the coordinate and returns its index.
+    def append(self, coordinate):
+        return self.extend_with_arrays(coordinate.r, coordinate.phi)
+
+    # Appends the coordinates (r[i], phi[i]) and returns the index of the
+    # first one.
+    def extend_with_arrays(self, r, phi):
+        r, phi = np.broadcast_arrays(np.atleast_1d(r), np.atleast_1d(phi))
+        start = self._length
+        self._reserve(start + len(r))
+        self._r[start:start + len(r)] = r
+        self._phi[start:start + len(r)] = phi
+        self._length += len(r)
+        return start
+
+    # Returns an independent copy, e.g., to take a snapshot of the
+    # coordinates.
+    def copy(self):
+        return polar_array(self.r, self.phi)
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # Makes sure that the arrays can hold at least the passed number of
+    # coordinates.  The capacity is doubled, such that appending is cheap on
+    # average.
+    def _reserve(self, capacity):
+        if capacity <= len(self._r):
+            return
+
+        new_capacity = max(capacity, 2 * len(self._r), 16)
+        for name in ("_r", "_phi"):
+            values = np.zeros(new_capacity, dtype=np.float64)
+            values[:self._length] = getattr(self, name)[:self._length]
+            setattr(self, name, values)
+
+    def _checked_index(self, index):
+        index = int(index)
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("polar_array index out of range")
+        return index
+
+
+# A view of a single coordinate in a polar_array.
+class polar_array_coordinate(polar_coordinate):
+    __slots__ = ("array", "index")
+
+    def __init__(self, array, index):
+        self.array = array
+        self.index = index
+
+    @property
+    def r(self):
+        return float(self.array._r[self.index])
+
+    @r.setter
+    def r(self, value):
+        self.array._r[self.index] = value
+
+    @property
+    def phi(self):
+        return float(self.array._phi[self.index])
+
+    @phi.setter
+    def phi(self, value):
+        self.array._phi[self.index] = value
+
+
 def coordinate_rotated_around_origin_by_angle(coordinate, angle):
     if coordinate.r == 0:
         return coordinate
@@ -57,301 +186,1038 @@ def coordinate_rotated_around_origin_by_angle(coordinate, angle):
 
 
 def distance_between(coord1, coord2):
-    delta_phi = math.pi - \
-        math.fabs(math.pi - math.fabs(coord1.phi - coord2.phi))
-    try:
-        return math.acosh(
-            math.cosh(coord1.r) * math.cosh(coord2.r) -
-            math.sinh(coord1.r) * math.sinh(coord2.r) * math.cos(delta_phi))
-    except ValueError:
-        return 0
+    return float(
+        distances_between_arrays(coord1.r, coord1.phi, coord2.r, coord2.phi))
 
 
-def coordinate_mirrored_on_x_axis(coordinate):
-    return polar_coordinate(coordinate.r, -(coordinate.phi - (2.0 * math.pi)))
+# Batch Distances
+#
+# The following functions work on NumPy arrays of radial and angular
+# coordinates instead of single polar_coordinate objects.  They follow the
+# broadcasting rules of NumPy, i.e., the shapes of the passed arrays only need
+# to be compatible.
 
 
-def coordinate_translated_along_x_axis_by_hyperbolic_distance(
-        coordinate, distance):
-    if coordinate.phi != math.pi:
-        original_point = polar_coordinate(0.0, 0.0)
-        original_point.r = coordinate.r
-        original_point.phi = coordinate.phi
-
-        reference_point = polar_coordinate(0.0, 0.0)
-        reference_point.r = math.fabs(distance)
-        if distance > 0.0:
-            reference_point.phi = math.pi
-        elif distance < 0.0:
-            reference_point.phi = 0.0
-        else:
-            return coordinate
+# Computes the distances between the coordinates (r1[i], phi1[i]) and (r2[i],
+# phi2[i]) for all i.
+def distances_between_arrays(r1, phi1, r2, phi2):
+    r1 = np.asarray(r1, dtype=np.float64)
+    phi1 = np.asarray(phi1, dtype=np.float64)
+    r2 = np.asarray(r2, dtype=np.float64)
+    phi2 = np.asarray(phi2, dtype=np.float64)
 
-        if original_point.phi > math.pi:
-            coordinate = coordinate_mirrored_on_x_axis(coordinate)
+    # The law of cosines only depends on sin(delta_phi / 2), which is the same
+    # for the difference of the angular coordinates and its complement to 2 pi.
+    # Using the difference directly avoids cancellation for tiny angles.
+    return _distances_from_sides_and_angle(r1, r2, np.abs(phi1 - phi2))
 
-        radial_coordinate = distance_between(coordinate, reference_point)
 
-        if radial_coordinate == 0.0:
-            return polar_coordinate(0.0, 0.0)
+# Hyperbolic law of cosines: Computes the length of the side opposite to the
+# angle gamma in a triangle where the other two sides have lengths a and b.
+def _distances_from_sides_and_angle(a, b, gamma):
+    return _distances_from_sides_and_angle_with_log_sinh(
+        a, b, _log_sinh(a), _log_sinh(b), gamma)
 
-        enumerator = (
-            math.cosh(math.fabs(distance)) * math.cosh(radial_coordinate) -
-            math.cosh(coordinate.r))
-        denominator = (math.sinh(math.fabs(distance)) *
-                       math.sinh(radial_coordinate))
 
-        try:
-            angular_coordinate = math.acos(enumerator / denominator)
-            if distance < 0.0:
-                angular_coordinate = math.pi - angular_coordinate
+# The law of cosines in the form cosh(c) = cosh(a) cosh(b) - sinh(a) sinh(b)
+# cos(gamma) suffers from cancellation for large radii and overflows beyond
+# radii of about 710.  Instead, we use the equivalent form
+#
+#     sinh^2(c / 2) = sinh^2((a - b) / 2) + sinh(a) sinh(b) sin^2(gamma / 2),
+#
+# whose terms are all non-negative, and evaluate it in log space.  The
+# logarithms of sinh(a) and sinh(b) are passed in, such that callers that use
+# the same sides many times only need to compute them once.
+def _distances_from_sides_and_angle_with_log_sinh(a, b, log_sinh_a, log_sinh_b,
+                                                  gamma):
+    with np.errstate(divide='ignore'):
+        log_sinh_half_c_squared = np.logaddexp(
+            2.0 * _log_sinh(0.5 * np.abs(a - b)), log_sinh_a + log_sinh_b +
+            2.0 * np.log(np.abs(np.sin(0.5 * gamma))))
+
+    return 2.0 * _arcsinh_of_exp(0.5 * log_sinh_half_c_squared)
+
+
+# Hyperbolic law of cosines: Computes the angle between the sides with
+# lengths a and b in a triangle where the opposite side has length c.  The
+# angle is 0, if one of the sides is degenerate.
+#
+# To stay accurate for large sides, we use the half angle formula
+#
+#     tan^2(gamma / 2) = sinh(s - a) sinh(s - b) / (sinh(s) sinh(s - c)),
+#
+# where s = (a + b + c) / 2, and evaluate it in log space.
+def _angles_from_sides(a, b, c):
+    half_perimeter = 0.5 * (a + b + c)
+
+    # Due to rounding errors, the sides may violate the triangle inequality
+    # slightly.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_tan_half_gamma_squared = (
+            _log_sinh(np.maximum(half_perimeter - a, 0.0)) +
+            _log_sinh(np.maximum(half_perimeter - b, 0.0)) -
+            _log_sinh(half_perimeter) -
+            _log_sinh(np.maximum(half_perimeter - c, 0.0)))
+        gamma = 2.0 * np.arctan(np.exp(0.5 * log_tan_half_gamma_squared))
+
+    return np.where((a == 0.0) | (b == 0.0) | np.isnan(gamma), 0.0, gamma)
+
+
+# Computes the angle between the side with length a and the third side in a
+# triangle where the sides with lengths a and b enclose the angle gamma.  The
+# angle has the sign of sin(gamma), i.e., it is negative for gamma between pi
+# and 2 pi.  Computing it from the three sides loses precision for flat
+# triangles, since the third side is then close to the sum or the difference
+# of the others.  Instead, we use the four-part formula
+#
+#     cot(alpha) sin(gamma) = coth(b) sinh(a) - cosh(a) cos(gamma),
+#
+# whose right side equals sinh(a - b) / sinh(b) + 2 cosh(a) sin^2(gamma / 2).
+# Both sides are divided by the largest of the terms in log space, such that
+# they neither overflow nor underflow for large sides.
+def _angles_from_sides_and_included_angle(a, b, gamma):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_sin_gamma = np.log(np.abs(np.sin(gamma)))
+        log_first_term = _log_sinh(np.abs(a - b)) - _log_sinh(b)
+        log_second_term = math.log(2.0) + _log_cosh(a) + 2.0 * np.log(
+            np.abs(np.sin(0.5 * gamma)))
+        log_scale = np.maximum(np.maximum(log_first_term, log_second_term),
+                               log_sin_gamma)
+        alpha = np.arctan2(
+            np.sign(np.sin(gamma)) * np.exp(log_sin_gamma - log_scale),
+            np.sign(a - b) * np.exp(log_first_term - log_scale) +
+            np.exp(log_second_term - log_scale))
+
+    return np.where((a == 0.0) | (b == 0.0) | np.isnan(alpha), 0.0, alpha)
+
+
+# The logarithm of sinh(x) for non-negative x.  For large x, sinh(x) itself
+# would overflow, so we use log(sinh(x)) = x + log(1 - exp(-2x)) - log(2)
+# there.  The result is -inf for x = 0.
+def _log_sinh(x):
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        return np.where(
+            x < 1.0, np.log(np.sinh(np.minimum(x, 1.0))),
+            x + np.log1p(-np.exp(-2.0 * np.maximum(x, 1.0))) - math.log(2.0))
+
+
+# The logarithm of cosh(x) for non-negative x, which does not overflow for
+# large x.
+def _log_cosh(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x + np.log1p(np.exp(-2.0 * x)) - math.log(2.0)
+
+
+# Computes arcsinh(exp(x)) without overflowing for large x, where arcsinh(y)
+# is log(2y) up to rounding errors.
+def _arcsinh_of_exp(x):
+    return np.where(x > 20.0, x + math.log(2.0),
+                    np.arcsinh(np.exp(np.minimum(x, 20.0))))
+
+
+# Computes the distances from one coordinate to all coordinates (r[i], phi[i]).
+def distances_from_coordinate_to_arrays(coordinate, r, phi):
+    return distances_between_arrays(coordinate.r, coordinate.phi, r, phi)
+
+
+# Yields the matrix of pairwise distances between the coordinates (r1, phi1)
+# and (r2, phi2) in blocks of at most chunk_size rows.  Each block is yielded
+# together with the index of its first row.  If no second set of coordinates
+# is passed, the distances among the first set are computed.
+def pairwise_distance_chunks(r1, phi1, r2=None, phi2=None, chunk_size=256):
+    r1 = np.asarray(r1, dtype=np.float64)
+    phi1 = np.asarray(phi1, dtype=np.float64)
+
+    if r2 is None or phi2 is None:
+        r2 = r1
+        phi2 = phi1
+    else:
+        r2 = np.asarray(r2, dtype=np.float64)
+        phi2 = np.asarray(phi2, dtype=np.float64)
 
-        except ValueError:
-            angular_coordinate = 0.0
+    # The logarithms of sinh(r) are the same for all blocks, so we only
+    # compute them once.
+    log_sinh_r1 = _log_sinh(r1)
+    log_sinh_r2 = _log_sinh(r2)[np.newaxis, :]
+    r2 = r2[np.newaxis, :]
+    phi2 = phi2[np.newaxis, :]
 
-        translated_coordinate = polar_coordinate(radial_coordinate,
-                                                 angular_coordinate)
-        if original_point.phi > math.pi:
-            translated_coordinate = coordinate_mirrored_on_x_axis(
-                translated_coordinate)
+    for start in range(0, len(r1), chunk_size):
+        end = min(start + chunk_size, len(r1))
+        chunk_r1 = r1[start:end, np.newaxis]
+        chunk_phi1 = phi1[start:end, np.newaxis]
 
-        return translated_coordinate
+        yield start, _distances_from_sides_and_angle_with_log_sinh(
+            chunk_r1, r2, log_sinh_r1[start:end, np.newaxis], log_sinh_r2,
+            np.abs(chunk_phi1 - phi2))
 
-    else:
-        newAngle = 0.0
-        newRadius = math.fabs(coordinate.r + distance)
-
-        if distance < 0.0:
-            if fabs(distance) > coordinate.r:
-                newAngle = math.pi
-                newRadius = coordinate.r - distance
-            else:
-                newAngle = 0.0
-        else:
-            if distance > coordinate.r:
-                newAngle = 0.0
-                newRadius = distance - coordinate.r
-            else:
-                newAngle = math.pi
-                newRadius = coordinate.r - distance
 
-        return polar_coordinate(newRadius, newAngle)
+# Computes the complete matrix of pairwise distances.  The matrix is filled
+# block by block, such that the intermediate arrays never exceed chunk_size
+# rows.
+def pairwise_distance_matrix(r1, phi1, r2=None, phi2=None, chunk_size=256):
+    number_of_columns = len(r1) if r2 is None else len(r2)
+    matrix = np.empty((len(r1), number_of_columns), dtype=np.float64)
 
+    for start, block in pairwise_distance_chunks(r1, phi1, r2, phi2,
+                                                 chunk_size):
+        matrix[start:start + len(block)] = block
+
+    return matrix
 
-def render_points_for_line_from_to(point1, point2):
 
-    render_detail = 100
+# Describes the lines through (r1[i], phi1[i]) and (r2[i], phi2[i]) by the
+# foot of the perpendicular from the origin.  Returns the heights h, i.e., the
+# radial coordinates of the feet, their angular coordinates psi, and the
+# signed distances s1 and s2 of the points from the foot along the line.
+# Measured from psi, the points on a line have the angles beta with
+#
+#     tanh(r) cos(beta) = tanh(h),
+#
+# such that tan(beta1) = (tanh(r2) cos(delta) - tanh(r1)) / (tanh(r2)
+# sin(delta)), where delta is the angular distance of the points.  We write
+# tanh(r) = 1 - t with t = 2 exp(-2r) / (1 + exp(-2r)), which does not round
+# to 0 for large r, and divide the numerator and the denominator by
+# sin(delta / 2), which turns them into
+#
+#     -2 sin(delta / 2) + (t1 - t2) / sin(delta / 2) + 2 t2 sin(delta / 2)
+#
+# and 2 tanh(r2) cos(delta / 2).  The difference t1 - t2 is computed in log
+# space, such that neither it nor the quotient underflow.  The height and the
+# distances along the line then follow from the right triangles with the
+# origin in log space.
+def _perpendiculars_from_origin(r1, phi1, r2, phi2):
+    # Wrapping the angular distance only where necessary keeps small
+    # distances exact.
+    delta = phi2 - phi1
+    delta = np.where(delta > math.pi, delta - 2.0 * math.pi,
+                     np.where(delta <= -math.pi, delta + 2.0 * math.pi, delta))
+    sin_half_delta = np.sin(0.5 * delta)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        log_t1 = math.log(2.0) - 2.0 * r1 - np.log1p(np.exp(-2.0 * r1))
+        log_t2 = math.log(2.0) - 2.0 * r2 - np.log1p(np.exp(-2.0 * r2))
+        log_max_t = np.maximum(log_t1, log_t2)
+        log_t_difference = log_max_t + np.log1p(
+            -np.exp(np.minimum(log_t1, log_t2) - log_max_t))
+        t_difference_over_sin = np.sign(r2 - r1) * np.sign(
+            sin_half_delta) * np.exp(log_t_difference -
+                                     np.log(np.abs(sin_half_delta)))
+
+        # Close to the origin, the plain formula is accurate.  Points with
+        # the same angular coordinate lie on a ray, and only the sign of the
+        # numerator matters.
+        is_plain = (np.maximum(r1, r2) < 1.0) | (sin_half_delta == 0.0)
+        numerator = np.where(
+            is_plain,
+            np.where(delta == 0.0, np.sign(r2 - r1),
+                     np.tanh(r2) * np.cos(delta) - np.tanh(r1)), 2.0 *
+            (np.exp(log_t2) - 1.0) * sin_half_delta + t_difference_over_sin)
+        denominator = np.tanh(r2) * np.where(is_plain, np.sin(delta),
+                                             2.0 * np.cos(0.5 * delta))
+        beta1 = np.arctan2(np.where(denominator < 0.0, -numerator, numerator),
+                           np.abs(denominator))
+        beta2 = beta1 + delta
+
+        # tanh(h) = 1 - q with q = 2 sin^2(beta1 / 2) + t1 cos(beta1).
+        log_q = np.logaddexp(
+            math.log(2.0) + 2.0 * np.log(np.abs(np.sin(0.5 * beta1))),
+            np.log(np.cos(beta1)) + log_t1)
+        heights = np.maximum(0.5 * (np.log(2.0 - np.exp(log_q)) - log_q), 0.0)
+
+        # sinh(s) = sinh(r) sin(beta) in the right triangle with the origin
+        # and the foot.
+        s1 = np.sign(beta1) * _arcsinh_of_exp(
+            _log_sinh(r1) + np.log(np.abs(np.sin(beta1))))
+        s2 = np.sign(beta2) * _arcsinh_of_exp(
+            _log_sinh(r2) + np.log(np.abs(np.sin(beta2))))
+
+    return heights, phi1 - beta1, s1, s2
+
+
+# Computes the polar coordinates of the points on the lines with the passed
+# heights and feet of the perpendicular from the origin, which have the signed
+# distances s from the foot.  By the hyperbolic Pythagorean theorem,
+# sinh^2(r / 2) = sinh^2(h / 2) + cosh(h) sinh^2(s / 2), and the angle beta at
+# the origin satisfies tan(beta) = sinh(s) / (sinh(h) cosh(s)).
+def _polar_arrays_on_perpendiculars(heights, foot_phi, s):
+    abs_s = np.abs(s)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_sinh_half_r_squared = np.logaddexp(
+            2.0 * _log_sinh(0.5 * heights),
+            _log_cosh(heights) + 2.0 * _log_sinh(0.5 * abs_s))
+        r = 2.0 * _arcsinh_of_exp(0.5 * log_sinh_half_r_squared)
+
+        log_opposite = _log_sinh(abs_s)
+        log_adjacent = _log_sinh(heights) + _log_cosh(abs_s)
+        log_scale = np.maximum(log_opposite, log_adjacent)
+        beta = np.arctan2(
+            np.sign(s) * np.exp(log_opposite - log_scale),
+            np.exp(log_adjacent - log_scale))
+
+    # At the origin, the angle is arbitrary.
+    return r, foot_phi + np.where(np.isnan(beta), 0.0, beta)
+
+
+# Computes the smallest radial coordinate of the points on the line segments
+# from (r1[i], phi1[i]) to (r2[i], phi2[i]), i.e., the distance between the
+# origin and the segment.  If the foot of the perpendicular from the origin
+# lies on the segment, this is the height of the foot.  Otherwise, it is the
+# smaller radial coordinate of the end points.
+def minimum_radii_on_lines_from_to(r1, phi1, r2, phi2):
+    r1, phi1, r2, phi2 = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64)
+                                               for x in (r1, phi1, r2, phi2)))
+
+    heights, _, s1, s2 = _perpendiculars_from_origin(r1, phi1, r2, phi2)
+
+    is_foot_on_segment = np.sign(s1) * np.sign(s2) <= 0.0
+    return np.where(is_foot_on_segment, np.minimum(heights, r1),
+                    np.minimum(r1, r2))
+
+
+def coordinate_mirrored_on_x_axis(coordinate):
+    return polar_coordinate(coordinate.r, -(coordinate.phi - (2.0 * math.pi)))
+
+
+def coordinate_translated_along_x_axis_by_hyperbolic_distance(
+        coordinate, distance):
+    if distance == 0.0:
+        return coordinate
+
+    r, phi = coordinates_translated_along_x_axis_by_hyperbolic_distances(
+        coordinate.r, coordinate.phi, distance)
+    return polar_coordinate(float(r), float(phi))
+
+
+def render_points_for_line_from_to(point1, point2):
     if point1.r == 0 or point2.r == 0 or point1.phi == point2.phi:
         return [point1, point2]
 
-    angular_distance = point2.phi - point1.phi
-    if (angular_distance > 0.0
-            and angular_distance < math.pi) or angular_distance < -math.pi:
-        temp = point1
-        point1 = point2
-        point2 = temp
-
-    distance = distance_between(point1, point2)
-
-    cos_gamma_2 = 0.0
-    try:
-        cos_gamma_2 = (((math.cosh(point2.r) * math.cosh(distance)) -
-                        math.cosh(point1.r)) /
-                       (math.sinh(point2.r) * math.sinh(distance)))
-    except (ZeroDivisionError, ValueError):
-        pass
-
-    line_points = []
-    for i in range(0, render_detail):
-        partial_distance = distance * (i / float(render_detail))
-        r = 0.0
-        try:
-            r = math.acosh((math.cosh(point2.r) * math.cosh(partial_distance) -
-                            (math.sinh(point2.r) *
-                             math.sinh(partial_distance) * cos_gamma_2)))
-        except (ZeroDivisionError, ValueError):
-            pass
-        gamma_prime = 0.0
-        try:
-            gamma_prime = math.acos(((math.cosh(r) * math.cosh(point2.r)) -
-                                     math.cosh(partial_distance)) /
-                                    (math.sinh(r) * math.sinh(point2.r)))
-        except (ZeroDivisionError, ValueError):
-            pass
-
-        phi = point2.phi + gamma_prime
-        native_line_point = polar_coordinate(r, phi)
-
-        line_points.append(native_line_point)
-
-    line_points.append(point1)
-    return line_points
+    line_points = render_points_for_lines_from_to(point1.r, point1.phi,
+                                                  point2.r, point2.phi)[0]
+
+    return [polar_coordinate(r, phi) for r, phi in line_points]
+
+
+# Computes the render points of many lines at once.  The i-th line connects
+# (r1[i], phi1[i]) and (r2[i], phi2[i]).  The result is an array of shape
+# (number of lines, render_detail + 1, 2), where the last axis contains the
+# radial and the angular coordinate of a render point.
+def render_points_for_lines_from_to(r1, phi1, r2, phi2, render_detail=100):
+    r1 = np.atleast_1d(np.asarray(r1, dtype=np.float64))
+    phi1 = np.atleast_1d(np.asarray(phi1, dtype=np.float64))
+    r2 = np.atleast_1d(np.asarray(r2, dtype=np.float64))
+    phi2 = np.atleast_1d(np.asarray(phi2, dtype=np.float64))
+
+    # We walk from the start point to the end point such that the angular
+    # coordinate increases along the way.
+    angular_distance = phi2 - phi1
+    swap = ((angular_distance > 0.0) &
+            (angular_distance < math.pi)) | (angular_distance < -math.pi)
+
+    start_r = np.where(swap, r1, r2)[:, np.newaxis]
+    start_phi = np.where(swap, phi1, phi2)[:, np.newaxis]
+    end_r = np.where(swap, r2, r1)[:, np.newaxis]
+    end_phi = np.where(swap, phi2, phi1)[:, np.newaxis]
+
+    # We sample the lines uniformly along their arc length, which we measure
+    # from the foot of the perpendicular from the origin.  Unlike sampling via
+    # the angles of the triangles with the origin, this does not break down
+    # when these angles underflow for large radial coordinates.
+    heights, foot_phi, start_s, end_s = _perpendiculars_from_origin(
+        start_r, start_phi, end_r, end_phi)
+
+    fraction = np.arange(render_detail + 1) / float(render_detail)
+    r, phi = _polar_arrays_on_perpendiculars(
+        heights, foot_phi, start_s + (end_s - start_s) * fraction)
+
+    # Lines that start or end at the origin, or whose end points have the same
+    # angular coordinate, are segments of a ray through the origin.
+    is_radial = ((start_r == 0.0) | (end_r == 0.0) | (start_phi == end_phi))[:,
+                                                                             0]
+    if np.any(is_radial):
+        r[is_radial] = start_r[is_radial] + (end_r[is_radial] -
+                                             start_r[is_radial]) * fraction
+        phi[is_radial] = np.where(start_r[is_radial] > 0.0,
+                                  start_phi[is_radial], end_phi[is_radial])
+
+    # The first and the last render point are the end points themselves.
+    r[:, 0] = start_r[:, 0]
+    phi[:, 0] = start_phi[:, 0]
+    r[:, -1] = end_r[:, 0]
+    phi[:, -1] = end_phi[:, 0]
+
+    return np.stack((r, phi), axis=-1)
 
 
 def render_points_for_circle_with_center_and_radius(center, radius):
-    render_detail = 200
+    circle_points = render_points_for_circles_with_centers_and_radii(
+        center.r, center.phi, radius)[0]
+
+    return [polar_coordinate(r, phi) for r, phi in circle_points]
+
+
+# Computes the render points of many circles at once.  The i-th circle has
+# center (center_r[i], center_phi[i]) and radius radii[i].  The result is an
+# array of shape (number of circles, render_detail, 2), where the last axis
+# contains the radial and the angular coordinate of a render point.
+def render_points_for_circles_with_centers_and_radii(center_r,
+                                                     center_phi,
+                                                     radii,
+                                                     render_detail=200):
+    center_r, center_phi, radii = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(center_r, dtype=np.float64)),
+        np.atleast_1d(np.asarray(center_phi, dtype=np.float64)),
+        np.atleast_1d(np.asarray(radii, dtype=np.float64)))
+
+    # The shape of a circle only depends on the radial coordinate of its
+    # center and its radius.  We determine the outline once for each of these
+    # combinations and rotate it to the angular coordinates of the centers
+    # afterwards.
+    shapes, shape_indices = np.unique(np.stack((center_r, radii), axis=-1),
+                                      axis=0,
+                                      return_inverse=True)
+    outlines = _canonical_circle_outlines(shapes[:, 0], shapes[:, 1],
+                                          render_detail)
+
+    circle_points = outlines[shape_indices.reshape(-1)]
+    circle_points[..., 1] = np.mod(
+        circle_points[..., 1] + center_phi[:, np.newaxis], 2.0 * math.pi)
 
-    # If the circle is centered at the origin, we simply draw a euclidean
-    # circle.
-    if center.r == 0.0:
+    return circle_points
 
-        render_detail = 360
-        circle_points = []
-        step_size = (2.0 * math.pi) / render_detail
 
-        angle = 0.0
-        while angle < (2.0 * math.pi):
-            point = polar_coordinate(radius, angle)
-            circle_points.append(point)
-            angle = angle + step_size
+# The canonical outlines of circles, i.e., the outlines of circles whose
+# centers have angular coordinate 0.  The cache maps the radial coordinate of
+# the center and the radius of a circle to a dictionary, which contains the
+# parametrization of the outline (key None) and the outlines that have been
+# computed for different render details.  Only the most recently used shapes
+# are kept.
+canonical_circle_outline_cache = collections.OrderedDict()
+canonical_circle_outline_cache_size = 4096
+canonical_circle_outline_cache_hits = 0
+canonical_circle_outline_cache_misses = 0
+
+
+# Returns the canonical outlines of the circles with the passed radial
+# coordinates of their centers and radii as an array of shape (number of
+# circles, render_detail, 2).  The render points are spread evenly along the
+# outlines in the native representation, starting with the point closest to
+# the origin.  Outlines that are not cached yet are computed together.
+def _canonical_circle_outlines(center_r, radii, render_detail):
+    global canonical_circle_outline_cache_hits
+    global canonical_circle_outline_cache_misses
+
+    cache = canonical_circle_outline_cache
+    outlines = np.empty((len(center_r), render_detail, 2), dtype=np.float64)
+    missing_indices = []
+
+    for index, shape in enumerate(zip(center_r.tolist(), radii.tolist())):
+        shape_outlines = cache.get(shape)
+        if shape_outlines is not None and render_detail in shape_outlines:
+            cache.move_to_end(shape)
+            outlines[index] = shape_outlines[render_detail]
+            canonical_circle_outline_cache_hits += 1
+        else:
+            missing_indices.append(index)
+            canonical_circle_outline_cache_misses += 1
+
+    if not missing_indices:
+        return outlines
+
+    missing_indices = np.array(missing_indices)
+    missing_center_r = center_r[missing_indices]
+    missing_radii = radii[missing_indices]
+
+    # The parametrizations of shapes that were drawn with a different render
+    # detail before can be reused.
+    parametrizations = [
+        cache.get(shape, {}).get(None)
+        for shape in zip(missing_center_r.tolist(), missing_radii.tolist())
+    ]
+    unknown = np.array(
+        [parametrization is None for parametrization in parametrizations])
+    if np.any(unknown):
+        unknown_alpha, unknown_measure = _circle_outline_parametrizations(
+            missing_center_r[unknown], missing_radii[unknown])
+        for index, unknown_index in enumerate(np.flatnonzero(unknown)):
+            parametrizations[unknown_index] = (unknown_alpha[index],
+                                               unknown_measure[index])
+
+    alpha_samples = np.stack([alpha for alpha, _ in parametrizations])
+    outline_measure = np.stack([measure for _, measure in parametrizations])
+
+    alpha = _interpolated_rows(
+        outline_measure[:, -1:] * np.arange(render_detail) /
+        float(render_detail), outline_measure, alpha_samples)
+    r, theta = _circle_outline_points(missing_center_r[:, np.newaxis],
+                                      missing_radii[:, np.newaxis], alpha)
+    missing_outlines = np.stack((r, theta), axis=-1)
+
+    # Circles centered at the origin are euclidean circles.
+    is_centered = missing_center_r == 0.0
+    missing_outlines[is_centered, :, 0] = missing_radii[is_centered,
+                                                        np.newaxis]
+    missing_outlines[is_centered, :,
+                     1] = (2.0 * math.pi * np.arange(render_detail) /
+                           float(render_detail))
+
+    outlines[missing_indices] = missing_outlines
+
+    for shape, parametrization, outline in zip(
+            zip(missing_center_r.tolist(), missing_radii.tolist()),
+            parametrizations, missing_outlines):
+        outline.flags.writeable = False
+        shape_outlines = cache.setdefault(shape, {})
+        shape_outlines[None] = parametrization
+        shape_outlines[render_detail] = outline
+        cache.move_to_end(shape)
+
+    while len(cache) > canonical_circle_outline_cache_size:
+        cache.popitem(last=False)
+
+    return outlines
+
+
+# The points of the circles with the passed radii whose centers are
+# (center_r, 0), at the angles alpha at the centers of the circles.  The angles
+# are measured from the ray towards the origin.  The angular coordinates of
+# the points are computed from the two sides at the center and the angle
+# between them, which keeps them accurate for large centers, and are negative
+# on the second half of the outline.
+def _circle_outline_points(center_r, radius, alpha):
+    r = _distances_from_sides_and_angle(center_r, radius, alpha)
+    theta = _angles_from_sides_and_included_angle(center_r, radius, alpha)
+    return r, theta
+
+
+# In the native representation, the part of a circle that is close to the
+# origin is stretched a lot compared to the part that is far away, where the
+# outline has a sharp bend.  Sampling the angle at the center of the circle
+# uniformly would therefore put most render points where they are not needed.
+# The distance between a segment and the curve grows with the length of the
+# segment squared times the curvature.  To spread this error evenly, we
+# integrate the square root of the curvature along the outline, i.e., we sum
+# up sqrt(segment length * turning angle) over all segments.  Returns the
+# sampled angles at the centers of the circles together with the value of this
+# integral at each of them, as arrays of shape (number of circles,
+# number_of_samples + 1).  The samples are refined repeatedly, such that they
+# are spread evenly with respect to the integral.
+def _circle_outline_parametrizations(center_r, radii, number_of_samples=128):
+    center_r = center_r[:, np.newaxis]
+    radii = radii[:, np.newaxis]
+    alpha = np.broadcast_to(
+        np.linspace(0.0, 2.0 * math.pi, number_of_samples + 1),
+        (len(center_r), number_of_samples + 1))
+
+    for iteration in range(3):
+        r, theta = _circle_outline_points(center_r, radii, alpha)
+        dx = np.diff(r * np.cos(theta), axis=1)
+        dy = np.diff(r * np.sin(theta), axis=1)
+        segment_lengths = np.hypot(dx, dy)
+
+        # The turning angle at each point of the closed outline, which is
+        # split evenly between the two adjacent segments.
+        headings = np.arctan2(dy, dx)
+        turns = np.abs(
+            np.mod(
+                np.diff(headings, axis=1, append=headings[:, :1]) +
+                math.pi, 2.0 * math.pi) - math.pi)
+        segment_turns = 0.5 * (turns + np.roll(turns, 1, axis=1))
+
+        # A small share of the plain length makes sure that straight parts of
+        # the outline still get some render points.
+        total_lengths = np.sum(segment_lengths, axis=1, keepdims=True)
+        weights = np.sqrt(segment_lengths * segment_turns) + (
+            0.01 * segment_lengths / np.maximum(np.sqrt(total_lengths), 1e-12))
+        outline_measure = np.concatenate((np.zeros(
+            (len(center_r), 1)), np.cumsum(weights, axis=1)),
+                                         axis=1)
+
+        if iteration < 2:
+            alpha = _interpolated_rows(
+                outline_measure[:, -1:] *
+                np.linspace(0.0, 1.0, number_of_samples + 1), outline_measure,
+                alpha)
+
+    return alpha, outline_measure
+
+
+# Linear interpolation like np.interp, but for each row separately.  The rows
+# of xp need to be non-decreasing.
+def _interpolated_rows(x, xp, fp):
+    number_of_rows, number_of_columns = xp.shape
+    row_offsets = 2.0 * np.arange(number_of_rows)[:, np.newaxis]
+
+    # Normalize the rows to [0, 1] and shift them apart, such that one sorted
+    # search finds the positions for all rows.
+    row_scales = np.maximum(xp[:, -1:] - xp[:, :1], 1e-300)
+    xp_shifted = (xp - xp[:, :1]) / row_scales + row_offsets
+    x_shifted = np.clip((x - xp[:, :1]) / row_scales, 0.0, 1.0) + row_offsets
+
+    indices = np.searchsorted(xp_shifted.ravel(),
+                              x_shifted.ravel(),
+                              side='right').reshape(x.shape) - 1
+    row_starts = number_of_columns * np.arange(number_of_rows)[:, np.newaxis]
+    indices = np.clip(indices, row_starts, row_starts + number_of_columns - 2)
+
+    xp_flat = xp_shifted.ravel()
+    fp_flat = np.asarray(fp, dtype=np.float64).ravel()
+    left = xp_flat[indices]
+    right = xp_flat[indices + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(right > left, (x_shifted - left) / (right - left),
+                            0.0)
+
+    return fp_flat[indices] + fraction * (fp_flat[indices + 1] -
+                                          fp_flat[indices])
 
-        return circle_points
 
-    # We first determine the points by pretending the node itself had angular
-    # coordinate 0.
+def render_points_for_hypercycle_around_points(point1, point2, radius):
+    upper_points, lower_points = render_points_for_hypercycles_around_points(
+        point1.r, point1.phi, point2.r, point2.phi, radius)
 
-    r_min = max((radius - center.r), (center.r - radius))
-    r_max = center.r + radius
+    upper_sample_points = [
+        polar_coordinate(r, phi) for r, phi in upper_points[0]
+    ]
+    lower_sample_points = [
+        polar_coordinate(r, phi) for r, phi in lower_points[0]
+    ]
 
-    step_size = (r_max - r_min) / render_detail
+    return upper_sample_points, lower_sample_points
 
-    circle_points = []
 
-    # We start computing the render points at the max radius towards the center
-    # of the disk, then copy and mirror all points on the x-axis.
-    r = r_max
-    theta = 0
+# Computes the render points of many hypercycles at once.  The i-th hypercycle
+# consists of the points with distance radii[i] to the line between (r1[i],
+# phi1[i]) and (r2[i], phi2[i]).  The result consists of two arrays of shape
+# (number of hypercycles, render_detail + 1, 2), containing the render points
+# of the upper and the lower part, respectively.  The last axis contains the
+# radial and the angular coordinate of a render point.
+def render_points_for_hypercycles_around_points(r1,
+                                                phi1,
+                                                r2,
+                                                phi2,
+                                                radii,
+                                                render_detail=100):
+    r1, phi1, r2, phi2, radii = [
+        np.atleast_1d(np.asarray(values, dtype=np.float64))[:, np.newaxis]
+        for values in np.broadcast_arrays(r1, phi1, r2, phi2, radii)
+    ]
+
+    # We consider the frame in which the first point is the origin and the
+    # original origin lies in direction pi.  In this frame, the second point
+    # has distance d to the origin and the angular coordinate psi1.  The frame
+    # of the second point is defined analogously.
+    distances = distances_between_arrays(r1, phi1, r2, phi2)
+    psi1 = _frame_angles_towards(r1, phi1, r2, phi2, distances)
+    psi2 = _frame_angles_towards(r2, phi2, r1, phi1, distances)
+
+    # In the frame rotated by -psi1, the hypercycle is symmetric with respect
+    # to the x-axis.  Its render points are the points with distance radius to
+    # the x-axis, whose projections on the x-axis are sampled between the two
+    # points.  The point with distance radius above the point (x, 0) has
+    # distance s to the origin, where cosh(s) = cosh(x) cosh(radius), and
+    # its angular coordinate theta satisfies tan(theta) = tanh(radius) /
+    # sinh(x).
+    x = distances * (np.arange(render_detail + 1) / float(render_detail))
+
+    # Angles in a frame are only accurate up to rounding errors, which are
+    # magnified by the distance to the origin of the frame.  Therefore, the
+    # second half of the hypercycle is computed in the frame of the second
+    # point, where the upper part lies below the line.
+    is_second_half = x > 0.5 * distances
+    x = np.where(is_second_half, distances - x, x)
+    s = _distances_from_sides_and_angle(x, radii, 0.5 * math.pi)
+    with np.errstate(over='ignore'):
+        theta = np.arctan2(np.tanh(radii), np.sinh(x))
+
+    frame_r = np.where(is_second_half, r2, r1)
+    frame_phi = np.where(is_second_half, phi2, phi1)
+    psi = np.where(is_second_half, psi2, psi1)
+    theta = np.where(is_second_half, -theta, theta)
+
+    upper_points = np.stack(_polar_arrays_from_frame(frame_r, frame_phi, s,
+                                                     psi + theta),
+                            axis=-1)
+    lower_points = np.stack(_polar_arrays_from_frame(frame_r, frame_phi, s,
+                                                     psi - theta),
+                            axis=-1)
+
+    return upper_points, lower_points
+
+
+# Translates the coordinates (r[i], phi[i]) along the x-axis by distances[i],
+# such that the origin is moved to the coordinate (distances[i], 0).  Returns
+# the radial and the angular coordinates of the translated points.
+def coordinates_translated_along_x_axis_by_hyperbolic_distances(
+        r, phi, distances):
+    r, phi, distances = np.broadcast_arrays(
+        np.asarray(r, dtype=np.float64), np.asarray(phi, dtype=np.float64),
+        np.asarray(distances, dtype=np.float64))
+
+    # A translation by a negative distance is a translation by the positive
+    # distance in the frame that is rotated by pi.
+    frame_phi = np.where(distances < 0.0, math.pi, 0.0)
+    return _polar_arrays_from_frame(np.abs(distances), frame_phi, r,
+                                    phi + frame_phi)
+
+
+# The angular coordinates of the points (r2, phi2) in the frames of the points
+# (r1, phi1), as defined in _polar_arrays_from_frame.  The distances between
+# the points are passed in.
+def _frame_angles_towards(r1, phi1, r2, phi2, distances):
+    gammas = _angles_from_sides(r1, distances, r2)
+    is_counterclockwise = np.sin(phi2 - phi1) > 0.0
+    return np.where(
+        r1 == 0.0, phi2 - phi1,
+        np.where(is_counterclockwise, math.pi - gammas, math.pi + gammas))
+
+
+# Converts the polar coordinates (s, theta) in a frame to polar coordinates in
+# the plane.  The origin of the frame lies at (frame_r, frame_phi) and its
+# angular coordinate pi points towards the origin of the plane, i.e., the frame
+# is obtained by translating the plane along the x-axis by frame_r and
+# rotating it by frame_phi afterwards.  Only the triangle between the two
+# origins and the point is used, which keeps the result accurate for large
+# radii.
+def _polar_arrays_from_frame(frame_r, frame_phi, s, theta):
+    theta = np.mod(theta, 2.0 * math.pi)
+
+    r = _distances_from_sides_and_angle(frame_r, s, np.abs(theta - math.pi))
+    angles_at_origin = _angles_from_sides_and_included_angle(
+        frame_r, s, np.abs(theta - math.pi))
+    phi = np.where(
+        frame_r == 0.0, frame_phi + theta,
+        np.where(theta < math.pi, frame_phi + angles_at_origin,
+                 frame_phi - angles_at_origin))
+
+    return r, np.mod(phi, 2.0 * math.pi)
+
+
+# Converts render points given by their radial and angular coordinates, i.e.,
+# arrays of shape (..., 2), to the Euclidean coordinates of the native
+# representation with scale 1.
+def native_points_from_polar_points(points):
+    points = np.asarray(points, dtype=np.float64)
+    native_points = np.empty(points.shape, dtype=np.float64)
+    native_points[..., 0] = points[..., 0] * np.cos(points[..., 1])
+    native_points[..., 1] = points[..., 0] * np.sin(points[..., 1])
+    return native_points
+
+
+# Projections
+#
+# Besides the native representation, the hyperbolic plane can be drawn in the
+# Poincaré disk and in the Beltrami-Klein disk.  In both, a point with polar
+# coordinates (r, phi) lies in direction phi from the center of the unit disk,
+# at distance tanh(r / 2) in the Poincaré disk and at distance tanh(r) in the
+# Klein disk.  Lines are arcs of circles that are orthogonal to the unit circle
+# in the Poincaré disk and straight chords in the Klein disk.  Circles are
+# Euclidean circles in the Poincaré disk.
 
-    additional_render_detail_threshold = 5.0 * step_size
-    additional_render_detail = render_detail / 5
 
-    while r >= r_min:
-        try:
-            theta = math.acos(
-                (math.cosh(center.r) * math.cosh(r) - math.cosh(radius)) /
-                (math.sinh(center.r) * math.sinh(r)))
-        except ValueError:
-            pass
+def poincare_radii_from_hyperbolic_radii(r):
+    return np.tanh(0.5 * np.asarray(r, dtype=np.float64))
 
-        point = polar_coordinate(r, theta)
-        circle_points.append(point)
 
-        # Additional render detail
-        if r >= r_min and r - r_min < additional_render_detail_threshold:
-            additional_step_size = step_size / additional_render_detail
+def hyperbolic_radii_from_poincare_radii(radii):
+    return 2.0 * np.arctanh(_radii_inside_unit_disk(radii))
 
-            additional_r = r - additional_step_size
 
-            while additional_r > r - step_size:
+def klein_radii_from_hyperbolic_radii(r):
+    return np.tanh(np.asarray(r, dtype=np.float64))
 
-                try:
-                    theta = math.acos(
-                        (math.cosh(center.r) * math.cosh(additional_r) -
-                         math.cosh(radius)) /
-                        (math.sinh(center.r) * math.sinh(additional_r)))
-                except ValueError:
-                    pass
 
-                if additional_r >= r_min:
-                    additional_point = polar_coordinate(additional_r, theta)
-                    circle_points.append(additional_point)
+def hyperbolic_radii_from_klein_radii(radii):
+    return np.arctanh(_radii_inside_unit_disk(radii))
 
-                additional_r = additional_r - additional_step_size
 
-        r = r - step_size
+# Points on or outside of the boundary of the disk are moved slightly inside.
+def _radii_inside_unit_disk(radii):
+    return np.minimum(np.asarray(radii, dtype=np.float64),
+                      np.nextafter(1.0, 0.0))
 
-    # Add the point on the ray through the origin and center. Depending on
-    # whether the origin is contained in the circle the angle of this points is
-    # either pi or 0.
-    inner_point_angle = math.pi
-    if center.r > radius:
-        inner_point_angle = 0.0
 
-    inner_point = polar_coordinate(r_min, inner_point_angle)
-    circle_points.append(inner_point)
+# Converts render points given by their radial and angular coordinates, i.e.,
+# arrays of shape (..., 2), to Euclidean coordinates in the Poincaré disk.
+def poincare_points_from_polar_points(points):
+    points = np.asarray(points, dtype=np.float64)
+    return native_points_from_polar_points(
+        np.stack((poincare_radii_from_hyperbolic_radii(
+            points[..., 0]), points[..., 1]),
+                 axis=-1))
 
-    # Now we copy all points by mirroring them on the x-axis. We exclude the
-    # first and the last point, as they are lying on the x-axis. To obtain a
-    # valid path we need walk from the end of the vector to the start.
-    i = len(circle_points) - 2  # We don't need to add the inner point twice.
-    while i > 0:
 
-        native_circle_point = circle_points[i]
-        mirrored_point = polar_coordinate(
-            native_circle_point.r, (2.0 * math.pi) - native_circle_point.phi)
-        circle_points.append(mirrored_point)
-        i = i - 1
+# Converts render points given by their radial and angular coordinates, i.e.,
+# arrays of shape (..., 2), to Euclidean coordinates in the Klein disk.
+def klein_points_from_polar_points(points):
+    points = np.asarray(points, dtype=np.float64)
+    return native_points_from_polar_points(
+        np.stack((klein_radii_from_hyperbolic_radii(
+            points[..., 0]), points[..., 1]),
+                 axis=-1))
 
-    # Finally we rotate all points around the origin to match the angular
-    # coordinate of the circle center.
-    for i in range(len(circle_points)):
-        native_circle_point = circle_points[i]
-        rotated_point = coordinate_rotated_around_origin_by_angle(
-            native_circle_point, center.phi)
-        circle_points[i] = rotated_point
 
-    return circle_points
+# Computes the circles that contain the lines between the points points1[i]
+# and points2[i] in the Poincaré disk, where the last axis of the arrays
+# contains the x- and y-coordinates.  Returns the centers of the circles as an
+# array of shape (number of lines, 2) and their radii.  The radius is inf, if
+# the line is a diameter of the disk.
+def poincare_arcs_through_points(points1, points2):
+    points1 = np.asarray(points1, dtype=np.float64)
+    points2 = np.asarray(points2, dtype=np.float64)
 
+    # The center c of a circle orthogonal to the unit circle through the
+    # points p and q satisfies <c, p> = (|p|^2 + 1) / 2 and <c, q> = (|q|^2 +
+    # 1) / 2.  Its radius is sqrt(|c|^2 - 1).
+    determinants = (points1[..., 0] * points2[..., 1] -
+                    points1[..., 1] * points2[..., 0])
+    is_diameter = np.abs(determinants) <= 1e-12
+    determinants = np.where(is_diameter, 1.0, determinants)
 
-def render_points_for_hypercycle_around_points(point1, point2, radius):
+    b1 = 0.5 * (np.sum(np.square(points1), axis=-1) + 1.0)
+    b2 = 0.5 * (np.sum(np.square(points2), axis=-1) + 1.0)
+    centers = np.stack(((b1 * points2[..., 1] - b2 * points1[..., 1]),
+                        (points1[..., 0] * b2 - points2[..., 0] * b1)),
+                       axis=-1) / determinants[..., np.newaxis]
+    radii = np.sqrt(np.maximum(np.sum(np.square(centers), axis=-1) - 1.0, 0.0))
 
-    # Rotate the points such that the first lies on the x-axis We don't
-    # actually move the first point, as we can infer everything we know from
-    # its current position.
-    rotation_angle1 = -point1.phi
-    rotated_point2 = coordinate_rotated_around_origin_by_angle(
-        point2, rotation_angle1)
-
-    # Translate the points such that the first lies on the origin
-    translation_distance = -point1.r
-    translated_point2 = coordinate_translated_along_x_axis_by_hyperbolic_distance(
-        rotated_point2, translation_distance)
-
-    # Rotate everything such that the second points is on the x-axis.
-    # We don't actually perform the rotation (as it is not necessary).
-    rotation_angle2 = -translated_point2.phi
-
-    # The first point is now on the origin, the second points is on the x-axis.
-    # Now we sample the points for the two lines representing the hypercycle.
-    render_detail = 100
-
-    # The reference point is the one that is translated along the x-axis to get
-    # the sampling points.
-    reference_point = polar_coordinate(radius, math.pi / 2.0)
-
-    upper_sample_points = []
-    lower_sample_points = []
-
-    for i in range(render_detail):
-        current_x = i * (translated_point2.r / render_detail)
-        upper_sample_point = coordinate_translated_along_x_axis_by_hyperbolic_distance(
-            reference_point, current_x)
-        upper_sample_points.append(upper_sample_point)
-        lower_sample_point = polar_coordinate(
-            upper_sample_point.r, 2.0 * math.pi - upper_sample_point.phi)
-        lower_sample_points.append(lower_sample_point)
-
-    # Now we need to reverse the translations made earlier.
-    for index in range(len(upper_sample_points)):
-        upper_sample_point = upper_sample_points[index]
-        lower_sample_point = lower_sample_points[index]
-
-        rotated_upper = coordinate_rotated_around_origin_by_angle(
-            upper_sample_point, -rotation_angle2)
-        rotated_lower = coordinate_rotated_around_origin_by_angle(
-            lower_sample_point, -rotation_angle2)
-
-        translated_upper = coordinate_translated_along_x_axis_by_hyperbolic_distance(
-            rotated_upper, -translation_distance)
-        translated_lower = coordinate_translated_along_x_axis_by_hyperbolic_distance(
-            rotated_lower, -translation_distance)
-
-        final_upper = coordinate_rotated_around_origin_by_angle(
-            translated_upper, -rotation_angle1)
-        final_lower = coordinate_rotated_around_origin_by_angle(
-            translated_lower, -rotation_angle1)
-
-        upper_sample_points[index] = final_upper
-        lower_sample_points[index] = final_lower
+    return centers, np.where(is_diameter, np.inf, radii)
 
-    return upper_sample_points, lower_sample_points
+
+# Computes the Euclidean circles that represent the hyperbolic circles with
+# centers (center_r[i], center_phi[i]) and radii[i] in the Poincaré disk.
+# Returns the centers of the Euclidean circles as an array of shape (number of
+# circles, 2) and their radii.
+def poincare_circles_with_centers_and_radii(center_r, center_phi, radii):
+    center_r, center_phi, radii = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(center_r, dtype=np.float64)),
+        np.atleast_1d(np.asarray(center_phi, dtype=np.float64)),
+        np.atleast_1d(np.asarray(radii, dtype=np.float64)))
+
+    # The circle meets the line through the origin and its center at the
+    # distances center_r - radius and center_r + radius from the origin, where
+    # a negative distance lies on the other side of the origin.
+    near_radii = np.tanh(0.5 * (center_r - radii))
+    far_radii = np.tanh(0.5 * (center_r + radii))
+
+    centers = native_points_from_polar_points(
+        np.stack((0.5 * (near_radii + far_radii), center_phi), axis=-1))
+    return centers, 0.5 * (far_radii - near_radii)
+
+
+# Adaptive Render Detail
+#
+# Instead of using a fixed number of render points for every curve, the
+# following functions choose the render detail of each curve such that the
+# polygonal approximation deviates from the curve by at most max_pixel_error
+# pixels, when it is drawn with the passed scale.  To this end, each curve is
+# first sampled coarsely and the distance between the midpoints of the coarse
+# segments and the curve is measured.  As this deviation decreases
+# quadratically with the number of segments, it tells us how many segments are
+# needed.  The render details are rounded to powers of two, such that curves
+# with similar render details are tessellated together.
+#
+# The scale is the number of pixels per unit of the plane in which the curves
+# are drawn.  By default, this is the native representation, but the render
+# points can be converted to a different plane, e.g., a projection, by passing
+# a function like native_points_from_polar_points.
+#
+# Besides the render points, these functions return the largest scale at which
+# the render points of each curve are still accurate enough.  Render points
+# that are converted with native_points_from_polar_points are independent of
+# the scale, so they can be reused after zooming out, or zooming in up to this
+# scale, by scaling and moving them.
+
+_coarse_render_detail = 32
+
+
+# Computes the render points of many lines, where the render detail of each
+# line is chosen adaptively.  Returns a list containing one array of shape
+# (render detail + 1, 2) per line, together with the array of maximum scales.
+def adaptive_render_points_for_lines_from_to(
+        r1,
+        phi1,
+        r2,
+        phi2,
+        scale,
+        max_pixel_error=0.5,
+        max_render_detail=1024,
+        model_points_from_polar_points=native_points_from_polar_points):
+    r1, phi1, r2, phi2 = np.broadcast_arrays(*[
+        np.atleast_1d(np.asarray(a, dtype=np.float64))
+        for a in (r1, phi1, r2, phi2)
+    ])
+
+    if len(r1) == 0:
+        return [], np.empty(0)
+
+    coarse_points = render_points_for_lines_from_to(r1, phi1, r2, phi2,
+                                                    _coarse_render_detail)
+    render_details, pixel_errors = _render_details_from_coarse_points(
+        coarse_points, False, scale, max_pixel_error, 1, max_render_detail,
+        model_points_from_polar_points)
+    max_scales = _max_scales_of_render_details(render_details, pixel_errors,
+                                               scale, max_pixel_error)
+
+    return _render_points_grouped_by_render_detail(
+        render_points_for_lines_from_to, render_details, (coarse_points, ), r1,
+        phi1, r2, phi2)[0], max_scales
+
+
+# Computes the render points of many circles, where the render detail of each
+# circle is chosen adaptively.  Returns a list containing one array of shape
+# (render detail, 2) per circle, together with the array of maximum scales.
+def adaptive_render_points_for_circles_with_centers_and_radii(
+        center_r,
+        center_phi,
+        radii,
+        scale,
+        max_pixel_error=0.5,
+        max_render_detail=1024,
+        model_points_from_polar_points=native_points_from_polar_points):
+    center_r, center_phi, radii = np.broadcast_arrays(*[
+        np.atleast_1d(np.asarray(a, dtype=np.float64))
+        for a in (center_r, center_phi, radii)
+    ])
+
+    if len(center_r) == 0:
+        return [], np.empty(0)
+
+    coarse_points = render_points_for_circles_with_centers_and_radii(
+        center_r, center_phi, radii, _coarse_render_detail)
+    render_details, pixel_errors = _render_details_from_coarse_points(
+        coarse_points, True, scale, max_pixel_error, 8, max_render_detail,
+        model_points_from_polar_points)
+    max_scales = _max_scales_of_render_details(render_details, pixel_errors,
+                                               scale, max_pixel_error)
+
+    return _render_points_grouped_by_render_detail(
+        render_points_for_circles_with_centers_and_radii, render_details,
+        (coarse_points, ), center_r, center_phi, radii)[0], max_scales
+
+
+# Computes the render points of many hypercycles, where the render detail of
+# each hypercycle is chosen adaptively.  Returns two lists containing one array
+# of shape (render detail + 1, 2) per hypercycle for the upper and the lower
+# part, respectively, together with the array of maximum scales.
+def adaptive_render_points_for_hypercycles_around_points(
+        r1,
+        phi1,
+        r2,
+        phi2,
+        radii,
+        scale,
+        max_pixel_error=0.5,
+        max_render_detail=1024,
+        model_points_from_polar_points=native_points_from_polar_points):
+    r1, phi1, r2, phi2, radii = np.broadcast_arrays(*[
+        np.atleast_1d(np.asarray(a, dtype=np.float64))
+        for a in (r1, phi1, r2, phi2, radii)
+    ])
+
+    if len(r1) == 0:
+        return [], [], np.empty(0)
+
+    coarse_upper_points, coarse_lower_points = render_points_for_hypercycles_around_points(
+        r1, phi1, r2, phi2, radii, _coarse_render_detail)
+    upper_render_details, upper_pixel_errors = _render_details_from_coarse_points(
+        coarse_upper_points, False, scale, max_pixel_error, 1,
+        max_render_detail, model_points_from_polar_points)
+    lower_render_details, lower_pixel_errors = _render_details_from_coarse_points(
+        coarse_lower_points, False, scale, max_pixel_error, 1,
+        max_render_detail, model_points_from_polar_points)
+
+    # Both parts are rendered with the larger render detail.
+    render_details = np.maximum(upper_render_details, lower_render_details)
+    max_scales = _max_scales_of_render_details(
+        render_details, np.maximum(upper_pixel_errors, lower_pixel_errors),
+        scale, max_pixel_error)
+
+    upper_points, lower_points = _render_points_grouped_by_render_detail(
+        render_points_for_hypercycles_around_points, render_details,
+        (coarse_upper_points, coarse_lower_points), r1, phi1, r2, phi2, radii)
+    return upper_points, lower_points, max_scales
+
+
+# Determines the render details of curves from coarse render points of shape
+# (number of curves, number of points, 2) with an odd number of points (or an
+# even number for closed curves).  Also returns the pixel errors of the coarse
+# render points.
+def _render_details_from_coarse_points(coarse_points, is_closed, scale,
+                                       max_pixel_error, min_render_detail,
+                                       max_render_detail,
+                                       model_points_from_polar_points):
+    model_points = model_points_from_polar_points(coarse_points)
+    x = model_points[..., 0]
+    y = model_points[..., 1]
+
+    if is_closed:
+        x = np.concatenate((x, x[:, :1]), axis=1)
+        y = np.concatenate((y, y[:, :1]), axis=1)
+
+    # The deviation between the points with odd indices and the midpoints of
+    # the segments connecting their neighbors.
+    deviation = np.hypot(x[:, 1::2] - 0.5 * (x[:, :-1:2] + x[:, 2::2]),
+                         y[:, 1::2] - 0.5 * (y[:, :-1:2] + y[:, 2::2]))
+    pixel_error = np.max(deviation, axis=1) * scale
+
+    number_of_segments = (x.shape[1] - 1) // 2
+    required_segments = number_of_segments * np.sqrt(
+        pixel_error / max_pixel_error)
+
+    render_details = np.clip(
+        np.exp2(np.ceil(np.log2(np.maximum(required_segments, 1.0)))),
+        min_render_detail, max_render_detail)
+
+    return render_details.astype(np.int64), pixel_error
+
+
+# Determines the largest scales at which curves rendered with the passed render
+# details are within max_pixel_error, where pixel_errors are the pixel errors
+# of the coarse render points at the passed scale, which are measured with
+# half of the coarse render detail.  The error shrinks quadratically with the
+# number of segments and grows linearly with the scale.  The maximum scales are
+# at least the passed scale, since the render details cannot be increased
+# beyond the maximum render detail anyway.
+def _max_scales_of_render_details(render_details, pixel_errors, scale,
+                                  max_pixel_error):
+    rendered_pixel_errors = pixel_errors * np.square(
+        0.5 * _coarse_render_detail / render_details)
+    with np.errstate(divide='ignore'):
+        return scale * np.maximum(max_pixel_error / rendered_pixel_errors, 1.0)
+
+
+# Calls the render function once for each distinct render detail, passing the
+# corresponding slices of the arrays.  The result contains one list per array
+# returned by the render function, holding the render points of each curve.
+# Curves whose render detail does not exceed the coarse render detail reuse
+# every k-th of the coarse render points instead.
+def _render_points_grouped_by_render_detail(render_function, render_details,
+                                            coarse_points, *arrays):
+    results = []
+
+    for render_detail in np.unique(render_details):
+        indices = np.flatnonzero(render_details == render_detail)
+
+        if _coarse_render_detail % render_detail == 0:
+            step = _coarse_render_detail // render_detail
+            render_points = tuple(points[indices, ::step]
+                                  for points in coarse_points)
+        else:
+            render_points = render_function(
+                *[array[indices] for array in arrays],
+                render_detail=int(render_detail))
+            if not isinstance(render_points, tuple):
+                render_points = (render_points, )
+
+        if not results:
+            results = [[None] * len(render_details) for _ in render_points]
+
+        for result, points in zip(results, render_points):
+            for index, curve_points in zip(indices, points):
+                result[index] = curve_points
+
+    return results
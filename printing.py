@@ -38,8 +38,9 @@ class printer:
               "<layer name=\"alpha\"/>\n" +\
               "<view layers=\"alpha\" active=\"alpha\"/>\n")
 
-        # To make sure that everything is actually drawn, mark everything for redraw.
-        self.drawer.mark_all_items_for_redraw()
+        # To make sure that everything is actually drawn, mark everything for
+        # redraw.  Nothing changed, so the render points can be reused.
+        self.drawer.mark_all_items_for_reprojection()
         self.drawer.draw_with_functions(items, edges, selected_nodes, None,
                                         self.print_ipe_path,
                                         self.print_ipe_circle)
@@ -50,6 +51,19 @@ class printer:
     def print_ipe_circle(self, center, radius, start_angle, end_angle,
                          is_clockwise, fill_color, border_color, width):
 
+        # Arcs go counterclockwise on the canvas from the start to the end
+        # angle.  Since the y-axis of the canvas points down, the arc is
+        # mirrored.
+        if not (start_angle == 0.0 and end_angle == 2.0 * math.pi):
+            start_E, end_E = arc_end_points(center, radius, start_angle,
+                                            end_angle)
+            print("<path stroke=\"" + str(border_color) + "\"> " +
+                  str(start_E.x) + " " + str(start_E.y) + " m " + str(radius) +
+                  " 0 0 " + str(-radius) + " " + str(center.x) + " " +
+                  str(center.y) + " " + str(end_E.x) + " " + str(end_E.y) +
+                  " a </path>")
+            return []
+
         if len(fill_color) > 0:
             print("<path stroke=\"" + str(border_color) + "\" fill=\"" +
                   str(fill_color) + "\"> " + str(radius) + " 0 0 " +
@@ -67,9 +81,9 @@ class printer:
     def print_ipe_path(self, points, is_closed, color, width):
         print("<path stroke=\"" + color + "\">")
         if len(points) > 0:
-            print(str(points[0].x) + " " + str(points[0].y) + " m")
+            print(str(points[0][0]) + " " + str(points[0][1]) + " m")
         for index in range(1, len(points)):
-            print(str(points[index].x) + " " + str(points[index].y) + " l")
+            print(str(points[index][0]) + " " + str(points[index][1]) + " l")
 
         if is_closed:
             print("h")
@@ -90,8 +104,9 @@ class printer:
               "xmlns:ev=\"http://www.w3.org/2001/xml-events\"\nversion=\"1.1\" " +\
               "baseProfile=\"full\"\nwidth=\"" + str(self.drawer.canvas.winfo_width()) + "\" height=\"" + str(self.drawer.canvas.winfo_height()) + "\">\n\n")
 
-        # To make sure that everything is actually drawn, mark everything for redraw.
-        self.drawer.mark_all_items_for_redraw()
+        # To make sure that everything is actually drawn, mark everything for
+        # redraw.  Nothing changed, so the render points can be reused.
+        self.drawer.mark_all_items_for_reprojection()
         self.drawer.draw_with_functions(items, edges, selected_nodes, None,
                                         self.print_svg_path,
                                         self.print_svg_circle)
@@ -100,6 +115,20 @@ class printer:
 
     def print_svg_circle(self, center, radius, start_angle, end_angle,
                          is_clockwise, fill_color, border_color, width):
+        # Arcs go counterclockwise on the canvas from the start to the end
+        # angle, which is the negative direction in SVG.
+        if not (start_angle == 0.0 and end_angle == 2.0 * math.pi):
+            start_E, end_E = arc_end_points(center, radius, start_angle,
+                                            end_angle)
+            is_large_arc = (end_angle - start_angle) % (2.0 *
+                                                        math.pi) > math.pi
+            print("<path d =\"M " + str(start_E.x) + "," + str(start_E.y) +
+                  " A " + str(radius) + "," + str(radius) + " 0 " +
+                  str(int(is_large_arc)) + " 0 " + str(end_E.x) + "," +
+                  str(end_E.y) + "\" stroke = \"" + str(border_color) +
+                  "\" stroke-width = \"" + str(width) + "\" fill=\"none\"/>")
+            return []
+
         if len(fill_color) > 0:
             print("<circle cx=\"" + str(center.x) + "\" cy=\"" +
                   str(center.y) + "\" r=\"" + str(radius) + "\" fill=\"" +
@@ -119,12 +148,12 @@ class printer:
         path_string = "<path d =\""
 
         if len(points) > 0:
-            path_string += "M " + str(points[0].x) + "," + str(
-                points[0].y) + " "
+            path_string += "M " + str(points[0][0]) + "," + str(
+                points[0][1]) + " "
 
             for index in range(1, len(points)):
-                path_string += "L " + str(points[index].x) + "," + str(
-                    points[index].y) + " "
+                path_string += "L " + str(points[index][0]) + "," + str(
+                    points[index][1]) + " "
         if is_closed:
             path_string += "Z"
 
@@ -135,3 +164,14 @@ class printer:
         # Path and circle funcs are expected to return arrays. In this case we
         # have nothing to return.
         return []
+
+
+# The end points of an arc around the passed center, where the angles are
+# measured counterclockwise on the canvas, whose y-axis points down.
+def arc_end_points(center, radius, start_angle, end_angle):
+    return (euclidean_coordinates.euclidean_coordinate(
+        center.x + radius * math.cos(start_angle),
+        center.y - radius * math.sin(start_angle)),
+            euclidean_coordinates.euclidean_coordinate(
+                center.x + radius * math.cos(end_angle),
+                center.y - radius * math.sin(end_angle)))
@@ -0,0 +1,181 @@
+# This program visualizes hyperbolic circles using the native representation.
+# Copyright (C) 2018    Maximilian Katzmann
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# You can contact the author via email: max.katzmann@gmail.com
+
+# Measuring where the time of drawing goes.
+#
+# Every drawer keeps a drawing_statistics.  Each call of drawer.draw is a
+# frame.  The time spent in the stages of drawing is counted from the end of
+# one frame to the end of the next, since canvas items are often deleted
+# before drawing, e.g., when a layer is marked for redraw.  Together with the
+# numbers of drawn things, the hit rates of the caches and the number of
+# events per second, the statistics of the last frame can be read from the
+# drawer or shown on the canvas, see drawer.draw_hud.
+#
+# The canvas items that exist are tracked where they are created and deleted,
+# since asking the canvas for all of its items on every frame takes time
+# linear in their number.
+
+from collections import deque
+from contextlib import contextmanager
+import time
+
+import native_coordinates
+
+
+class drawing_statistics:
+
+    # The stages the time of a frame is split into.  Tessellating computes
+    # the render points of curves, projecting converts them to canvas points,
+    # and the canvas items are created or updated and deleted by Tk.
+    stages = ["tessellation", "projection", "item creation", "deletion"]
+
+    # The numbers that are counted per frame.
+    counters = [
+        "created items", "drawn points", "drawn circles", "drawn edges"
+    ]
+
+    # The events of the last this many seconds are counted for the events per
+    # second.
+    event_window = 1.0
+
+    def __init__(self):
+        self.number_of_frames = 0
+        self.events = deque()
+
+        # The canvas items that exist, see count_created_items and
+        # count_deleted_items.
+        self.canvas_items = set()
+
+        # The statistics of the last frame that was finished.
+        self.last_frame_time = 0.0
+        self.last_stage_times = dict.fromkeys(self.stages, 0.0)
+        self.last_counts = dict.fromkeys(self.counters, 0)
+        self.last_render_points_hit_rate = None
+        self.last_circle_outline_hit_rate = None
+
+        # The statistics of the next frame.
+        self.frame_start_time = None
+        self.reset_next_frame()
+
+    def reset_next_frame(self):
+        self.stage_times = dict.fromkeys(self.stages, 0.0)
+        self.counts = dict.fromkeys(self.counters, 0)
+        self.render_points_hits = 0
+        self.render_points_misses = 0
+        self.circle_outline_hits = (
+            native_coordinates.canonical_circle_outline_cache_hits)
+        self.circle_outline_misses = (
+            native_coordinates.canonical_circle_outline_cache_misses)
+
+    def start_frame(self):
+        self.frame_start_time = time.perf_counter()
+
+    def end_frame(self):
+        if self.frame_start_time is None:
+            return
+
+        self.last_frame_time = time.perf_counter() - self.frame_start_time
+        self.frame_start_time = None
+        self.number_of_frames += 1
+
+        self.last_stage_times = self.stage_times
+        self.last_counts = self.counts
+        self.last_render_points_hit_rate = hit_rate(self.render_points_hits,
+                                                    self.render_points_misses)
+        self.last_circle_outline_hit_rate = hit_rate(
+            native_coordinates.canonical_circle_outline_cache_hits -
+            self.circle_outline_hits,
+            native_coordinates.canonical_circle_outline_cache_misses -
+            self.circle_outline_misses)
+        self.reset_next_frame()
+
+    # Adds the time spent in the with block to the passed stage of the next
+    # frame.
+    @contextmanager
+    def stage(self, stage):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[stage] += time.perf_counter() - start_time
+
+    def count(self, counter, number=1):
+        self.counts[counter] += number
+
+    # Counts the passed canvas items as created and returns them.
+    def count_created_items(self, items):
+        self.counts["created items"] += len(items)
+        self.canvas_items.update(items)
+        return items
+
+    # Forgets the passed canvas items, which were deleted.  Items that were
+    # deleted before are ignored.
+    def count_deleted_items(self, items):
+        self.canvas_items.difference_update(items)
+
+    # Forgets all canvas items, after the canvas was cleared.
+    def count_deleted_canvas(self):
+        self.canvas_items.clear()
+
+    # Counts the curves whose render points were reused (hits) and the ones
+    # that were tessellated again (misses).
+    def count_render_points(self, hits, misses):
+        self.render_points_hits += hits
+        self.render_points_misses += misses
+
+    # Counts an input event, e.g., a click or a key press.
+    def count_event(self):
+        self.events.append(time.perf_counter())
+
+    def events_per_second(self):
+        now = time.perf_counter()
+        while self.events and now - self.events[0] > self.event_window:
+            self.events.popleft()
+        return len(self.events) / self.event_window
+
+    # The statistics of the last frame as lines of text.
+    def summary(self):
+        lines = ["%-13s %7.1f ms" % ("frame", 1000.0 * self.last_frame_time)]
+        lines += [
+            "%-13s %7.1f ms" % (stage, 1000.0 * self.last_stage_times[stage])
+            for stage in self.stages
+        ]
+        lines += [
+            "%-13s %7d" % (counter, self.last_counts[counter])
+            for counter in self.counters
+        ]
+        lines.append("canvas items  %7d" % len(self.canvas_items))
+        lines.append("render points %s" %
+                     text_of_rate(self.last_render_points_hit_rate))
+        lines.append("outline cache %s" %
+                     text_of_rate(self.last_circle_outline_hit_rate))
+        lines.append("events/s      %7.1f" % self.events_per_second())
+        return lines
+
+
+# The share of hits among all cache lookups, or None without lookups.
+def hit_rate(hits, misses):
+    if hits + misses == 0:
+        return None
+    return hits / (hits + misses)
+
+
+def text_of_rate(rate):
+    if rate is None:
+        return "      -"
+    return "%6.1f%%" % (100.0 * rate)
@@ -0,0 +1,167 @@
+# This program visualizes hyperbolic circles using the native representation.
+# Copyright (C) 2018    Maximilian Katzmann
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# You can contact the author via email: max.katzmann@gmail.com
+
+# Drawing into an image instead of onto the canvas.
+#
+# Every canvas item costs memory and time in Tk, which makes layers with
+# hundreds of thousands of edges too slow to draw and to zoom.  A raster_image
+# provides drawing functions with the same signature as the ones of the
+# drawer, see drawer.draw_with_functions, that draw into a Pillow image
+# instead.  The image is then put on the canvas as a single item.
+#
+# Pillow is optional.  Without it, everything is drawn onto the canvas.
+
+from tkinter import *
+import math
+
+import drawing
+
+try:
+    from PIL import Image, ImageDraw, ImageTk
+except ImportError:
+    Image = None
+
+
+# Whether images can be drawn, i.e., whether Pillow is installed.
+def is_available():
+    return Image is not None
+
+
+# Draws into the passed image, or a new transparent image with the size of the
+# canvas.
+class raster_image:
+    def __init__(self, canvas, scale, image=None):
+        self.canvas = canvas
+
+        # The scale at which the image was drawn.
+        self.scale = scale
+
+        if image is None:
+            image = Image.new(
+                "RGBA",
+                (max(canvas.winfo_width(), 1), max(canvas.winfo_height(), 1)),
+                (0, 0, 0, 0))
+        self.image = image
+        self.image_draw = ImageDraw.Draw(self.image)
+
+        # The colors of Tk are resolved by the canvas, since Pillow does not
+        # know all of their names.
+        self.colors = {}
+
+        # The image that is shown on the canvas and the item showing it.  Tk
+        # does not keep a reference to the image, so it is kept here.
+        self.photo_image = None
+        self.canvas_item = None
+
+    def rgba_of_color(self, color):
+        if len(color) == 0:
+            return None
+
+        if color not in self.colors:
+            red, green, blue = self.canvas.winfo_rgb(color)
+            self.colors[color] = (red >> 8, green >> 8, blue >> 8, 255)
+        return self.colors[color]
+
+    # Draws a path into the image, see drawer.draw_path.
+    def draw_path(self, points_E, is_closed, color, width):
+        coordinates = drawing.coordinates_of_path(points_E, is_closed)
+        if coordinates is None:
+            return []
+
+        self.image_draw.line(coordinates,
+                             fill=self.rgba_of_color(color),
+                             width=max(int(round(width)), 1),
+                             joint="curve")
+
+        # The drawn path is not a canvas item, so there is nothing to return.
+        return []
+
+    # Draws a circle into the image, see drawer.draw_circle.  Arcs go
+    # counterclockwise on the canvas, while Pillow measures angles clockwise in
+    # degrees.
+    def draw_circle(self, center_E, radius, start_angle, end_angle,
+                    is_clockwise, fill_color, border_color, width):
+        bounding_box = [
+            center_E.x - radius, center_E.y - radius, center_E.x + radius,
+            center_E.y + radius
+        ]
+        fill = self.rgba_of_color(fill_color)
+        outline = self.rgba_of_color(border_color)
+        width = max(int(round(width)), 1)
+
+        if start_angle == 0.0 and end_angle == 2.0 * math.pi:
+            self.image_draw.ellipse(bounding_box,
+                                    fill=fill,
+                                    outline=outline,
+                                    width=width)
+            return []
+
+        extent = math.degrees((end_angle - start_angle) % (2.0 * math.pi))
+        end = -math.degrees(start_angle)
+        if fill is None:
+            self.image_draw.arc(bounding_box,
+                                end - extent,
+                                end,
+                                fill=outline,
+                                width=width)
+        else:
+            self.image_draw.pieslice(bounding_box,
+                                     end - extent,
+                                     end,
+                                     fill=fill,
+                                     outline=outline,
+                                     width=width)
+        return []
+
+    # Puts the image on the canvas, as a single item with the passed tags.
+    def place_on_canvas(self, tags):
+        self.photo_image = ImageTk.PhotoImage(self.image)
+        self.canvas_item = self.canvas.create_image(0,
+                                                    0,
+                                                    image=self.photo_image,
+                                                    anchor=NW,
+                                                    tags=tags)
+        return self.canvas_item
+
+    # Shows the passed image instead, which was drawn at the same scale.  The
+    # item keeps its place among the other items on the canvas.
+    def show_image(self, image):
+        self.image = image
+        self.image_draw = ImageDraw.Draw(self.image)
+        self.photo_image = ImageTk.PhotoImage(self.image)
+        self.canvas.coords(self.canvas_item, 0, 0)
+        self.canvas.itemconfigure(self.canvas_item, image=self.photo_image)
+
+    # Shows the image as it would be drawn at the passed scale, by scaling it
+    # around the center of the canvas.  Other than canvas items, images can
+    # not be scaled by the canvas itself.
+    def zoom_to_scale(self, scale):
+        if self.canvas_item is None:
+            return
+
+        factor = scale / self.scale
+        center_x = self.image.width / 2.0
+        center_y = self.image.height / 2.0
+        scaled_image = self.image.transform(
+            self.image.size, Image.AFFINE,
+            (1.0 / factor, 0.0, center_x - center_x / factor, 0.0,
+             1.0 / factor, center_y - center_y / factor), Image.BILINEAR)
+
+        self.photo_image = ImageTk.PhotoImage(scaled_image)
+        self.canvas.coords(self.canvas_item, 0, 0)
+        self.canvas.itemconfigure(self.canvas_item, image=self.photo_image)
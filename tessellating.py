@@ -0,0 +1,241 @@
+# This program visualizes hyperbolic circles using the native representation.
+# Copyright (C) 2018    Maximilian Katzmann
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# You can contact the author via email: max.katzmann@gmail.com
+
+# Tessellating many lines in parallel.
+#
+# The render points of many lines, see render_points_of_lines, are computed
+# by a pool of worker processes, one per core.  The end points of the lines
+# are passed to the workers through shared memory, and each worker returns
+# the render points of its lines as one flat array, together with the number
+# of points of each line.  The workers are started when they are needed for
+# the first time.  This module only depends on native_coordinates, such that
+# it and drawing do not import each other.  The workers still import Tk,
+# since spawned processes import the main module, i.e., Hipe, again.  They do
+# not run its main block, though, so no window is created.
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import multiprocessing
+import math
+import os
+
+import numpy as np
+
+import native_coordinates
+
+# Fewer lines are tessellated in the current process, since passing them to
+# the workers takes longer than tessellating them.
+parallel_threshold = 20000
+
+# The number of parts the lines are split into per worker, such that workers
+# that finish early can take over more work.
+parts_per_worker = 4
+
+_worker_pool = None
+
+
+def number_of_workers():
+    return os.cpu_count() or 1
+
+
+# The pool of worker processes.  The workers are spawned, such that they do
+# not inherit the state of Tk.
+def worker_pool():
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = ProcessPoolExecutor(
+            max_workers=number_of_workers(),
+            mp_context=multiprocessing.get_context("spawn"))
+    return _worker_pool
+
+
+# Forgets the pool of worker processes, e.g., since one of its workers died.
+# A new pool is started when it is needed the next time.
+def reset_worker_pool():
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.shutdown(wait=False)
+    _worker_pool = None
+
+
+# Whether the passed number of lines is tessellated by the workers.
+def is_parallel(number_of_lines):
+    return number_of_lines >= parallel_threshold and number_of_workers() > 1
+
+
+# Converts points given by their radial and angular coordinates to the plane
+# of the passed projection, see
+# drawing.drawer.model_points_from_polar_points.
+def model_points_from_polar_points(points, projection):
+    if projection == "poincare":
+        return native_coordinates.poincare_points_from_polar_points(points)
+    if projection == "klein":
+        return native_coordinates.klein_points_from_polar_points(points)
+    return native_coordinates.native_points_from_polar_points(points)
+
+
+# The render points of the lines between the passed end points in the plane
+# of the passed projection with scale 1, together with the model scales up to
+# which they can be used.  Only depends on the passed values, such that it can
+# be computed by the worker processes.
+def render_points_of_lines(r1, phi1, r2, phi2, projection, model_scale,
+                           max_pixel_error):
+    if projection == "native":
+        line_points_H, max_scales = native_coordinates.adaptive_render_points_for_lines_from_to(
+            r1, phi1, r2, phi2, model_scale, max_pixel_error)
+    else:
+        # In the Poincaré and Klein disks, lines are determined by their end
+        # points, at every scale.  In the Klein disk they are straight, in the
+        # Poincaré disk they are drawn as arcs.
+        line_points_H = np.stack((np.stack(
+            (r1, phi1), axis=-1), np.stack((r2, phi2), axis=-1)),
+                                 axis=1)
+        max_scales = np.full(len(r1), math.inf)
+
+    return [
+        model_points_from_polar_points(points_H, projection)
+        for points_H in line_points_H
+    ], max_scales
+
+
+# The render points of the lines between the passed end points, see
+# render_points_of_lines.  Many lines are tessellated in parallel.
+def parallel_render_points_of_lines(r1, phi1, r2, phi2, projection,
+                                    model_scale, max_pixel_error):
+    number_of_lines = len(r1)
+    if not is_parallel(number_of_lines):
+        return render_points_of_lines(r1, phi1, r2, phi2, projection,
+                                      model_scale, max_pixel_error)
+
+    bounds = np.linspace(0, number_of_lines,
+                         number_of_workers() * parts_per_worker + 1).astype(
+                             np.intp)
+    try:
+        futures = submit_render_points_of_lines(r1, phi1, r2, phi2,
+                                                zip(bounds[:-1],
+                                                    bounds[1:]), projection,
+                                                model_scale, max_pixel_error)
+        results = [future.result() for future in futures]
+    except Exception as error:
+        # The lines are tessellated here, if the workers fail.
+        forget_broken_worker_pool(error)
+        return render_points_of_lines(r1, phi1, r2, phi2, projection,
+                                      model_scale, max_pixel_error)
+
+    line_points_N = []
+    for points_N, numbers_of_points, _ in results:
+        line_points_N += render_points_from_flat_points(
+            points_N, numbers_of_points)
+    return line_points_N, np.concatenate(
+        [max_scales for _, _, max_scales in results])
+
+
+# Submits the tessellation of the lines between the passed end points to the
+# worker processes, split into the passed ranges (start, end) of lines.
+# Returns one future per range, whose result contains the flat render points
+# of its lines, see flat_render_points_of_lines.  The shared memory holding
+# the end points is released once all futures are done or cancelled.  Raises
+# BrokenProcessPool, if the workers cannot take the lines.
+def submit_render_points_of_lines(r1, phi1, r2, phi2, ranges, projection,
+                                  model_scale, max_pixel_error):
+    number_of_lines = len(r1)
+    block = shared_memory.SharedMemory(create=True,
+                                       size=max(4 * number_of_lines * 8, 8))
+    end_points = np.ndarray((4, number_of_lines),
+                            dtype=np.float64,
+                            buffer=block.buf)
+    end_points[:] = (r1, phi1, r2, phi2)
+    del end_points
+
+    futures = []
+    try:
+        for start, end in ranges:
+            futures.append(worker_pool().submit(
+                _flat_render_points_of_shared_lines, block.name,
+                number_of_lines, int(start), int(end), projection, model_scale,
+                max_pixel_error))
+    except BrokenProcessPool:
+        for future in futures:
+            future.cancel()
+        block.close()
+        block.unlink()
+        reset_worker_pool()
+        raise
+
+    remaining_futures = [len(futures)]
+
+    def release_block(future):
+        remaining_futures[0] -= 1
+        if remaining_futures[0] == 0:
+            block.close()
+            block.unlink()
+
+    if not futures:
+        release_block(None)
+
+    for future in futures:
+        future.add_done_callback(release_block)
+
+    return futures
+
+
+# The render points of the lines as one array of shape (number of points, 2),
+# together with the number of points of each line and the maximum scales.
+def flat_render_points_of_lines(r1, phi1, r2, phi2, projection, model_scale,
+                                max_pixel_error):
+    line_points_N, max_scales = render_points_of_lines(r1, phi1, r2, phi2,
+                                                       projection, model_scale,
+                                                       max_pixel_error)
+
+    numbers_of_points = np.array([len(points_N) for points_N in line_points_N],
+                                 dtype=np.intp)
+    if len(line_points_N) == 0:
+        return np.empty((0, 2)), numbers_of_points, np.asarray(max_scales)
+
+    return np.concatenate(line_points_N), numbers_of_points, np.asarray(
+        max_scales)
+
+
+# Resets the pool of worker processes, if the passed error of a tessellation
+# means that it is broken.
+def forget_broken_worker_pool(error):
+    if isinstance(error, BrokenProcessPool):
+        reset_worker_pool()
+
+
+# Splits flat render points into the render points of the single lines.
+def render_points_from_flat_points(points_N, numbers_of_points):
+    return np.split(points_N, np.cumsum(numbers_of_points)[:-1])
+
+
+def _flat_render_points_of_shared_lines(block_name, number_of_lines, start,
+                                        end, projection, model_scale,
+                                        max_pixel_error):
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        end_points = np.ndarray((4, number_of_lines),
+                                dtype=np.float64,
+                                buffer=block.buf)
+        r1, phi1, r2, phi2 = end_points[:, start:end].copy()
+        del end_points
+    finally:
+        block.close()
+
+    return flat_render_points_of_lines(r1, phi1, r2, phi2, projection,
+                                       model_scale, max_pixel_error)
@@ -0,0 +1,85 @@
+# This program visualizes hyperbolic circles using the native representation.
+# Copyright (C) 2018    Maximilian Katzmann
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# You can contact the author via email: max.katzmann@gmail.com
+
+import math
+
+import numpy as np
+import pytest
+
+import native_coordinates
+
+
+# The points on the outline of a circle have the radius as distance to its
+# center, also when the center is far away from the origin.  The centers lie
+# on the x-axis, where the tiny angular coordinates of the points can be
+# represented exactly.
+@pytest.mark.parametrize("center_r", [0.5, 3.0, 40.0, 300.0, 700.0])
+@pytest.mark.parametrize("radius", [0.5, 3.0, 10.0])
+def test_circle_outline_points_lie_at_radius(center_r, radius):
+    alpha = np.linspace(0.0, 2.0 * math.pi, 65)
+    r, theta = native_coordinates._circle_outline_points(
+        center_r, radius, alpha)
+
+    distances = native_coordinates.distances_between_arrays(
+        center_r, 0.0, r, theta)
+    np.testing.assert_allclose(distances, radius, rtol=1e-9)
+
+
+# The render points of a line segment split it into parts of equal length.
+@pytest.mark.parametrize("r1, phi1, r2, phi2", [
+    (2.0, 0.1, 3.0, 2.0),
+    (10.0, 0.1, 1.0, 5.0),
+    (40.0, 0.0, 41.0, 1e-12),
+    (300.0, 0.0, 300.0, 1e-120),
+    (700.0, 1e-300, 710.0, 3e-300),
+])
+def test_line_render_points_lie_at_equal_distances(r1, phi1, r2, phi2):
+    render_detail = 16
+    points = native_coordinates.render_points_for_lines_from_to(
+        r1, phi1, r2, phi2, render_detail)[0]
+
+    length = native_coordinates.distances_between_arrays(r1, phi1, r2, phi2)
+    distances_to_first = native_coordinates.distances_between_arrays(
+        r1, phi1, points[:, 0], points[:, 1])
+    distances_to_second = native_coordinates.distances_between_arrays(
+        r2, phi2, points[:, 0], points[:, 1])
+
+    tolerance = 1e-9 * max(length, 1.0)
+    np.testing.assert_allclose(distances_to_first + distances_to_second,
+                               length,
+                               atol=tolerance)
+    np.testing.assert_allclose(np.sort(distances_to_first),
+                               length * np.arange(render_detail + 1) /
+                               render_detail,
+                               atol=tolerance)
+
+
+# Far away from the origin, the angles in the triangles with the origin
+# underflow, but the line between two points still stays between their
+# angular coordinates and comes close to the origin.
+def test_line_render_points_for_very_large_radii():
+    points = native_coordinates.render_points_for_lines_from_to(
+        800.0, 0.1, 900.0, 0.3)[0]
+
+    phi = points[:, 1]
+    assert np.all((phi > 0.1 - 1e-12) & (phi < 0.3 + 1e-12))
+    assert np.all(np.diff(phi) > -1e-12)
+    minimum_radius = native_coordinates.minimum_radii_on_lines_from_to(
+        800.0, 0.1, 900.0, 0.3)
+    assert 0.0 < minimum_radius < 10.0
+    assert np.min(points[:, 0]) >= minimum_radius - 1e-9
@@ -0,0 +1,292 @@
+# This program visualizes hyperbolic circles using the native representation.
+# Copyright (C) 2018    Maximilian Katzmann
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# You can contact the author via email: max.katzmann@gmail.com
+
+# Tiles of layers that do not change, e.g., the embedded graph.
+#
+# A layer that is drawn into an image (see rasterizing) is cut into square
+# tiles, which are kept for every zoom level they were drawn at.  The zoom
+# levels are the scales 2^(level / levels_per_octave), and the tiles of a
+# level are numbered by their position relative to the origin, which is
+# always in the center of the canvas.  Drawing the layer at a scale then
+# only means putting together the tiles of the closest level.  Only the
+# tiles that are missing are drawn, all of them together and in the
+# background, see drawing.drawer.draw_tiles.  Until then, they are stood in
+# for by the scaled tiles of another level.
+#
+# Tiles can be saved to a directory and loaded from it again.  Loaded tiles
+# are read from the disk only when they are needed, so they can be shown
+# without the geometry they were drawn from.
+
+from collections import OrderedDict
+import json
+import math
+import os
+import shutil
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Stands in for the canvas, when a layer is drawn into an image of a different
+# size than the canvas.  Colors are still resolved by the actual canvas.
+class off_screen_canvas:
+    def __init__(self, canvas, width, height):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def winfo_rgb(self, color):
+        return self.canvas.winfo_rgb(color)
+
+
+class tile_pyramid:
+
+    tile_size = 256
+    levels_per_octave = 4
+
+    # The number of bytes the tiles in memory may take up.  The tiles that
+    # were used the longest time ago are dropped first.
+    memory_budget = 128 * 1024 * 1024
+
+    def __init__(self, projection, directory=None):
+        # The projection the tiles were drawn in.
+        self.projection = projection
+
+        # The directory that tiles are loaded from, if they are not in memory.
+        self.directory = directory
+
+        # The tiles in memory, with the most recently used one last.
+        self.tiles = OrderedDict()
+        self.memory_usage = 0
+
+        # The keys of the non-empty tiles that were dropped from memory to stay
+        # within the memory budget.
+        self.dropped_keys = set()
+
+    # Loads the tiles that were saved to the passed directory.  Only the
+    # description of the tiles is read now, the tiles are read when needed.
+    @staticmethod
+    def load(directory):
+        with open(os.path.join(directory, "pyramid.json")) as pyramid_file:
+            description = json.load(pyramid_file)
+
+        pyramid = tile_pyramid(description["projection"], directory)
+        pyramid.tile_size = description["tile_size"]
+        pyramid.levels_per_octave = description["levels_per_octave"]
+        return pyramid
+
+    # Saves the tiles to the passed directory.  Empty tiles are not saved.
+    # Tiles that are not in memory are copied from the directory the tiles
+    # were loaded from, if any.  Tiles that were dropped from memory and are
+    # not on the disk are lost, their number is returned.
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+
+        with open(os.path.join(directory, "pyramid.json"),
+                  "w") as pyramid_file:
+            json.dump(
+                {
+                    "projection": self.projection,
+                    "tile_size": self.tile_size,
+                    "levels_per_octave": self.levels_per_octave
+                }, pyramid_file)
+
+        for key, tile in self.tiles.items():
+            if tile.getbbox() is not None:
+                tile.save(self.file_name_of_tile(directory, key))
+
+        if self.directory is not None:
+            for file_name in os.listdir(self.directory):
+                saved_file_name = os.path.join(directory, file_name)
+                if file_name.endswith(
+                        ".png") and not os.path.exists(saved_file_name):
+                    shutil.copyfile(os.path.join(self.directory, file_name),
+                                    saved_file_name)
+
+        return sum(
+            1 for key in self.dropped_keys
+            if not os.path.exists(self.file_name_of_tile(directory, key)))
+
+    def file_name_of_tile(self, directory, key):
+        return os.path.join(directory, "%d_%d_%d.png" % key)
+
+    def level_of_scale(self, scale):
+        return int(round(math.log2(scale) * self.levels_per_octave))
+
+    def scale_of_level(self, level):
+        return math.pow(2.0, level / self.levels_per_octave)
+
+    # The tile with the passed key (level, column, row), or None if it is
+    # neither in memory nor on the disk.
+    def tile(self, key):
+        if key in self.tiles:
+            self.tiles.move_to_end(key)
+            return self.tiles[key]
+
+        if self.directory is None:
+            return None
+
+        file_name = self.file_name_of_tile(self.directory, key)
+        if not os.path.exists(file_name):
+            return None
+
+        tile = Image.open(file_name).convert("RGBA")
+        self.add_tile(key, tile)
+        return tile
+
+    def add_tile(self, key, tile):
+        if key in self.tiles:
+            self.memory_usage -= self.memory_of_tile(self.tiles.pop(key))
+
+        self.tiles[key] = tile
+        self.memory_usage += self.memory_of_tile(tile)
+        self.dropped_keys.discard(key)
+
+        while self.memory_usage > self.memory_budget and len(self.tiles) > 1:
+            dropped_key, dropped_tile = self.tiles.popitem(last=False)
+            self.memory_usage -= self.memory_of_tile(dropped_tile)
+            if dropped_tile.getbbox() is not None:
+                self.dropped_keys.add(dropped_key)
+
+    def memory_of_tile(self, tile):
+        return tile.width * tile.height * len(tile.getbands())
+
+    # The part of the level of the passed scale that is visible on a canvas
+    # with the passed size, relative to the origin, as (left, top, right,
+    # bottom) in pixels of the level.
+    def visible_region(self, width, height, scale):
+        factor = scale / self.scale_of_level(self.level_of_scale(scale))
+        half_width = width / (2.0 * factor)
+        half_height = height / (2.0 * factor)
+        return (-half_width, -half_height, half_width, half_height)
+
+    # The keys of the tiles of the passed level that intersect the passed
+    # region, see visible_region.
+    def keys_of_region(self, level, region):
+        left, top, right, bottom = region
+        return [(level, column, row)
+                for column in range(math.floor(left / self.tile_size),
+                                    math.floor(right / self.tile_size) + 1)
+                for row in range(math.floor(top / self.tile_size),
+                                 math.floor(bottom / self.tile_size) + 1)]
+
+    # The keys of the tiles that are needed for the image of the layer at the
+    # passed scale but are neither in memory nor on the disk.
+    def missing_keys(self, width, height, scale):
+        return [
+            key for key in self.keys_of_region(
+                self.level_of_scale(scale),
+                self.visible_region(width, height, scale))
+            if self.tile(key) is None
+        ]
+
+    # Puts together the image of the layer at the passed scale, for a canvas
+    # with the passed size.  Missing tiles are stood in for by the tiles of
+    # the closest level in memory, see placeholder_tile, or stay empty.
+    def image_at_scale(self, width, height, scale):
+        level = self.level_of_scale(scale)
+        return self.image_of_region(level,
+                                    self.visible_region(width, height, scale),
+                                    (width, height), self.placeholder_tile)
+
+    # Puts together the tiles of the passed level that intersect the passed
+    # region, see visible_region, and scales the region to the passed size.
+    # Missing tiles are replaced by missing_tile_func(key), unless it returns
+    # None.
+    def image_of_region(self, level, region, size, missing_tile_func):
+        left, top, right, bottom = region
+        keys = self.keys_of_region(level, region)
+        first_column = min(column for _, column, _ in keys)
+        first_row = min(row for _, _, row in keys)
+        number_of_columns = max(column
+                                for _, column, _ in keys) - (first_column - 1)
+        number_of_rows = max(row for _, _, row in keys) - (first_row - 1)
+
+        image = Image.new("RGBA", (number_of_columns * self.tile_size,
+                                   number_of_rows * self.tile_size),
+                          (0, 0, 0, 0))
+        for key in keys:
+            tile = self.tile(key)
+            if tile is None:
+                tile = missing_tile_func(key)
+            if tile is not None:
+                _, column, row = key
+                image.paste(tile, ((column - first_column) * self.tile_size,
+                                   (row - first_row) * self.tile_size))
+
+        # Maps the pixels of the image to the pixels of the tiles.
+        width, height = size
+        return image.transform(
+            size, Image.AFFINE,
+            ((right - left) / width, 0.0, left - first_column * self.tile_size,
+             0.0, (bottom - top) / height, top - first_row * self.tile_size),
+            Image.BILINEAR)
+
+    # Stands in for the missing tile with the passed key, by scaling the part
+    # of the closest level in memory that it covers.  Returns None, if no
+    # other level is in memory.
+    def placeholder_tile(self, key):
+        level, column, row = key
+        levels = {other_level for other_level, _, _ in self.tiles} - {level}
+        if not levels:
+            return None
+
+        other_level = min(levels,
+                          key=lambda other_level: abs(other_level - level))
+        factor = self.scale_of_level(other_level) / self.scale_of_level(level)
+        region = (column * self.tile_size * factor,
+                  row * self.tile_size * factor,
+                  (column + 1) * self.tile_size * factor,
+                  (row + 1) * self.tile_size * factor)
+        return self.image_of_region(other_level, region,
+                                    (self.tile_size, self.tile_size),
+                                    lambda key: None)
+
+    # The region of the level, relative to the origin, that contains the
+    # tiles with the passed keys.  The layer is drawn with the origin in the
+    # center, so the region is symmetric.  Returns its half width and half
+    # height.
+    def half_size_of_keys(self, keys):
+        half_width = max(
+            max(-column * self.tile_size, (column + 1) * self.tile_size)
+            for _, column, _ in keys)
+        half_height = max(
+            max(-row * self.tile_size, (row + 1) * self.tile_size)
+            for _, _, row in keys)
+        return half_width, half_height
+
+    # Cuts the tiles with the passed keys out of the passed image of their
+    # level, which has the size 2 * half_size_of_keys(keys) and the origin in
+    # its center.
+    def add_tiles_from_image(self, keys, image):
+        half_width, half_height = image.width // 2, image.height // 2
+        for key in keys:
+            _, column, row = key
+            x = column * self.tile_size + half_width
+            y = row * self.tile_size + half_height
+            self.add_tile(
+                key, image.crop(
+                    (x, y, x + self.tile_size, y + self.tile_size)))